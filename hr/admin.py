@@ -1,9 +1,15 @@
-from django.contrib import admin
+import copy
+import hashlib
+
+from django import forms
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from django.db.models import Count, F, FileField, Q
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from django.utils.translation import gettext_lazy as _
 from unfold.admin import ModelAdmin, TabularInline, StackedInline
 from unfold.contrib.filters.admin import (
     RangeDateFilter,
@@ -11,24 +17,152 @@ from unfold.contrib.filters.admin import (
     MultipleChoicesDropdownFilter,
 )
 from unfold.contrib.import_export.forms import ExportForm, ImportForm
-from import_export import resources
+from unfold.forms import ActionForm
+from unfold.widgets import UnfoldAdminSelectWidget, UnfoldAdminTextInputWidget
+from import_export import fields, resources, widgets
+from import_export.instance_loaders import ModelInstanceLoader
+from import_export.results import RowResult
 from import_export.admin import ImportExportModelAdmin
 
+from hr_system.routers import replica_reads
+
+from . import employment, leave, lookups, thumbnails
 from .models import (
     Department, Position, Employee, LeaveType, LeaveRequest,
-    PerformanceReview, Attendance, EmployeeDocument
+    PerformanceReview, Attendance, ArchivedAttendance, EmployeeDocument
 )
+from .uploads import ChunkedFileInput
 
 
 # Resources for Import/Export functionality
+class LookupForeignKeyWidget(widgets.ForeignKeyWidget):
+    """ForeignKeyWidget resolving import values through the lookup cache
+    (hr.lookups) instead of one query per row"""
+
+    def get_instance_by_lookup_fields(self, value, row, **kwargs):
+        lookup_kwargs = self.get_lookup_kwargs(value, row, **kwargs)
+        matches = lookups.for_model(self.model).filter(**lookup_kwargs)
+        if not matches:
+            raise self.model.DoesNotExist(f'No {self.model._meta.verbose_name} matching {lookup_kwargs}')
+        if len(matches) > 1:
+            raise self.model.MultipleObjectsReturned(
+                f'{len(matches)} {self.model._meta.verbose_name_plural} match {lookup_kwargs}'
+            )
+        # A copy, as cached instances are shared
+        return copy.copy(matches[0])
+
+
+class PositionWidget(LookupForeignKeyWidget):
+    """Position titles are only unique within a department"""
+
+    def get_lookup_kwargs(self, value, row, **kwargs):
+        lookup_kwargs = super().get_lookup_kwargs(value, row, **kwargs)
+        if row and row.get('department__name'):
+            lookup_kwargs['department__name'] = row['department__name']
+        return lookup_kwargs
+
+
+class FingerprintInstanceLoader(ModelInstanceLoader):
+    """Compares every row's fingerprint with the stored one in bulk, up
+    front, and loads only the employees whose rows changed, in one query"""
+
+    chunk_size = 500
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.id_field = self.resource.fields[self.resource.get_import_id_fields()[0]]
+        ids = [self.id_field.clean(row) for row in self.dataset.dict] if self.dataset.dict else []
+        queryset = self.get_queryset()
+        self.fingerprints = {}
+        for start in range(0, len(ids), self.chunk_size):
+            self.fingerprints.update(
+                queryset.filter(employee_id__in=ids[start:start + self.chunk_size], imported_at=F('updated_at'))
+                .values_list('employee_id', 'import_fingerprint')
+            )
+        changed = [
+            row_id for row_id, row in zip(ids, self.dataset.dict)
+            if self.fingerprints.get(row_id) != self.resource.row_fingerprint(row)
+        ]
+        self.instances = {}
+        for start in range(0, len(changed), self.chunk_size):
+            self.instances.update(
+                (instance.employee_id, instance)
+                for instance in queryset.filter(employee_id__in=changed[start:start + self.chunk_size])
+            )
+
+    def is_unchanged(self, row):
+        return self.fingerprints.get(self.id_field.clean(row)) == self.resource.row_fingerprint(row)
+
+    def get_instance(self, row):
+        return self.instances.get(self.id_field.clean(row))
+
+
 class EmployeeResource(resources.ModelResource):
+    """The weekly re-upload of the full spreadsheet is mostly unchanged rows:
+    a row whose hash matches the one stored at its last import is skipped
+    without loading the employee, unless the employee was edited since"""
+
+    department = fields.Field(
+        attribute='department',
+        column_name='department__name',
+        widget=LookupForeignKeyWidget(Department, 'name'),
+    )
+    position = fields.Field(
+        attribute='position',
+        column_name='position__title',
+        widget=PositionWidget(Position, 'title'),
+    )
+
     class Meta:
         model = Employee
+        import_id_fields = ('employee_id',)
         fields = (
             'employee_id', 'first_name', 'last_name', 'personal_email',
-            'phone_number', 'department__name', 'position__title',
+            'phone_number', 'department', 'position',
             'hire_date', 'employment_status', 'salary'
         )
+        instance_loader_class = FingerprintInstanceLoader
+        skip_unchanged = True
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.fingerprinted = []
+
+    def row_fingerprint(self, row):
+        values = [
+            (field.column_name, '' if row.get(field.column_name) is None else str(row.get(field.column_name)))
+            for field in self.get_import_fields()
+        ]
+        return hashlib.md5(repr(values).encode(), usedforsecurity=False).hexdigest()
+
+    def import_row(self, row, instance_loader, **kwargs):
+        if instance_loader.is_unchanged(row):
+            row_result = self.get_row_result_class()()
+            row_result.import_type = RowResult.IMPORT_TYPE_SKIP
+            return row_result
+        return super().import_row(row, instance_loader, **kwargs)
+
+    def fingerprint(self, instance, row):
+        instance.import_fingerprint = self.row_fingerprint(row)
+        instance.imported_at = instance.updated_at
+        self.fingerprinted.append(instance)
+
+    def skip_row(self, instance, original, row, import_validation_errors=None):
+        skip = super().skip_row(instance, original, row, import_validation_errors)
+        if skip and instance.pk:
+            # Same values, different spelling (e.g. dates from a spreadsheet)
+            self.fingerprint(instance, row)
+        return skip
+
+    def after_save_instance(self, instance, row, **kwargs):
+        self.fingerprint(instance, row)
+
+    def after_import(self, dataset, result, **kwargs):
+        super().after_import(dataset, result, **kwargs)
+        if not self._is_dry_run(kwargs):
+            # Not save(): that would move updated_at past imported_at
+            Employee.objects.bulk_update(self.fingerprinted, ['import_fingerprint', 'imported_at'], batch_size=500)
+        self.fingerprinted = []
 
 
 class DepartmentResource(resources.ModelResource):
@@ -37,12 +171,67 @@ class DepartmentResource(resources.ModelResource):
         fields = ('name', 'description', 'is_active')
 
 
+class LookupChoicesMixin:
+    """Department, position and leave type selects take their choices from
+    the per-process lookup cache (hr.lookups) instead of querying the table
+    for every form, and inline rows share one evaluated list"""
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        table = lookups.for_model(db_field.related_model)
+        if table is not None and formfield is not None and 'queryset' not in kwargs:
+            empty = [('', formfield.empty_label)] if formfield.empty_label is not None else []
+            formfield.choices = empty + table.choices()
+        return formfield
+
+
+class LookupDropdownFilter(MultipleChoicesDropdownFilter):
+    """MultipleChoicesDropdownFilter for a foreign key to a lookup table,
+    with choices from the lookup cache rather than a query per page"""
+
+    def choices(self, changelist):
+        yield {
+            'form': self.form_class(
+                label=_(' By %(filter_title)s ') % {'filter_title': self.title},
+                name=self.lookup_kwarg,
+                choices=[self.all_option] + lookups.for_model(self.field.related_model).choices(),
+                data={self.lookup_kwarg: self.value()},
+                multiple=True,
+            ),
+        }
+
+
+class ReplicaExportMixin:
+    """Build export files from the read replica, when one is configured"""
+
+    def get_export_data(self, *args, **kwargs):
+        with replica_reads():
+            return super().get_export_data(*args, **kwargs)
+
+
 # Inline Admin Classes
-class EmployeeDocumentInline(TabularInline):
+class DocumentFileMixin:
+    """Uploads document files in chunks (hr.uploads) and links them to
+    hr.views.document_download rather than the media URL"""
+
+    def formfield_for_dbfield(self, db_field, request, **kwargs):
+        if isinstance(db_field, FileField):
+            # The widget only accepts uploads made by the user posting the form
+            kwargs['widget'] = ChunkedFileInput(user=request.user)
+        return super().formfield_for_dbfield(db_field, request, **kwargs)
+
+    def download_link(self, obj):
+        if not obj.pk or not obj.document_file:
+            return '-'
+        return format_html('<a href="{}">Download</a>', reverse('document_download', args=[obj.pk]))
+    download_link.short_description = 'Download'
+
+
+class EmployeeDocumentInline(DocumentFileMixin, TabularInline):
     model = EmployeeDocument
     extra = 0
-    fields = ('document_type', 'title', 'document_file', 'expiry_date', 'is_confidential')
-    readonly_fields = ('upload_date',)
+    fields = ('document_type', 'title', 'document_file', 'download_link', 'expiry_date', 'is_confidential')
+    readonly_fields = ('upload_date', 'download_link')
 
 
 class PositionInline(TabularInline):
@@ -51,7 +240,7 @@ class PositionInline(TabularInline):
     fields = ('title', 'description', 'min_salary', 'max_salary', 'is_active')
 
 
-class DirectReportsInline(TabularInline):
+class DirectReportsInline(LookupChoicesMixin, TabularInline):
     model = Employee
     fk_name = 'direct_manager'
     extra = 0
@@ -63,7 +252,7 @@ class DirectReportsInline(TabularInline):
 
 # Main Admin Classes
 @admin.register(Department)
-class DepartmentAdmin(ImportExportModelAdmin, ModelAdmin):
+class DepartmentAdmin(ReplicaExportMixin, ImportExportModelAdmin, ModelAdmin):
     resource_class = DepartmentResource
     import_form_class = ImportForm
     export_form_class = ExportForm
@@ -84,6 +273,12 @@ class DepartmentAdmin(ImportExportModelAdmin, ModelAdmin):
         }),
     )
     readonly_fields = ('created_at', 'updated_at')
+    autocomplete_fields = ('manager',)
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('manager').annotate(
+            active_employee_count=Count('employees', filter=Q(employees__is_active=True))
+        )
     
     def manager_link(self, obj):
         if obj.manager:
@@ -93,16 +288,17 @@ class DepartmentAdmin(ImportExportModelAdmin, ModelAdmin):
     manager_link.short_description = 'Manager'
     
     def employee_count_display(self, obj):
-        return obj.employee_count
+        return obj.active_employee_count
     employee_count_display.short_description = 'Active Employees'
+    employee_count_display.admin_order_field = 'active_employee_count'
 
 
 @admin.register(Position)
-class PositionAdmin(ModelAdmin):
+class PositionAdmin(LookupChoicesMixin, ModelAdmin):
     list_display = ('title', 'department', 'salary_range', 'is_active', 'created_at')
     list_filter = (
         'is_active',
-        ('department', MultipleChoicesDropdownFilter),
+        ('department', LookupDropdownFilter),
         ('created_at', RangeDateFilter)
     )
     search_fields = ('title', 'description', 'department__name')
@@ -131,8 +327,33 @@ class PositionAdmin(ModelAdmin):
     salary_range.short_description = 'Salary Range'
 
 
+class EmploymentChangeForm(ActionForm):
+    """Options for the bulk employment change actions; blank fields are left unchanged."""
+
+    employment_status = forms.ChoiceField(
+        required=False, label='',
+        choices=[('', 'Status unchanged')] + Employee.EMPLOYMENT_STATUS_CHOICES,
+        widget=UnfoldAdminSelectWidget,
+    )
+    department = forms.ModelChoiceField(
+        required=False, label='', queryset=Department.objects.filter(is_active=True),
+        empty_label='Department unchanged', widget=UnfoldAdminSelectWidget,
+    )
+    direct_manager = forms.CharField(
+        required=False, label='',
+        widget=UnfoldAdminTextInputWidget(attrs={'placeholder': 'New manager (employee ID)'}),
+    )
+    termination_date = forms.DateField(
+        required=False, label='', widget=UnfoldAdminTextInputWidget(attrs={'type': 'date'}),
+    )
+    reassign_reports_to = forms.CharField(
+        required=False, label='',
+        widget=UnfoldAdminTextInputWidget(attrs={'placeholder': 'Reports go to (employee ID)'}),
+    )
+
+
 @admin.register(Employee)
-class EmployeeAdmin(ImportExportModelAdmin, ModelAdmin):
+class EmployeeAdmin(LookupChoicesMixin, ReplicaExportMixin, ImportExportModelAdmin, ModelAdmin):
     resource_class = EmployeeResource
     import_form_class = ImportForm
     export_form_class = ExportForm
@@ -143,7 +364,7 @@ class EmployeeAdmin(ImportExportModelAdmin, ModelAdmin):
     )
     list_filter = (
         ('employment_status', MultipleChoicesDropdownFilter),
-        ('department', MultipleChoicesDropdownFilter),
+        ('department', LookupDropdownFilter),
         ('gender', MultipleChoicesDropdownFilter),
         ('hire_date', RangeDateFilter),
         'is_active'
@@ -153,6 +374,8 @@ class EmployeeAdmin(ImportExportModelAdmin, ModelAdmin):
         'user__email', 'user__username'
     )
     ordering = ('last_name', 'first_name')
+    list_select_related = ('department', 'position__department')
+    autocomplete_fields = ('user', 'direct_manager')
     inlines = [DirectReportsInline, EmployeeDocumentInline]
     
     fieldsets = (
@@ -199,12 +422,63 @@ class EmployeeAdmin(ImportExportModelAdmin, ModelAdmin):
         }),
     )
     readonly_fields = ('employee_id', 'created_at', 'updated_at')
+    action_form = EmploymentChangeForm
+    actions = ('apply_employment_change', 'terminate_selected')
+    # The EmploymentChangeForm fields passed on; the rest belong to ActionForm
+    employment_change_fields = (
+        'employment_status', 'department', 'direct_manager', 'termination_date', 'reassign_reports_to',
+    )
+    
+    def change_employment(self, request, queryset, employment_status=None):
+        """One set-based change for the whole selection; see hr.employment"""
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if not form.is_valid():
+            self.message_user(request, 'Invalid employment change.', messages.ERROR)
+            return
+        options = {
+            name: form.cleaned_data[name] for name in self.employment_change_fields if form.cleaned_data[name]
+        }
+        if employment_status:
+            options['employment_status'] = employment_status
+        for name in ('direct_manager', 'reassign_reports_to'):
+            if name in options:
+                manager = Employee.objects.filter(employee_id=options[name]).first()
+                if manager is None:
+                    self.message_user(request, f'No employee with ID {options[name]}.', messages.ERROR)
+                    return
+                options[name] = manager
+        options['reports_to'] = options.pop('reassign_reports_to', None)
+        try:
+            result = employment.apply_employment_change(queryset, **options)
+        except ValueError as e:
+            self.message_user(request, str(e), messages.ERROR)
+            return
+        self.message_user(
+            request,
+            f'{result.employees} employees updated, {result.reassigned_reports} direct reports reassigned, '
+            f'{result.cancelled_leave} future leave requests cancelled.',
+            messages.SUCCESS,
+        )
+
+    def apply_employment_change(self, request, queryset):
+        self.change_employment(request, queryset)
+    apply_employment_change.short_description = 'Apply employment change to selected employees'
+    apply_employment_change.allowed_permissions = ('change',)
+
+    def terminate_selected(self, request, queryset):
+        self.change_employment(request, queryset, employment_status='TERMINATED')
+    terminate_selected.short_description = 'Terminate selected employees'
+    terminate_selected.allowed_permissions = ('change',)
     
     def employee_photo_thumbnail(self, obj):
-        if obj.employee_photo:
+        urls = thumbnails.thumbnail_urls(obj.employee_photo)
+        if urls:
             return format_html(
-                '<img src="{}" width="40" height="40" style="border-radius: 50%;" />',
-                obj.employee_photo.url
+                '<picture><source srcset="{}" type="image/webp">'
+                '<img src="{}" width="40" height="40" loading="lazy" decoding="async" alt="" '
+                'style="border-radius: 50%;" /></picture>',
+                urls['WEBP'], urls['JPEG']
             )
         return format_html(
             '<div style="width: 40px; height: 40px; background: #e0e0e0; border-radius: 50%; display: flex; align-items: center; justify-content: center; font-size: 12px;">No Photo</div>'
@@ -237,14 +511,14 @@ class LeaveTypeAdmin(ModelAdmin):
 
 
 @admin.register(LeaveRequest)
-class LeaveRequestAdmin(ModelAdmin):
+class LeaveRequestAdmin(LookupChoicesMixin, ModelAdmin):
     list_display = (
         'employee', 'leave_type', 'start_date', 'end_date',
         'duration_days_display', 'status', 'created_at'
     )
     list_filter = (
         ('status', MultipleChoicesDropdownFilter),
-        ('leave_type', MultipleChoicesDropdownFilter),
+        ('leave_type', LookupDropdownFilter),
         ('start_date', RangeDateFilter),
         ('created_at', RangeDateFilter)
     )
@@ -264,11 +538,42 @@ class LeaveRequestAdmin(ModelAdmin):
         }),
     )
     readonly_fields = ('created_at', 'updated_at')
+    actions = ('approve_selected', 'reject_selected', 'cancel_selected')
     
     def duration_days_display(self, obj):
         return f"{obj.duration_days} days"
     duration_days_display.short_description = 'Duration'
 
+    def decide(self, request, queryset, status):
+        """One UPDATE for the whole selection; see hr.leave"""
+        decided_by = Employee.objects.filter(user=request.user).first()
+        # Counted first: a filtered selection may no longer match once decided
+        selected = queryset.count()
+        changed = leave.decide_leave_requests(queryset, status, decided_by=decided_by)
+        skipped = selected - len(changed)
+        label = dict(LeaveRequest.STATUS_CHOICES)[status].lower()
+        self.message_user(request, f'{len(changed)} leave requests {label}.', messages.SUCCESS)
+        if skipped:
+            self.message_user(
+                request, f'{skipped} leave requests were skipped: they cannot be {label} from their status.',
+                messages.WARNING,
+            )
+
+    def approve_selected(self, request, queryset):
+        self.decide(request, queryset, 'APPROVED')
+    approve_selected.short_description = 'Approve selected leave requests'
+    approve_selected.allowed_permissions = ('change',)
+
+    def reject_selected(self, request, queryset):
+        self.decide(request, queryset, 'REJECTED')
+    reject_selected.short_description = 'Reject selected leave requests'
+    reject_selected.allowed_permissions = ('change',)
+
+    def cancel_selected(self, request, queryset):
+        self.decide(request, queryset, 'CANCELLED')
+    cancel_selected.short_description = 'Cancel selected leave requests'
+    cancel_selected.allowed_permissions = ('change',)
+
 
 @admin.register(PerformanceReview)
 class PerformanceReviewAdmin(ModelAdmin):
@@ -341,7 +646,7 @@ class AttendanceAdmin(ModelAdmin):
     
     fieldsets = (
         ('Attendance Information', {
-            'fields': ('employee', 'date', 'status')
+            'fields': ('employee', 'date', 'status', 'leave_request')
         }),
         ('Time Information', {
             'fields': (
@@ -359,14 +664,42 @@ class AttendanceAdmin(ModelAdmin):
             'classes': ('collapse',)
         }),
     )
-    readonly_fields = ('created_at', 'updated_at')
+    # Written from approved leave by hr.attendance
+    readonly_fields = ('leave_request', 'created_at', 'updated_at')
+
+
+# Read-only audit view over attendance moved out of the live table
+@admin.register(ArchivedAttendance)
+class ArchivedAttendanceAdmin(ModelAdmin):
+    list_display = (
+        'employee', 'date', 'status', 'check_in_time',
+        'check_out_time', 'hours_worked', 'archived_at'
+    )
+    list_filter = (
+        ('status', MultipleChoicesDropdownFilter),
+        ('date', RangeDateFilter),
+    )
+    list_select_related = ('employee',)
+    search_fields = ('employee__first_name', 'employee__last_name')
+    ordering = ('-date',)
+    date_hierarchy = 'date'
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(EmployeeDocument)
-class EmployeeDocumentAdmin(ModelAdmin):
+class EmployeeDocumentAdmin(DocumentFileMixin, ModelAdmin):
     list_display = (
         'employee', 'document_type', 'title', 'upload_date',
-        'expiry_date', 'is_confidential'
+        'expiry_date', 'is_confidential', 'download_link'
     )
     list_filter = (
         ('document_type', MultipleChoicesDropdownFilter),
@@ -382,14 +715,14 @@ class EmployeeDocumentAdmin(ModelAdmin):
             'fields': ('employee', 'document_type', 'title', 'description')
         }),
         ('File Information', {
-            'fields': ('document_file', 'expiry_date', 'is_confidential')
+            'fields': ('document_file', 'download_link', 'expiry_date', 'is_confidential')
         }),
         ('System Information', {
             'fields': ('upload_date', 'uploaded_by'),
             'classes': ('collapse',)
         }),
     )
-    readonly_fields = ('upload_date', 'uploaded_by')
+    readonly_fields = ('upload_date', 'uploaded_by', 'download_link')
     
     def save_model(self, request, obj, form, change):
         if not change:  # Only set on creation
@@ -398,7 +731,7 @@ class EmployeeDocumentAdmin(ModelAdmin):
 
 
 # Extend User Admin to show employee profile link
-class EmployeeInline(StackedInline):
+class EmployeeInline(LookupChoicesMixin, StackedInline):
     model = Employee
     can_delete = False
     verbose_name_plural = 'Employee Profile'
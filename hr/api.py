@@ -0,0 +1,291 @@
+"""
+Read-only JSON API over employees, departments and positions, for
+integrations (payroll, directory sync) that would otherwise scrape exports.
+
+    GET /api/employees/?fields=id,first_name,department_name&limit=500
+    GET /api/employees/?cursor=<next cursor from the previous page>
+    GET /api/employees/42/?fields=employee_id,updated_at
+    GET /api/employees/?since=2026-10-01T00:00:00Z
+    GET /api/employees/deleted/?since=2026-10-01T00:00:00Z
+
+* ``fields`` selects the returned fields (default: all of them); only the
+  columns behind them are queried.
+* Lists are ordered by ``(updated_at, id)`` and paginated with an opaque
+  cursor, so each page is an index range scan however deep the client is.
+  A row updated between pages moves to the end and is returned again.
+* ``since`` limits a list to rows saved at or after it, and the
+  ``deleted/`` endpoints list the ids deleted since then (see hr.changes),
+  so a sync reads only what changed since its last run. ``updated_at`` is
+  the write time, not the commit time, so the next sync starts from the
+  newest ``updated_at`` it read, but no later than its own start minus
+  CHANGE_FEED_SAFETY_LAG_SECONDS.
+* Every response carries an ETag; sending it back in ``If-None-Match``
+  gets a bodiless 304 when nothing changed.
+
+Callers authenticate with a session or HTTP Basic auth and need the view
+permission on the model. Reads go to the read replica when one is set up.
+"""
+
+import base64
+import binascii
+import hashlib
+import json
+from datetime import datetime
+
+from django.contrib.auth import authenticate
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import urlencode
+from django.views.decorators.http import require_safe
+
+from hr_system.routers import replica_reads
+
+from .changes import deleted_since, parse_since
+from .models import Department, Employee, Position
+
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class Resource:
+    """A model exposed by the API: field name -> ORM lookup path."""
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+
+    @property
+    def permission(self):
+        return f'{self.model._meta.app_label}.view_{self.model._meta.model_name}'
+
+    def lookups(self, fields):
+        # id and updated_at are always read: they make up the cursor
+        names = dict.fromkeys(['id', 'updated_at', *fields])
+        return {name: self.fields[name] for name in names}
+
+    def rows(self, fields):
+        lookups = self.lookups(fields)
+        queryset = self.model._default_manager.order_by('updated_at', 'id')
+        return queryset.values(**{f'api_{name}': F(lookup) for name, lookup in lookups.items()})
+
+    def serialize(self, row, fields):
+        return {name: row[f'api_{name}'] for name in fields}
+
+
+RESOURCES = {
+    'departments': Resource(Department, {
+        'id': 'id',
+        'name': 'name',
+        'description': 'description',
+        'manager': 'manager_id',
+        'is_active': 'is_active',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }),
+    'positions': Resource(Position, {
+        'id': 'id',
+        'title': 'title',
+        'department': 'department_id',
+        'department_name': 'department__name',
+        'description': 'description',
+        'min_salary': 'min_salary',
+        'max_salary': 'max_salary',
+        'is_active': 'is_active',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }),
+    'employees': Resource(Employee, {
+        'id': 'id',
+        'employee_id': 'employee_id',
+        'first_name': 'first_name',
+        'middle_name': 'middle_name',
+        'last_name': 'last_name',
+        'personal_email': 'personal_email',
+        'phone_number': 'phone_number',
+        'department': 'department_id',
+        'department_name': 'department__name',
+        'position': 'position_id',
+        'position_title': 'position__title',
+        'direct_manager': 'direct_manager_id',
+        'hire_date': 'hire_date',
+        'employment_status': 'employment_status',
+        'termination_date': 'termination_date',
+        'salary': 'salary',
+        'salary_currency': 'salary_currency',
+        'city': 'city',
+        'state': 'state',
+        'country': 'country',
+        'is_active': 'is_active',
+        'created_at': 'created_at',
+        'updated_at': 'updated_at',
+    }),
+}
+
+
+class ApiError(Exception):
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _error(message, status):
+    response = JsonResponse({'error': message}, status=status)
+    if status == 401:
+        response['WWW-Authenticate'] = 'Basic realm="hr-api"'
+    return response
+
+
+def _authenticate(request):
+    user = request.user
+    header = request.headers.get('Authorization', '')
+    if not user.is_authenticated and header.startswith('Basic '):
+        try:
+            username, _, password = base64.b64decode(header[6:]).decode().partition(':')
+        except (binascii.Error, UnicodeDecodeError):
+            raise ApiError('Malformed Authorization header', 401)
+        user = authenticate(request, username=username, password=password)
+        if user is None:
+            raise ApiError('Invalid credentials', 401)
+    if not user.is_authenticated:
+        raise ApiError('Authentication required', 401)
+    return user
+
+
+def _fields(request, resource):
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(resource.fields)
+    fields = list(dict.fromkeys(name.strip() for name in requested.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in resource.fields]
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise ApiError('limit must be an integer')
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ApiError(f'limit must be between 1 and {MAX_LIMIT}')
+    return limit
+
+
+def encode_cursor(updated_at, pk):
+    raw = json.dumps([updated_at.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        updated_at, pk = json.loads(raw)
+        return datetime.fromisoformat(updated_at), int(pk)
+    except (ValueError, TypeError, binascii.Error):
+        raise ApiError('Invalid cursor')
+
+
+def after_cursor(queryset, cursor, field='updated_at'):
+    """Rows strictly after ``cursor`` in ``(field, id)`` order."""
+    value, pk = decode_cursor(cursor)
+    return queryset.filter(Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk}))
+
+
+def _since(request):
+    try:
+        return parse_since(request.GET['since']) if 'since' in request.GET else None
+    except ValueError as exc:
+        raise ApiError(str(exc))
+
+
+def _page(request, rows, limit, field, cursor):
+    """The first ``limit`` rows and the URL of the next page, if any."""
+    if request.GET.get('cursor'):
+        rows = after_cursor(rows, request.GET['cursor'], field)
+    # One extra row tells whether there is a next page
+    rows = list(rows[:limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    params = request.GET.copy()
+    params['cursor'] = encode_cursor(*cursor(rows[-1]))
+    return rows, f'{request.path}?{urlencode(params, doseq=True)}'
+
+
+def _json_response(request, payload):
+    body = json.dumps(payload, cls=DjangoJSONEncoder).encode()
+    etag = '"%s"' % hashlib.md5(body, usedforsecurity=False).hexdigest()
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    if etag in (tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')):
+        response = HttpResponseNotModified(headers=headers)
+    else:
+        response = HttpResponse(body, content_type='application/json', headers=headers)
+    patch_vary_headers(response, ['Authorization', 'Cookie'])
+    return response
+
+
+def api_view(view):
+    """Authenticate, check the view permission and turn ApiErrors into JSON."""
+    @require_safe
+    @replica_reads()
+    def wrapper(request, resource, *args, **kwargs):
+        try:
+            if resource not in RESOURCES:
+                raise ApiError('Not found', 404)
+            resource = RESOURCES[resource]
+            user = _authenticate(request)
+            if not user.has_perm(resource.permission):
+                raise ApiError('Permission denied', 403)
+            return view(request, resource, *args, **kwargs)
+        except ApiError as exc:
+            return _error(str(exc), exc.status)
+    wrapper.__name__ = view.__name__
+    wrapper.__doc__ = view.__doc__
+    return wrapper
+
+
+@api_view
+def resource_list(request, resource):
+    fields = _fields(request, resource)
+    limit = _limit(request)
+    since = _since(request)
+    rows = resource.rows(fields)
+    if since is not None:
+        rows = rows.filter(updated_at__gte=since)
+    rows, next_url = _page(
+        request, rows, limit, 'updated_at', lambda row: (row['api_updated_at'], row['api_id']),
+    )
+    return _json_response(request, {
+        'results': [resource.serialize(row, fields) for row in rows],
+        'next': next_url,
+    })
+
+
+@api_view
+def resource_deleted(request, resource):
+    limit = _limit(request)
+    since = _since(request)
+    if since is None:
+        raise ApiError('since is required')
+    tombstones, next_url = _page(
+        request, deleted_since(resource.model, since), limit, 'deleted_at',
+        lambda tombstone: (tombstone.deleted_at, tombstone.pk),
+    )
+    return _json_response(request, {
+        'results': [{'id': t.object_id, 'deleted_at': t.deleted_at} for t in tombstones],
+        'next': next_url,
+    })
+
+
+@api_view
+def resource_detail(request, resource, pk):
+    fields = _fields(request, resource)
+    row = resource.rows(fields).filter(pk=pk).first()
+    if row is None:
+        raise ApiError('Not found', 404)
+    return _json_response(request, resource.serialize(row, fields))
@@ -4,3 +4,41 @@ from django.apps import AppConfig
 class HrConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hr'
+
+    def ready(self):
+        # Connect the SQLite PRAGMA hook and the auth cache invalidation
+        import hr_system.db  # noqa: F401
+        import hr_system.auth_backends  # noqa: F401
+
+        from .cache import DASHBOARD, invalidate_on_change
+
+        invalidate_on_change(DASHBOARD, 'hr.Employee', 'hr.Department', 'hr.LeaveRequest', 'hr.Attendance')
+
+        from .lookups import LOOKUP_TABLES
+
+        for table in LOOKUP_TABLES.values():
+            table.connect()
+
+        from .badges import connect_badges
+
+        connect_badges()
+
+        from .changes import connect_tombstones
+
+        connect_tombstones()
+
+        from .thumbnails import connect_thumbnails
+
+        connect_thumbnails()
+
+        from .documents import connect_documents
+
+        connect_documents()
+
+        from .uploads import connect_uploads
+
+        connect_uploads()
+
+        from .attendance import connect_leave_attendance
+
+        connect_leave_attendance()
@@ -0,0 +1,108 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import BooleanField, Value
+from django.utils import timezone
+
+from .cache import DASHBOARD, invalidate
+from .models import Attendance, ArchivedAttendance
+
+
+logger = logging.getLogger(__name__)
+
+
+# Columns copied from the live table into the archive, primary key included
+# so that archived rows keep the id auditors may already have on record.
+ARCHIVE_FIELDS = (
+    'id', 'employee_id', 'date', 'check_in_time', 'check_out_time', 'status',
+    'hours_worked', 'overtime_hours', 'break_duration', 'notes', 'leave_request_id',
+    'created_at', 'updated_at',
+)
+
+
+def get_archive_cutoff(days=None):
+    """
+    Return the date before which attendance rows are considered cold.
+    """
+    if days is None:
+        days = settings.ATTENDANCE_ARCHIVE_AFTER_DAYS
+    return timezone.now().date() - timedelta(days=days)
+
+
+def archive_attendance(cutoff, batch_size=None, progress=None, conflicts=None):
+    """
+    Move attendance rows dated before ``cutoff`` into the archive table.
+
+    Rows are moved in primary key order, one short transaction per batch, so
+    the live table is never locked for longer than a single batch takes to
+    copy and delete. Re-running after an interruption is safe: rows that were
+    already copied are ignored on insert and removed from the live table.
+    A live row whose employee and date are already archived under another
+    id is not copied, so it stays in the live table: its ids are logged and
+    passed to ``conflicts``. Returns the number of rows moved.
+    """
+    if batch_size is None:
+        batch_size = settings.ATTENDANCE_ARCHIVE_BATCH_SIZE
+
+    moved = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Attendance.objects.filter(date__lt=cutoff, pk__gt=last_pk)
+                .order_by('pk')
+                .values(*ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1]['id']
+
+            archived_at = timezone.now()
+            ids = [row['id'] for row in rows]
+            ArchivedAttendance.objects.bulk_create(
+                [ArchivedAttendance(archived_at=archived_at, **row) for row in rows],
+                ignore_conflicts=True,
+            )
+            # Only rows that made it into the archive may leave the live table
+            copied = set(ArchivedAttendance.objects.filter(pk__in=ids).values_list('pk', flat=True))
+            # Archiving is not deletion: a raw DELETE leaves no tombstones for
+            # the change feed and sends no post_delete per row. Nothing
+            # references attendance rows, so there is nothing to cascade.
+            Attendance.objects.filter(pk__in=copied)._raw_delete(router.db_for_write(Attendance))
+
+        kept = [pk for pk in ids if pk not in copied]
+        if kept:
+            logger.warning('Attendance rows %s not archived: their day is already archived', kept)
+            if conflicts:
+                conflicts(kept)
+        moved += len(copied)
+        if progress:
+            progress(moved)
+
+    if moved:
+        # Once for the whole run, instead of per row through post_delete
+        invalidate(DASHBOARD)
+    return moved
+
+
+def attendance_history(*fields, **filters):
+    """
+    Query live and archived attendance as a single result set for audits.
+
+    Accepts the same keyword filters on both tables (e.g. ``employee=emp``,
+    ``date__range=(start, end)``) and returns a values queryset ordered by
+    date, newest first. ``is_archived`` tells the two sources apart.
+    """
+    fields = fields or tuple(f for f in ARCHIVE_FIELDS if f != 'id')
+    # The union is ordered by date, so it must be selected
+    if 'date' not in fields:
+        fields = (*fields, 'date')
+    live = Attendance.objects.filter(**filters).annotate(
+        is_archived=Value(False, output_field=BooleanField())
+    ).values(*fields, 'is_archived')
+    archived = ArchivedAttendance.objects.filter(**filters).annotate(
+        is_archived=Value(True, output_field=BooleanField())
+    ).values(*fields, 'is_archived')
+    return live.order_by().union(archived.order_by(), all=True).order_by('-date')
@@ -0,0 +1,156 @@
+"""
+Attendance for approved leave: every working day an approved LeaveRequest
+covers, and that has no attendance row yet, gets an ON_LEAVE row linked to
+the request, so reports count the absence once and nobody has to enter it
+by hand.
+
+``sync_leave_attendance`` brings the rows of any set of requests in line
+with their current status and dates:
+
+* linked rows the request no longer covers (it was cancelled, rejected or
+  shortened) are deleted. A row edited since it was written, with a
+  check-in or another status, is only unlinked;
+* the missing days of approved requests are written with one bulk insert.
+  Rows that already exist for a day, whether entered by hand (holidays,
+  absences, ON_LEAVE) or linked to another request, are left as they are,
+  so every linked row is one this module wrote.
+
+Only Monday to Friday are covered, as elsewhere in attendance, and only
+from the archive cutoff on (see hr.archive): older days are not written
+back into the live table, and days already archived count as present.
+Archiving keeps the link to the request.
+
+``hr.leave.decide_leave_requests`` calls it in the same transaction as the
+decision, and hooks on LeaveRequest cover single saves and deletions.
+``manage.py reconcile_leave_attendance`` reconciles historical data.
+"""
+
+from datetime import timedelta
+
+from django.db import router, transaction
+from django.db.models import F, Q
+from django.db.models.signals import post_save, pre_delete
+from django.utils import timezone
+
+from .cache import DASHBOARD, invalidate
+
+
+def covered_days(start, end):
+    """The working days from ``start`` to ``end`` inclusive."""
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            yield day
+        day += timedelta(days=1)
+
+
+def _release(stale):
+    """
+    Delete the rows in ``stale`` as written, unlink those edited since, and
+    return ``(employee, date)`` of the days deleted.
+    """
+    written = stale.filter(status='ON_LEAVE', check_in_time__isnull=True)
+    vacated = list(written.values_list('employee_id', 'date'))
+    if vacated:
+        written.delete()
+    stale.exclude(status='ON_LEAVE', check_in_time__isnull=True).update(
+        leave_request=None, updated_at=timezone.now(),
+    )
+    return vacated
+
+
+def _write(coverage, vacated, using, exclude=()):
+    """
+    Insert the missing days of the approved requests matching ``coverage``,
+    and of those covering ``vacated`` days, other than ``exclude``, and
+    return how many were written.
+    """
+    from .archive import get_archive_cutoff
+    from .models import ArchivedAttendance, Attendance, LeaveRequest
+
+    # Days before the archive cutoff belong to the archive, which is not rewritten
+    cutoff = get_archive_cutoff()
+    if vacated:
+        # A day given up by one request may still be covered by another
+        days = [day for _, day in vacated]
+        coverage |= Q(
+            employee_id__in={employee for employee, _ in vacated},
+            start_date__lte=max(days), end_date__gte=min(days),
+        )
+    requests = list(
+        LeaveRequest.objects.using(using).filter(coverage, status='APPROVED', end_date__gte=cutoff)
+        .exclude(pk__in=exclude).order_by('pk').values_list('pk', 'employee_id', 'start_date', 'end_date')
+    )
+    if not requests:
+        return 0
+
+    span = {
+        'employee_id__in': {employee for _, employee, _, _ in requests},
+        'date__gte': max(cutoff, min(start for _, _, start, _ in requests)),
+        'date__lte': max(end for _, _, _, end in requests),
+    }
+    # Archived days count as present too, should a later cutoff have moved them
+    existing = set(Attendance.objects.using(using).filter(**span).values_list('employee_id', 'date'))
+    existing.update(ArchivedAttendance.objects.using(using).filter(**span).values_list('employee_id', 'date'))
+    # Keyed by (employee, date): where approved requests overlap, a day is
+    # written once, for the first of them
+    rows = {}
+    for pk, employee, start, end in requests:
+        for day in covered_days(max(start, cutoff), end):
+            if (employee, day) not in existing and (employee, day) not in rows:
+                rows[employee, day] = Attendance(
+                    employee_id=employee, date=day, status='ON_LEAVE', leave_request_id=pk,
+                )
+    if rows:
+        # ignore_conflicts: a row entered concurrently wins over the generated one
+        Attendance.objects.using(using).bulk_create(rows.values(), ignore_conflicts=True)
+    return len(rows)
+
+
+def sync_leave_attendance(ids):
+    """
+    Reconcile the ON_LEAVE attendance of the leave requests ``ids`` and
+    return ``(days written, rows removed)``.
+    """
+    from .models import Attendance
+
+    ids = list(ids)
+    using = router.db_for_write(Attendance)
+    with transaction.atomic(using=using):
+        vacated = _release(
+            Attendance.objects.using(using).filter(leave_request__in=ids).exclude(
+                leave_request__status='APPROVED',
+                date__gte=F('leave_request__start_date'),
+                date__lte=F('leave_request__end_date'),
+            ),
+        )
+        written = _write(Q(pk__in=ids), vacated, using)
+        if written or vacated:
+            # bulk_create() sends no post_save to invalidate the dashboard
+            transaction.on_commit(lambda: invalidate(DASHBOARD), using=using)
+    return written, len(vacated)
+
+
+def _sync_saved_request(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_leave_attendance([instance.pk])
+
+
+def _release_deleted_request(sender, instance, using=None, **kwargs):
+    from .models import Attendance
+
+    # Runs before the link is cleared by SET_NULL; other requests covering
+    # the same days take them over
+    vacated = _release(Attendance.objects.using(using).filter(leave_request=instance))
+    if vacated:
+        _write(Q(pk__in=[]), vacated, using, exclude=[instance.pk])
+        transaction.on_commit(lambda: invalidate(DASHBOARD), using=using)
+
+
+def connect_leave_attendance():
+    post_save.connect(
+        _sync_saved_request, sender='hr.LeaveRequest', dispatch_uid='hr.attendance:sync_saved_request',
+    )
+    pre_delete.connect(
+        _release_deleted_request, sender='hr.LeaveRequest', dispatch_uid='hr.attendance:release_deleted_request',
+    )
@@ -0,0 +1,48 @@
+"""
+Sidebar badge callbacks, referenced by dotted path from UNFOLD["SIDEBAR"].
+
+Each count is cached in its own ``hr.cache`` namespace and recounted only
+after a row of the model it counts is saved or deleted (see
+``connect_badges``), so rendering the sidebar costs no queries on a warm
+cache. A count of zero hides the badge, as does lacking view permission
+on the counted model.
+"""
+
+from django.utils import timezone
+
+from .cache import get_or_set, invalidate_on_change
+
+
+LEAVE_BADGES = 'badges:leave'
+DOCUMENT_BADGES = 'badges:documents'
+
+
+def _count_pending_leave_requests():
+    from .models import LeaveRequest
+
+    return LeaveRequest.objects.filter(status='PENDING').count()
+
+
+def _count_expiring_documents(today):
+    from .expiry import expiring_documents
+
+    return expiring_documents(today).count()
+
+
+def pending_leave_requests(request):
+    if not request.user.has_perm('hr.view_leaverequest'):
+        return 0
+    return get_or_set(LEAVE_BADGES, 'pending', _count_pending_leave_requests)
+
+
+def expiring_documents(request):
+    if not request.user.has_perm('hr.view_employeedocument'):
+        return 0
+    # Keyed by date, so the window moves at midnight without a change
+    today = timezone.localdate()
+    return get_or_set(DOCUMENT_BADGES, 'expiring', _count_expiring_documents, args=(today,))
+
+
+def connect_badges():
+    invalidate_on_change(LEAVE_BADGES, 'hr.LeaveRequest')
+    invalidate_on_change(DOCUMENT_BADGES, 'hr.EmployeeDocument')
@@ -0,0 +1,218 @@
+"""
+Admin performance benchmarks and per-view SQL query budgets.
+
+`run_admin_benchmarks()` requests the changelist, change form, search,
+filter and export views of every registered ModelAdmin, plus the
+dashboard, and records wall-clock timings and query counts. The same
+budgets are asserted by `hr.tests` on a small dataset and reported by
+`manage.py benchmark_admin` on large ones, so a view whose query count
+grows with the number of rows (an N+1) fails both.
+"""
+
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.contrib import admin
+from django.db import connection
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import NoReverseMatch, reverse
+
+from hr_system.utils import dashboard_callback
+
+from .cache import DASHBOARD, invalidate
+from .models import Employee, EmployeeDocument, PerformanceReview
+
+
+# Upper bound on SQL queries per view. Budgets are independent of dataset
+# size: a view that needs more queries as the table grows is a regression.
+DEFAULT_QUERY_BUDGETS = {
+    'changelist': 8,
+    'change': 12,
+    'search': 8,
+    'filter': 8,
+    'export': 5,
+    'dashboard': 16,
+    'dashboard_callback': 14,
+}
+
+# Per-model overrides for views that legitimately need more queries,
+# keyed by (app_label.model_name, view)
+QUERY_BUDGET_OVERRIDES = {
+    # Two inlines plus department/position selects
+    ('hr.employee', 'change'): 16,
+    # Employee profile inline plus group/permission pickers
+    ('auth.user', 'change'): 16,
+}
+
+# A representative list_filter selection per model; models missing here
+# are not benchmarked for filtering
+FILTER_PARAMS = {
+    'hr.department': {'is_active__exact': '1'},
+    'hr.position': {'is_active__exact': '1'},
+    'hr.employee': {'employment_status__exact': 'ACTIVE'},
+    'hr.leavetype': {'is_paid__exact': '1'},
+    'hr.leaverequest': {'status__exact': 'APPROVED'},
+    'hr.performancereview': {'is_final__exact': '1'},
+    'hr.attendance': {'status__exact': 'PRESENT'},
+    'hr.archivedattendance': {'status__exact': 'PRESENT'},
+    'hr.employeedocument': {'is_confidential__exact': '0'},
+    'auth.user': {'is_staff__exact': '1'},
+}
+
+SEARCH_TERM = 'son'
+
+
+def get_query_budget(label, view):
+    return QUERY_BUDGET_OVERRIDES.get((label, view), DEFAULT_QUERY_BUDGETS[view])
+
+
+def ensure_benchmark_objects():
+    """
+    Make sure every model has at least one row so each change form can be
+    benchmarked. The bulk sample data does not cover reviews or documents.
+    """
+    employees = list(Employee.objects.order_by('pk')[:2])
+    if len(employees) < 2:
+        return
+    if not PerformanceReview.objects.exists():
+        PerformanceReview.objects.create(
+            employee=employees[0],
+            reviewer=employees[1],
+            review_period_start=date.today() - timedelta(days=365),
+            review_period_end=date.today(),
+            overall_rating=4,
+            goals_achievement=4,
+            quality_of_work=4,
+            communication=3,
+            teamwork=5,
+            strengths='Benchmark fixture',
+            areas_for_improvement='Benchmark fixture',
+            goals_for_next_period='Benchmark fixture',
+        )
+    if not EmployeeDocument.objects.exists():
+        EmployeeDocument.objects.create(
+            employee=employees[0],
+            document_type='CONTRACT',
+            title='Benchmark fixture',
+            document_file='employee_documents/benchmark.pdf',
+            expiry_date=date.today() + timedelta(days=30),
+        )
+
+
+def positive_int(value):
+    """argparse type for ``--repeat``: at least one timed call is needed."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be a positive integer, not {value!r}')
+    return number
+
+
+def _measure(func, repeat):
+    """
+    Call ``func`` once to warm up, then ``repeat`` times while timing.
+    Queries are captured on the last call.
+    """
+    func()
+    timings = []
+    for i in range(repeat):
+        if i == repeat - 1:
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                result = func()
+                timings.append(time.perf_counter() - started)
+        else:
+            started = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - started)
+    return result, timings, len(ctx.captured_queries)
+
+
+def _result(label, view, url, status, timings, queries):
+    budget = get_query_budget(label, view)
+    return {
+        'model': label,
+        'view': view,
+        'url': url,
+        'status': status,
+        'queries': queries,
+        'query_budget': budget,
+        'within_budget': queries <= budget,
+        'min_ms': round(min(timings) * 1000, 2),
+        'median_ms': round(statistics.median(timings) * 1000, 2),
+    }
+
+
+def get_view_requests(model_admin):
+    """
+    Yield ``(view, method, url, data)`` for every benchmarked view of a
+    ModelAdmin.
+    """
+    opts = model_admin.model._meta
+    label = f'{opts.app_label}.{opts.model_name}'
+    prefix = f'admin:{opts.app_label}_{opts.model_name}'
+
+    changelist_url = reverse(f'{prefix}_changelist')
+    yield 'changelist', 'get', changelist_url, None
+
+    obj = model_admin.model._default_manager.order_by('pk').first()
+    if obj is not None:
+        yield 'change', 'get', reverse(f'{prefix}_change', args=[obj.pk]), None
+
+    if model_admin.search_fields:
+        yield 'search', 'get', changelist_url, {'q': SEARCH_TERM}
+
+    if label in FILTER_PARAMS:
+        yield 'filter', 'get', changelist_url, FILTER_PARAMS[label]
+
+    if hasattr(model_admin, 'export_action'):
+        try:
+            export_url = reverse(f'{prefix}_export')
+        except NoReverseMatch:
+            pass
+        else:
+            formats = [f().get_title() for f in model_admin.get_export_formats()]
+            yield 'export', 'post', export_url, {
+                'format': str(formats.index('csv')) if 'csv' in formats else '0',
+                'resource': '0',
+            }
+
+
+def run_admin_benchmarks(user, repeat=3):
+    """
+    Benchmark every registered ModelAdmin and the dashboard as ``user``.
+    Returns a list of result dicts sorted by model and view.
+    """
+    client = Client()
+    client.force_login(user)
+    results = []
+
+    for model, model_admin in admin.site._registry.items():
+        opts = model._meta
+        label = f'{opts.app_label}.{opts.model_name}'
+        for view, method, url, data in get_view_requests(model_admin):
+            request = getattr(client, method)
+            response, timings, queries = _measure(lambda: request(url, data), repeat)
+            results.append(_result(label, view, url, response.status_code, timings, queries))
+
+    index_url = reverse('admin:index')
+    response, timings, queries = _measure(lambda: client.get(index_url), repeat)
+    results.append(_result('admin', 'dashboard', index_url, response.status_code, timings, queries))
+
+    request = RequestFactory().get(index_url)
+    request.user = user
+
+    def cold_dashboard_callback():
+        # Measure the uncached path; the admin index above is served warm
+        invalidate(DASHBOARD)
+        return dashboard_callback(request, {})
+
+    _, timings, queries = _measure(cold_dashboard_callback, repeat)
+    results.append(_result('admin', 'dashboard_callback', None, 200, timings, queries))
+
+    return sorted(results, key=lambda r: (r['model'], r['view']))
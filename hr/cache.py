@@ -0,0 +1,116 @@
+"""
+Namespaced, versioned caching helpers for the HR app.
+
+Every key belongs to a namespace (``dashboard``, an admin filter, an
+export ...) and embeds the namespace's current version. ``invalidate(namespace)``
+bumps the version, which orphans every key in the namespace at once; the
+orphans simply expire. Keys look like ``hr:<namespace>:v<version>:<name>``.
+
+    @memoize('dashboard', timeout=60)
+    def leave_summary(year):
+        ...
+
+    invalidate_on_change('dashboard', 'hr.LeaveRequest')
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from hr_system.routers import primary_reads
+
+
+DASHBOARD = 'dashboard'
+
+_VERSION_KEY = 'hr:{namespace}:version'
+_MISSING = object()
+
+
+def _new_version():
+    # Versions start from a timestamp rather than 1, so a version key that
+    # was evicted never restarts at a number whose keys may still be cached
+    return int(time.time() * 1000)
+
+
+def namespace_version(namespace):
+    key = _VERSION_KEY.format(namespace=namespace)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def make_key(namespace, name, *args, **kwargs):
+    key = f'hr:{namespace}:v{namespace_version(namespace)}:{name}'
+    if args or kwargs:
+        arguments = repr((args, sorted(kwargs.items())))
+        key += ':' + hashlib.md5(arguments.encode(), usedforsecurity=False).hexdigest()
+    return key
+
+
+def get_or_set(namespace, name, compute, timeout=DEFAULT_TIMEOUT, args=(), kwargs=None):
+    """
+    Return the cached value for ``name`` in ``namespace``, calling
+    ``compute(*args, **kwargs)`` and caching its result on a miss. None
+    results are cached too.
+    """
+    kwargs = kwargs or {}
+    key = make_key(namespace, name, *args, **kwargs)
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        # Always from the primary: a lagging replica would be cached under
+        # the current version until the next change
+        with primary_reads():
+            value = compute(*args, **kwargs)
+        cache.set(key, value, timeout)
+    return value
+
+
+def memoize(namespace, timeout=DEFAULT_TIMEOUT, name=None):
+    """
+    Cache a function's result per argument list in ``namespace``. The
+    arguments must have a stable repr(), e.g. ids, dates and strings.
+    """
+    def decorator(func):
+        key_name = name or f'{func.__module__}.{func.__qualname__}'
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_set(namespace, key_name, func, timeout, args, kwargs)
+
+        wrapper.uncached = func
+        return wrapper
+    return decorator
+
+
+def invalidate(*namespaces):
+    """Drop every cached value in the given namespaces."""
+    for namespace in namespaces:
+        key = _VERSION_KEY.format(namespace=namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), timeout=None)
+
+
+def invalidate_on_change(namespace, *models):
+    """Invalidate ``namespace`` whenever an instance of ``models`` is saved or deleted."""
+    def receiver(sender, using=None, **kwargs):
+        # Once now, so this request sees its own change, and again after
+        # commit: a process that reloaded in between read the old rows
+        invalidate(namespace)
+        transaction.on_commit(lambda: invalidate(namespace), using=using)
+
+    for model in models:
+        if isinstance(model, str):
+            model = apps.get_model(model)
+        dispatch_uid = f'hr.cache:{namespace}:{model._meta.label}'
+        post_save.connect(receiver, sender=model, weak=False, dispatch_uid=dispatch_uid)
+        post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=dispatch_uid)
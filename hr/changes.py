@@ -0,0 +1,93 @@
+"""
+Change feed: what changed in an hr model since a point in time, so that
+downstream syncs read the rows touched since their last run instead of
+re-exporting whole tables.
+
+Changed rows come from ``updated_at`` (indexed together with ``id``).
+That is the time a row was written, not committed: a transaction still
+open when the feed is read commits rows older than the newest one read.
+The next ``since`` is therefore never later than the read's start minus
+CHANGE_FEED_SAFETY_LAG_SECONDS (see ``next_since``), which must exceed the
+longest write transaction; rows saved within the lag are sent again, so
+consumers apply upserts idempotently. Deleted rows leave a Tombstone, written in the deleting transaction by a
+post_delete receiver. Attendance moved to the archive (hr.archive) is not
+deleted and leaves none. Tombstones older than TOMBSTONE_RETENTION_DAYS are
+purged by ``manage.py changes --purge``: a consumer that has not synced
+for longer than that must re-export in full.
+
+Exposed by ``manage.py changes`` and, for the models the JSON API serves,
+by ``?since=`` on its list endpoints and ``/api/<resource>/deleted/``.
+"""
+
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models.signals import post_delete
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+
+# Models with an auto_now ``updated_at`` whose changes are fed downstream
+TRACKED_MODELS = (
+    'hr.Department',
+    'hr.Position',
+    'hr.Employee',
+    'hr.LeaveRequest',
+    'hr.PerformanceReview',
+    'hr.Attendance',
+)
+
+
+def parse_since(value):
+    """An ISO 8601 timestamp, as the ``since`` of a change feed query."""
+    since = parse_datetime(value) if value else None
+    if since is None:
+        raise ValueError(f'Invalid timestamp: {value!r}')
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def changed_since(model, since):
+    """Rows of ``model`` saved at or after ``since``, oldest first."""
+    return model._default_manager.filter(updated_at__gte=since).order_by('updated_at', 'id')
+
+
+def next_since(watermark, started):
+    """
+    The ``since`` for the next read of a feed read from ``started`` on,
+    whose newest change was at ``watermark``.
+    """
+    return min(watermark, started - timedelta(seconds=settings.CHANGE_FEED_SAFETY_LAG_SECONDS))
+
+
+def deleted_since(model, since):
+    """Tombstones of ``model`` rows deleted at or after ``since``, oldest first."""
+    from .models import Tombstone
+
+    return Tombstone.objects.filter(model=model._meta.label_lower, deleted_at__gte=since)
+
+
+def record_tombstone(sender, instance, using, **kwargs):
+    from .models import Tombstone
+
+    Tombstone.objects.using(using).create(model=sender._meta.label_lower, object_id=instance.pk)
+
+
+def connect_tombstones():
+    for label in TRACKED_MODELS:
+        post_delete.connect(
+            record_tombstone, sender=apps.get_model(label), dispatch_uid=f'hr.changes:{label}',
+        )
+
+
+def purge_tombstones(days=None):
+    """Delete tombstones older than ``days`` (default TOMBSTONE_RETENTION_DAYS)."""
+    from .models import Tombstone
+
+    if days is None:
+        days = settings.TOMBSTONE_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
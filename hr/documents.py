@@ -0,0 +1,172 @@
+"""
+Content-addressed storage for employee documents.
+
+Uploads are hashed (SHA-256) while they are streamed to disk and stored as
+``employee_documents/<2 hex>/<sha256><ext>``, so the hundredth upload of the
+same contract template or ID scan reuses the file already stored. A file is
+shared by every document row whose ``document_file`` names it: those rows are
+its references, counted with an indexed lookup. When the last one is deleted
+or pointed at another file, the file is removed after the transaction commits,
+unless it was stored within DOCUMENT_RELEASE_GRACE_SECONDS: an upload of the
+same content may have reused it without having committed its row yet.
+``manage.py purge_documents`` deletes such files once nothing references them.
+
+Files uploaded before this storage keep their original names and are served
+as before. Downloads go through ``hr.views.document_download``, which
+supports conditional and Range requests; the hash doubles as a strong ETag.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage, storages
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+
+HASHED_NAME = re.compile(r'^[0-9a-f]{64}$')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage naming each file after the SHA-256 of its content."""
+
+    chunk_size = 64 * 1024
+
+    def get_available_name(self, name, max_length=None):
+        # _save derives the final name from the content; identical content
+        # must map to the same name rather than get a suffix
+        return name
+
+    def _save(self, name, content):
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        os.makedirs(self.path(directory), exist_ok=True)
+        if hasattr(content, 'temporary_file_path'):
+            # Already on disk (a large form upload or a chunked upload):
+            # hash it in place and move it, rather than copy it
+            temp_path = content.temporary_file_path()
+            digest = hashlib.sha256()
+            with open(temp_path, 'rb') as fh:
+                for chunk in iter(lambda: fh.read(self.chunk_size), b''):
+                    digest.update(chunk)
+        else:
+            # Written next to its destination, so the final move is an atomic rename
+            fd, temp_path = tempfile.mkstemp(dir=self.path(directory), prefix='.upload-')
+            try:
+                digest = hashlib.sha256()
+                with os.fdopen(fd, 'wb') as fh:
+                    for chunk in content.chunks():
+                        digest.update(chunk)
+                        fh.write(chunk)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        sha = digest.hexdigest()
+        name = f'{directory}/{sha[:2]}/{sha}{extension}'
+        path = self.path(name)
+        try:
+            # Reusing the stored file: touching it tells a concurrent release()
+            # that a reference to it may be about to commit
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            file_move_safe(temp_path, path)
+            if self.file_permissions_mode is not None:
+                os.chmod(path, self.file_permissions_mode)
+        else:
+            os.remove(temp_path)
+        return name
+
+
+def document_storage():
+    return storages['documents']
+
+
+def content_hash(name):
+    """The SHA-256 a content-addressed file is named after, or None."""
+    stem = os.path.splitext(os.path.basename(name))[0]
+    return stem if HASHED_NAME.match(stem) else None
+
+
+def recently_stored(storage, name):
+    """Whether ``name`` was written or reused within DOCUMENT_RELEASE_GRACE_SECONDS."""
+    try:
+        modified = os.path.getmtime(storage.path(name))
+    except FileNotFoundError:
+        return False
+    return time.time() - modified < settings.DOCUMENT_RELEASE_GRACE_SECONDS
+
+
+def release(name):
+    """
+    Delete the file ``name`` unless a document still references it. A shared
+    file stored within the grace period is kept, as the row of an upload that
+    reused it may not have committed yet; purge_unreferenced() removes it
+    later if nothing references it.
+    """
+    from .models import EmployeeDocument
+
+    if not name or EmployeeDocument.objects.filter(document_file=name).exists():
+        return
+    storage = document_storage()
+    if content_hash(name) and recently_stored(storage, name):
+        return
+    storage.delete(name)
+
+
+def purge_unreferenced(directory='employee_documents'):
+    """
+    Delete the content-addressed files under ``directory`` that no document
+    references and that were not stored within the grace period. Returns the
+    number of files deleted.
+    """
+    from .models import EmployeeDocument
+
+    storage = document_storage()
+    if not storage.exists(directory):
+        return 0
+    purged = 0
+    for subdirectory in storage.listdir(directory)[0]:
+        names = [
+            f'{directory}/{subdirectory}/{filename}'
+            for filename in storage.listdir(f'{directory}/{subdirectory}')[1] if content_hash(filename)
+        ]
+        referenced = set(EmployeeDocument.objects.filter(document_file__in=names).values_list('document_file', flat=True))
+        for name in names:
+            if name not in referenced and not recently_stored(storage, name):
+                storage.delete(name)
+                purged += 1
+    return purged
+
+
+def _remember_previous_file(sender, instance, raw=False, **kwargs):
+    instance._previous_file = None
+    if instance.pk and not raw:
+        instance._previous_file = (
+            sender.objects.filter(pk=instance.pk).values_list('document_file', flat=True).first()
+        )
+
+
+def _release_replaced_file(sender, instance, using=None, **kwargs):
+    previous = getattr(instance, '_previous_file', None)
+    if previous and previous != instance.document_file.name:
+        transaction.on_commit(lambda: release(previous), using=using)
+
+
+def _release_deleted_file(sender, instance, using=None, **kwargs):
+    name = instance.document_file.name
+    transaction.on_commit(lambda: release(name), using=using)
+
+
+def connect_documents():
+    for signal, receiver in (
+        (pre_save, _remember_previous_file),
+        (post_save, _release_replaced_file),
+        (post_delete, _release_deleted_file),
+    ):
+        signal.connect(receiver, sender='hr.EmployeeDocument', dispatch_uid=f'hr.documents:{receiver.__name__}')
@@ -0,0 +1,118 @@
+"""
+Bulk employment changes for reorganisations and layoffs: set the status,
+department, direct manager and/or termination date of any number of
+employees with set-based queries, in one transaction.
+
+When employees leave (TERMINATED or INACTIVE), the same transaction:
+
+* moves their direct reports to ``reports_to`` if given, or else to the
+  departing manager's own manager, skipping managers who leave too (one
+  UPDATE for all reports);
+* hands the departments they manage to ``reports_to`` (or no one);
+* cancels their leave starting after the termination date, or after
+  today without one (one UPDATE, see hr.leave).
+
+Used by the EmployeeAdmin actions and ``manage.py change_employment``.
+Queryset updates send no ``post_save``, so the caches that depend on
+employees and departments are invalidated here, and ``updated_at`` is set
+explicitly for the change feed.
+"""
+
+from collections import namedtuple
+
+from django.db import router, transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+
+from .cache import DASHBOARD, invalidate
+
+
+# Statuses in which an employee no longer manages anyone or takes leave
+DEPARTED_STATUSES = ('TERMINATED', 'INACTIVE')
+
+EmploymentChange = namedtuple('EmploymentChange', 'employees reassigned_reports cancelled_leave')
+
+
+def _successors(managers, previous, reports_to):
+    """
+    New manager for the reports of each departing manager in ``managers``.
+    ``previous`` maps every departing employee to their manager before the
+    change, so the walk up skips any number of levels that leave together.
+    """
+    if reports_to is not None:
+        return dict.fromkeys(managers, reports_to.pk)
+    successors = {}
+    for manager in managers:
+        seen = {manager}
+        successor = previous[manager]
+        while successor in previous and successor not in seen:
+            seen.add(successor)
+            successor = previous[successor]
+        successors[manager] = None if successor in previous else successor
+    return successors
+
+
+def apply_employment_change(queryset, employment_status=None, department=None, direct_manager=None,
+                            termination_date=None, reports_to=None):
+    """
+    Apply the given changes to every employee in ``queryset``; arguments
+    left as None are not changed, except that terminating without a
+    ``termination_date`` terminates as of today. ``reports_to`` (an Employee) takes over
+    the reports and departments of employees who leave. Returns an
+    EmploymentChange with the number of employees, reassigned reports and
+    cancelled leave requests.
+    """
+    from .leave import decide_leave_requests
+    from .lookups import departments
+    from .models import Department, Employee, LeaveRequest
+
+    if employment_status == 'TERMINATED' and termination_date is None:
+        termination_date = timezone.localdate()
+    changes = {
+        name: value for name, value in (
+            ('employment_status', employment_status),
+            ('department', department),
+            ('direct_manager', direct_manager),
+            ('termination_date', termination_date),
+        ) if value is not None
+    }
+    if not changes:
+        raise ValueError('No change given')
+
+    now = timezone.now()
+    using = router.db_for_write(Employee)
+    with transaction.atomic(using=using):
+        # Managers as they were before the change, to find skip-level successors
+        current = dict(queryset.using(using).values_list('pk', 'direct_manager_id'))
+        ids = set(current)
+        for role, employee in (('direct manager', direct_manager), ('replacement manager', reports_to)):
+            if employee is not None and employee.pk in ids:
+                raise ValueError(f'The {role} cannot be one of the selected employees')
+        if not ids:
+            return EmploymentChange(0, 0, 0)
+
+        Employee.objects.using(using).filter(pk__in=ids).update(**changes, updated_at=now)
+
+        reassigned = cancelled = 0
+        if employment_status in DEPARTED_STATUSES:
+            reports = Employee.objects.using(using).filter(direct_manager__in=ids).exclude(pk__in=ids)
+            managers = set(reports.values_list('direct_manager_id', flat=True).distinct())
+            if managers:
+                successors = _successors(managers, current, reports_to)
+                reassigned = reports.update(
+                    direct_manager_id=Case(
+                        *(When(direct_manager_id=old, then=Value(new)) for old, new in successors.items()),
+                    ),
+                    updated_at=now,
+                )
+            Department.objects.using(using).filter(manager__in=ids).update(manager=reports_to, updated_at=now)
+
+            # INACTIVE may come without a date: cancel the leave still to come
+            leave_from = termination_date or timezone.localdate()
+            cancelled = len(decide_leave_requests(
+                LeaveRequest.objects.filter(employee__in=ids, start_date__gt=leave_from), 'CANCELLED',
+                notify=False,
+            ))
+
+        transaction.on_commit(lambda: invalidate(DASHBOARD, departments.namespace), using=using)
+    return EmploymentChange(len(ids), reassigned, cancelled)
@@ -0,0 +1,93 @@
+"""
+Expiring employee documents: contracts, certificates and ID copies whose
+``expiry_date`` falls within the next N days (DOCUMENT_EXPIRY_WARNING_DAYS
+by default).
+
+One indexed range query finds them, with the employee and both possible
+managers joined in. ``manage.py notify_expiring_documents`` mails each
+manager a single list of their reports' documents, all messages over one
+SMTP connection; the dashboard shows the soonest to expire.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+
+def expiring_documents(today, days=None):
+    """Documents expiring between ``today`` and ``days`` later, soonest first."""
+    from .models import EmployeeDocument
+
+    if days is None:
+        days = settings.DOCUMENT_EXPIRY_WARNING_DAYS
+    return EmployeeDocument.objects.filter(
+        expiry_date__gte=today, expiry_date__lte=today + timedelta(days=days),
+    ).select_related(
+        'employee',
+        'employee__direct_manager__user',
+        'employee__department__manager__user',
+    ).order_by('expiry_date', 'pk')
+
+
+def manager_of(employee):
+    """The employee's direct manager, or else their department's manager."""
+    manager = employee.direct_manager
+    if manager is None and employee.department is not None:
+        manager = employee.department.manager
+    # Nobody is notified about their own documents as their own manager
+    return manager if manager is not None and manager.pk != employee.pk else None
+
+
+def notification_address(manager):
+    if manager is None:
+        return settings.DOCUMENT_EXPIRY_FALLBACK_EMAIL
+    return manager.user.email or manager.personal_email
+
+
+def group_by_recipient(documents):
+    """``{email: [documents]}``, and the documents nobody can be told about."""
+    groups, unassigned = defaultdict(list), []
+    for document in documents:
+        address = notification_address(manager_of(document.employee))
+        if address:
+            groups[address].append(document)
+        else:
+            unassigned.append(document)
+    return groups, unassigned
+
+
+def build_message(address, documents, today, connection):
+    lines = [
+        f'- {document.employee.full_name}: {document.title} '
+        f'({document.get_document_type_display()}) expires on {document.expiry_date:%Y-%m-%d}'
+        f' (in {(document.expiry_date - today).days} days)'
+        for document in documents
+    ]
+    body = (
+        f'The following documents of your team expire soon and may need renewing:\n\n'
+        + '\n'.join(lines)
+        + '\n'
+    )
+    subject = f'{len(documents)} employee document{"s" if len(documents) != 1 else ""} expiring soon'
+    return EmailMessage(subject, body, to=[address], connection=connection)
+
+
+def notify_expiring_documents(today, days=None, dry_run=False):
+    """
+    Email every manager the expiring documents of their reports and return
+    ``(emails sent, documents listed, documents without a recipient)``.
+    """
+    groups, unassigned = group_by_recipient(expiring_documents(today, days))
+    listed = sum(len(documents) for documents in groups.values())
+    if dry_run or not groups:
+        return len(groups), listed, unassigned
+    # One connection for the whole batch instead of one login per message
+    with get_connection() as connection:
+        messages = [
+            build_message(address, documents, today, connection)
+            for address, documents in sorted(groups.items())
+        ]
+        sent = connection.send_messages(messages) or 0
+    return sent, listed, unassigned
@@ -0,0 +1,117 @@
+from importlib.util import find_spec
+
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+
+def validate_phone_number(value):
+    from phonenumber_field.validators import validate_international_phonenumber
+
+    validate_international_phonenumber(value)
+
+
+class LazyPhoneNumberDescriptor:
+    """
+    Like phonenumber_field's descriptor, but values loaded from the database
+    stay strings until the attribute is read.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        if self.field.name not in instance.__dict__:
+            instance.refresh_from_db(fields=[self.field.name])
+        value = instance.__dict__[self.field.name]
+        if isinstance(value, str) and value:
+            value = instance.__dict__[self.field.name] = self.field.to_python(value)
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.name] = value
+
+
+class PhoneNumberField(models.CharField):
+    """
+    phonenumber_field's PhoneNumberField without importing the phonenumbers
+    package (and its metadata tables) at startup: it is loaded the first
+    time a number is read, saved, validated or edited in a form. Stored
+    values and form behaviour are the same. The region is checked then too,
+    not by the system checks every management command runs.
+    """
+
+    default_validators = [validate_phone_number]
+    description = _('Phone number')
+
+    def __init__(self, *args, region=None, **kwargs):
+        kwargs.setdefault('max_length', 128)
+        super().__init__(*args, **kwargs)
+        self._region = region
+
+    @cached_property
+    def phone_field(self):
+        from phonenumber_field.modelfields import PhoneNumberField
+
+        _, _, args, kwargs = self.deconstruct()
+        field = PhoneNumberField(*args, **kwargs)
+        field.set_attributes_from_name(self.name)
+        field.model = self.model
+        errors = field._check_region()
+        if errors:
+            raise ImproperlyConfigured(f'{self.model._meta.label}.{self.name}: {errors[0].msg}')
+        return field
+
+    @property
+    def region(self):
+        return self.phone_field.region
+
+    def to_python(self, value):
+        return self.phone_field.to_python(value)
+
+    def get_prep_value(self, value):
+        if value in (None, ''):
+            return super().get_prep_value(value)
+        return self.phone_field.get_prep_value(value)
+
+    def contribute_to_class(self, cls, name, *args, **kwargs):
+        super().contribute_to_class(cls, name, *args, **kwargs)
+        setattr(cls, self.name, LazyPhoneNumberDescriptor(self))
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['region'] = self._region
+        return name, path, args, kwargs
+
+    def formfield(self, **kwargs):
+        return self.phone_field.formfield(**kwargs)
+
+
+class ImageField(models.ImageField):
+    """
+    Django's ImageField, whose system check looks for Pillow without
+    importing it: checks run before every management command, most of which
+    never open an image.
+    """
+
+    def _check_image_library_installed(self):
+        if find_spec('PIL') is None:
+            return [
+                checks.Error(
+                    'Cannot use ImageField because Pillow is not installed.',
+                    hint='Get Pillow at https://pypi.org/project/Pillow/ '
+                         'or run command "python -m pip install Pillow".',
+                    obj=self,
+                    id='fields.E210',
+                )
+            ]
+        return []
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        # The same column as Django's field, so migrations need not know
+        return name, 'django.db.models.ImageField', args, kwargs
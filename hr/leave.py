@@ -0,0 +1,79 @@
+"""
+Bulk leave request decisions: approve, reject or cancel any number of
+requests with one UPDATE, then tell the employees in one batch of emails.
+
+Used by the LeaveRequestAdmin actions. As a queryset ``update()`` sends no
+``post_save``, the caches that depend on leave requests are invalidated here
+and ``updated_at`` is set explicitly, so the change feed sees the change.
+Approving or cancelling also writes or removes the ON_LEAVE attendance days
+in the same transaction (see hr.attendance).
+"""
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import router, transaction
+from django.utils import timezone
+
+from .attendance import sync_leave_attendance
+from .cache import DASHBOARD, invalidate
+
+
+# Target status -> statuses a request may be in to move to it
+TRANSITIONS = {
+    'APPROVED': ('PENDING',),
+    'REJECTED': ('PENDING',),
+    'CANCELLED': ('PENDING', 'APPROVED'),
+}
+
+
+def decide_leave_requests(queryset, status, decided_by=None, notify=True):
+    """
+    Move every request in ``queryset`` that may make the transition to
+    ``status``, recording ``decided_by`` (an Employee or None) and the time,
+    and return the ids of the requests changed. Others are left as they are.
+    """
+    from .badges import LEAVE_BADGES
+    from .models import LeaveRequest
+
+    allowed = TRANSITIONS[status]
+    now = timezone.now()
+    # Read from the primary: a replica may not have the latest statuses yet
+    using = router.db_for_write(LeaveRequest)
+    with transaction.atomic(using=using):
+        ids = list(queryset.using(using).filter(status__in=allowed).values_list('pk', flat=True))
+        if not ids:
+            return []
+        # Re-checking the status keeps a concurrent decision from being overwritten
+        LeaveRequest.objects.using(using).filter(pk__in=ids, status__in=allowed).update(
+            status=status, approved_by=decided_by, approval_date=now, updated_at=now,
+        )
+        if status in ('APPROVED', 'CANCELLED'):
+            sync_leave_attendance(ids)
+        transaction.on_commit(lambda: invalidate(DASHBOARD, LEAVE_BADGES), using=using)
+        if notify:
+            # robust: a mail server outage must not turn the decision into an error
+            transaction.on_commit(lambda: notify_decisions(ids), using=using, robust=True)
+    return ids
+
+
+def _address(employee):
+    return employee.user.email or employee.personal_email
+
+
+def notify_decisions(ids):
+    """Email each employee whose request was decided, over one connection."""
+    from .models import LeaveRequest
+
+    requests = LeaveRequest.objects.filter(pk__in=ids).select_related('employee__user', 'leave_type')
+    with get_connection() as connection:
+        messages = [
+            EmailMessage(
+                f'Leave request {request.get_status_display().lower()}',
+                f'Your {request.leave_type.name} request for {request.start_date:%Y-%m-%d} to '
+                f'{request.end_date:%Y-%m-%d} has been {request.get_status_display().lower()}.\n',
+                to=[_address(request.employee)],
+                connection=connection,
+            )
+            for request in requests if _address(request.employee)
+        ]
+        if messages:
+            connection.send_messages(messages)
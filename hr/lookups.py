@@ -0,0 +1,97 @@
+"""
+Per-process caches of the small, rarely changing reference tables:
+departments, positions and leave types.
+
+Each table is held in memory by every process and stamped with the version
+of its ``hr.cache`` namespace. Saving or deleting a row bumps the version in
+the shared cache, so every process reloads the table on its next lookup
+(other processes within CACHE_LOCAL_TIMEOUT seconds). Checking the version
+is a local cache hit; the table itself is queried only after a change, or
+once it is CACHE_TIMEOUT seconds old, which bounds the life of rows read
+inside a transaction that was later rolled back.
+
+Cached instances are shared between requests and threads, so treat them as
+read-only: fetch a fresh instance from the database to modify it.
+"""
+
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .cache import invalidate_on_change, namespace_version
+
+
+def _resolve(obj, path):
+    for name in path.split('__'):
+        obj = getattr(obj, name)
+    return obj
+
+
+class LookupTable:
+
+    def __init__(self, model_label, select_related=(), depends_on=()):
+        self.model_label = model_label
+        self.namespace = f'lookup:{model_label.lower()}'
+        self.select_related = select_related
+        # Models whose changes also change this table's rows or labels
+        self.depends_on = depends_on
+        self._version = None
+        self._loaded_at = 0.0
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def connect(self):
+        invalidate_on_change(self.namespace, self.model_label, *self.depends_on)
+
+    def _load(self):
+        version = namespace_version(self.namespace)
+        if version != self._version or self._expired():
+            with self._lock:
+                if version != self._version or self._expired():
+                    # Always from the primary: a lagging replica would be
+                    # cached under the new version until the next change
+                    queryset = self.model._default_manager.using(DEFAULT_DB_ALIAS)
+                    if self.select_related:
+                        queryset = queryset.select_related(*self.select_related)
+                    self._rows = {obj.pk: obj for obj in queryset}
+                    self._version = version
+                    self._loaded_at = time.monotonic()
+        return self._rows
+
+    def _expired(self):
+        return time.monotonic() - self._loaded_at >= settings.CACHE_TIMEOUT
+
+    def all(self):
+        return list(self._load().values())
+
+    def get(self, pk):
+        return self._load().get(pk)
+
+    def filter(self, **fields):
+        """Rows whose attributes equal ``fields``; ``a__b`` follows relations."""
+        return [
+            obj for obj in self._load().values()
+            if all(_resolve(obj, name) == value for name, value in fields.items())
+        ]
+
+    def choices(self):
+        return [(obj.pk, str(obj)) for obj in self._load().values()]
+
+
+departments = LookupTable('hr.Department')
+positions = LookupTable('hr.Position', select_related=('department',), depends_on=('hr.Department',))
+leave_types = LookupTable('hr.LeaveType')
+
+LOOKUP_TABLES = {table.model_label: table for table in (departments, positions, leave_types)}
+
+
+def for_model(model):
+    """The lookup table caching ``model``, or None."""
+    return LOOKUP_TABLES.get(model._meta.label)
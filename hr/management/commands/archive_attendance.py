@@ -0,0 +1,61 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hr.archive import archive_attendance, get_archive_cutoff
+from hr.models import Attendance
+from hr_system.apps import NON_ADMIN_CHECKS
+
+
+class Command(BaseCommand):
+    help = 'Move old attendance records into the archive table'
+    requires_system_checks = NON_ADMIN_CHECKS
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Archive records older than this many days '
+                 '(defaults to ATTENDANCE_ARCHIVE_AFTER_DAYS)',
+        )
+        parser.add_argument(
+            '--before',
+            help='Archive records dated before this ISO date (overrides --days)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Rows moved per transaction (defaults to ATTENDANCE_ARCHIVE_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many records would be archived',
+        )
+
+    def handle(self, *args, **options):
+        if options['before']:
+            try:
+                cutoff = date.fromisoformat(options['before'])
+            except ValueError:
+                raise CommandError(f"Invalid date for --before: {options['before']}")
+        else:
+            cutoff = get_archive_cutoff(options['days'])
+
+        if options['dry_run']:
+            count = Attendance.objects.filter(date__lt=cutoff).count()
+            self.stdout.write(f'{count} attendance records dated before {cutoff} would be archived')
+            return
+
+        self.stdout.write(f'Archiving attendance records dated before {cutoff}...')
+        moved = archive_attendance(
+            cutoff,
+            batch_size=options['batch_size'],
+            progress=lambda total: self.stdout.write(f'  moved {total} records'),
+            conflicts=lambda ids: self.stdout.write(self.style.WARNING(
+                f'  kept {len(ids)} records whose day is already archived: ids {ids}'
+            )),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Archived {moved} attendance records')
+        )
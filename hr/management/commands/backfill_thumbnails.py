@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from hr.models import Employee
+from hr.thumbnails import ensure_thumbnails
+from hr_system.apps import NON_ADMIN_CHECKS
+
+
+class Command(BaseCommand):
+    help = 'Generate the missing thumbnails of existing employee photos'
+    requires_system_checks = NON_ADMIN_CHECKS
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate every thumbnail, e.g. after changing EMPLOYEE_THUMBNAIL_SIZE',
+        )
+
+    def handle(self, *args, **options):
+        storage = Employee._meta.get_field('employee_photo').storage
+        photos = (
+            Employee.objects.exclude(employee_photo='').exclude(employee_photo__isnull=True)
+            .values_list('employee_photo', flat=True)
+        )
+        done = failed = 0
+        for name in photos.iterator(chunk_size=500):
+            if ensure_thumbnails(storage, name, force=options['force']) is None:
+                failed += 1
+            else:
+                done += 1
+        self.stdout.write(self.style.SUCCESS(f'Thumbnails ready for {done} photos'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} photos could not be read; see the log'))
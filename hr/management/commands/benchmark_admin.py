@@ -0,0 +1,116 @@
+import json
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime
+
+import django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from hr.benchmarks import ensure_benchmark_objects, positive_int, run_admin_benchmarks
+from hr.sample_data import generate_bulk_data
+from hr_system.test_runner import isolated_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark every admin view against generated datasets of increasing '
+        'size and check per-view SQL query budgets'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='1000,10000,100000',
+            help='Comma-separated employee counts to benchmark (default: 1000,10000,100000)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=10,
+            help='Days of attendance history per generated employee (default: 10)',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Dataset seed (default: 42)')
+        parser.add_argument(
+            '--repeat',
+            type=positive_int,
+            default=3,
+            help='Timed requests per view after one warm-up request (default: 3)',
+        )
+        parser.add_argument(
+            '--output',
+            default='admin_benchmarks.json',
+            help='Where to write the JSON results (default: admin_benchmarks.json)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError(f"Invalid --sizes: {options['sizes']}")
+
+        report = {
+            'meta': {
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'days': options['days'],
+                'seed': options['seed'],
+                'repeat': options['repeat'],
+            },
+            'results': {},
+        }
+        over_budget = []
+
+        setup_test_environment()
+        try:
+            with isolated_cache():
+                for size in sizes:
+                    self.stdout.write(f'Benchmarking with {size} employees...')
+                    # Each size runs against a fresh throwaway test database so
+                    # the configured database is never touched. SQLite would
+                    # default to an in-memory database, which is neither
+                    # representative nor released between sizes.
+                    if connection.vendor == 'sqlite':
+                        connection.settings_dict['TEST']['NAME'] = os.path.join(
+                            tempfile.gettempdir(), 'hr_admin_benchmark.sqlite3'
+                        )
+                    old_name = connection.creation.create_test_db(
+                        verbosity=0, autoclobber=True, serialize=False
+                    )
+                    try:
+                        generate_bulk_data(size, options['days'], options['seed'])
+                        ensure_benchmark_objects()
+                        user = User.objects.create_superuser('benchmark', 'benchmark@company.com', 'benchmark')
+                        results = run_admin_benchmarks(user, repeat=options['repeat'])
+                    finally:
+                        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+                    report['results'][str(size)] = results
+                    for result in results:
+                        line = (
+                            f"  {result['model']:<24} {result['view']:<18} "
+                            f"{result['median_ms']:>9.1f} ms  {result['queries']:>3}/{result['query_budget']} queries"
+                        )
+                        if result['within_budget'] and result['status'] < 400:
+                            self.stdout.write(line)
+                        else:
+                            over_budget.append((size, result))
+                            self.stdout.write(self.style.ERROR(line + f"  (HTTP {result['status']})"))
+        finally:
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as fh:
+            json.dump(report, fh, indent=2, sort_keys=True)
+            fh.write('\n')
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if over_budget:
+            self.stdout.write(self.style.ERROR(f'{len(over_budget)} views failed or exceeded their query budget'))
+            sys.exit(1)
+        self.stdout.write(self.style.SUCCESS('All views within their query budgets'))
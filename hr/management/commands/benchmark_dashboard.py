@@ -0,0 +1,86 @@
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from hr.benchmarks import positive_int
+from hr.cache import DASHBOARD, invalidate
+from hr.sample_data import generate_bulk_data
+from hr_system.test_runner import isolated_cache
+
+
+async def _measure(client, repeat, cold):
+    timings = []
+    for _ in range(repeat):
+        if cold:
+            invalidate(DASHBOARD)
+        started = time.perf_counter()
+        response = await client.get('/admin/')
+        timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f'Dashboard returned HTTP {response.status_code}')
+    return statistics.median(timings)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare dashboard latency through the ASGI handler with the widgets '
+        'queried one after another and concurrently'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=10000, help='Generated employees (default: 10000)')
+        parser.add_argument('--days', type=int, default=10, help='Days of attendance per employee (default: 10)')
+        parser.add_argument('--seed', type=int, default=42, help='Dataset seed (default: 42)')
+        parser.add_argument('--workers', type=int, default=4, help='DASHBOARD_WORKERS for the concurrent run (default: 4)')
+        parser.add_argument('--repeat', type=positive_int, default=5, help='Timed requests per measurement (default: 5)')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            with isolated_cache():
+                # A throwaway database, as in benchmark_admin; a file rather
+                # than SQLite's in-memory default so worker threads share it
+                if connection.vendor == 'sqlite':
+                    connection.settings_dict['TEST']['NAME'] = os.path.join(
+                        tempfile.gettempdir(), 'hr_dashboard_benchmark.sqlite3'
+                    )
+                old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                try:
+                    self.stdout.write(f"Generating {options['employees']} employees...")
+                    generate_bulk_data(options['employees'], options['days'], options['seed'])
+                    user = User.objects.create_superuser('benchmark', 'benchmark@company.com', 'benchmark')
+                    results = self.run_benchmark(user, options['workers'], options['repeat'])
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            teardown_test_environment()
+
+        self.stdout.write(f"{'':<12} {'cold':>10} {'warm':>10}")
+        for mode, timings in results.items():
+            self.stdout.write(f"{mode:<12} {timings['cold']:>7.1f} ms {timings['warm']:>7.1f} ms")
+        for state in ('cold', 'warm'):
+            speedup = results['sequential'][state] / results['concurrent'][state]
+            self.stdout.write(self.style.SUCCESS(f'{state}: concurrent widgets {speedup:.2f}x the sequential speed'))
+
+    def run_benchmark(self, user, workers, repeat):
+        client = AsyncClient()
+        client.force_login(user)
+        results = {}
+        for mode, mode_workers in (('sequential', 0), ('concurrent', workers)):
+            with override_settings(DASHBOARD_WORKERS=mode_workers):
+                self.stdout.write(f'Measuring {mode} widgets...')
+                # One request first, so URL, template and lookup caches are warm
+                asyncio.run(_measure(client, 1, cold=True))
+                results[mode] = {
+                    'cold': asyncio.run(_measure(client, repeat, cold=True)),
+                    'warm': asyncio.run(_measure(client, repeat, cold=False)),
+                }
+        return results
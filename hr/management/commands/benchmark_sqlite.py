@@ -0,0 +1,199 @@
+import copy
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+
+BENCHMARK_ALIAS = 'sqlite_benchmark'
+
+
+def get_profiles():
+    """
+    The two database profiles being compared: Django's stock SQLite setup
+    (rollback journal, a new connection per request, deferred transactions)
+    and the production profile from settings.
+    """
+    return {
+        'development': {'CONN_MAX_AGE': 0, 'OPTIONS': {}},
+        'production': copy.deepcopy(settings.SQLITE_PRODUCTION_PROFILE),
+    }
+
+
+def _setup_schema(path, rows):
+    import sqlite3
+
+    db = sqlite3.connect(path)
+    db.executescript(
+        """
+        CREATE TABLE bench_employee (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            salary INTEGER NOT NULL,
+            updated INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE bench_log (
+            id INTEGER PRIMARY KEY,
+            employee_id INTEGER NOT NULL,
+            message TEXT NOT NULL
+        );
+        CREATE INDEX bench_log_employee ON bench_log (employee_id);
+        """
+    )
+    db.executemany(
+        'INSERT INTO bench_employee (id, name, salary) VALUES (?, ?, ?)',
+        [(i, f'Employee {i}', 50000 + i) for i in range(1, rows + 1)],
+    )
+    db.commit()
+    db.close()
+
+
+def _write_request(alias, rng, rows):
+    # Shaped like an admin save: read the object, update it, log the change
+    employee_id = rng.randint(1, rows)
+    with transaction.atomic(using=alias):
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT salary FROM bench_employee WHERE id = %s', [employee_id])
+            salary = cursor.fetchone()[0]
+            cursor.execute(
+                'UPDATE bench_employee SET salary = %s, updated = updated + 1 WHERE id = %s',
+                [salary + 1, employee_id],
+            )
+            cursor.execute(
+                'INSERT INTO bench_log (employee_id, message) VALUES (%s, %s)',
+                [employee_id, f'salary changed to {salary + 1}'],
+            )
+
+
+def _read_request(alias, rng, rows):
+    # Shaped like a changelist: a count plus one page of rows
+    offset = rng.randint(0, max(rows - 100, 0))
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT COUNT(*) FROM bench_employee')
+        cursor.fetchone()
+        cursor.execute(
+            'SELECT id, name, salary FROM bench_employee ORDER BY id LIMIT 100 OFFSET %s',
+            [offset],
+        )
+        cursor.fetchall()
+
+
+def run_profile(profile, threads, requests, write_ratio, rows, seed):
+    """
+    Run ``threads`` workers issuing ``requests`` requests each against a
+    fresh database file configured with ``profile``. Returns a summary dict.
+    """
+    directory = tempfile.mkdtemp(prefix='hr-sqlite-bench-')
+    path = os.path.join(directory, 'bench.sqlite3')
+    _setup_schema(path, rows)
+
+    database = {'ENGINE': 'hr_system.sqlite3', 'NAME': path, **profile}
+    connections.settings[BENCHMARK_ALIAS] = connections.configure_settings(
+        {DEFAULT_DB_ALIAS: database}
+    )[DEFAULT_DB_ALIAS]
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        rng = random.Random(seed + index)
+        local_latencies = []
+        local_errors = 0
+        barrier.wait()
+        try:
+            for _ in range(requests):
+                started = time.perf_counter()
+                try:
+                    if rng.random() < write_ratio:
+                        _write_request(BENCHMARK_ALIAS, rng, rows)
+                    else:
+                        _read_request(BENCHMARK_ALIAS, rng, rows)
+                except OperationalError:
+                    local_errors += 1
+                else:
+                    local_latencies.append(time.perf_counter() - started)
+                # What request_finished does at the end of every request:
+                # closes the connection unless CONN_MAX_AGE keeps it open
+                connections[BENCHMARK_ALIAS].close_if_unusable_or_obsolete()
+        finally:
+            connections[BENCHMARK_ALIAS].close()
+            with lock:
+                latencies.extend(local_latencies)
+                errors.append(local_errors)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    del connections.settings[BENCHMARK_ALIAS]
+    for filename in os.listdir(directory):
+        os.remove(os.path.join(directory, filename))
+    os.rmdir(directory)
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'seconds': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'median_ms': statistics.median(latencies) * 1000 if latencies else 0.0,
+        'p95_ms': latencies[int(len(latencies) * 0.95) - 1] * 1000 if latencies else 0.0,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare request throughput of the development and production SQLite '
+        'profiles under concurrent reads and writes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent workers (default: 8)')
+        parser.add_argument('--requests', type=int, default=500, help='Requests per worker (default: 500)')
+        parser.add_argument(
+            '--write-ratio',
+            type=float,
+            default=0.2,
+            help='Fraction of requests that write (default: 0.2)',
+        )
+        parser.add_argument('--rows', type=int, default=10000, help='Rows in the benchmark table (default: 10000)')
+        parser.add_argument('--seed', type=int, default=42, help='Workload seed (default: 42)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{options['threads']} threads x {options['requests']} requests, "
+            f"{options['write_ratio']:.0%} writes, {options['rows']} rows"
+        )
+        results = {}
+        for name, profile in get_profiles().items():
+            result = run_profile(
+                profile,
+                options['threads'],
+                options['requests'],
+                options['write_ratio'],
+                options['rows'],
+                options['seed'],
+            )
+            results[name] = result
+            self.stdout.write(
+                f"  {name:<12} {result['throughput']:>8.0f} req/s  "
+                f"median {result['median_ms']:6.2f} ms  p95 {result['p95_ms']:7.2f} ms  "
+                f"{result['errors']} 'database is locked' errors"
+            )
+
+        baseline = results['development']['throughput']
+        if baseline:
+            gain = results['production']['throughput'] / baseline
+            self.stdout.write(self.style.SUCCESS(f'Production profile throughput: {gain:.2f}x development'))
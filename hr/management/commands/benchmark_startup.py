@@ -0,0 +1,113 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+# Optional-feature dependencies that should only load when their feature runs
+HEAVY_MODULES = ('import_export.admin', 'tablib', 'openpyxl', 'yaml', 'phonenumbers', 'PIL')
+
+# What each scenario does after interpreter start; the URLconf is what an
+# admin worker loads before serving its first request, and ``command`` runs
+# a management command as cron would, system checks included (sync_replica
+# copies the scenario's empty database)
+SCENARIOS = {
+    'setup': 'django.setup()',
+    'urls': 'django.setup(); from django.urls import get_resolver; get_resolver().url_patterns',
+    'command': (
+        'from django.core.management import execute_from_command_line; '
+        "execute_from_command_line(['manage.py', 'sync_replica'])"
+    ),
+}
+
+_SCRIPT = '''
+import json, os, sys, time
+started = time.perf_counter()
+import django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings_module!r})
+{code}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    'ms': elapsed * 1000,
+    'loaded': sorted(name for name in {heavy!r} if name in sys.modules),
+}}))
+'''
+
+
+def _parse_importtime(stderr):
+    """Cumulative microseconds per top-level import, from ``-X importtime``."""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith('  '):
+            imports[name.strip()] = int(cumulative)
+    return imports
+
+
+def profile_startup(scenario, runs=5):
+    """
+    Start a fresh interpreter ``runs`` times for ``scenario`` and return the
+    median wall time, the heavy modules it loaded and its slowest top-level
+    imports (from the last run).
+    """
+    script = _SCRIPT.format(
+        settings_module=settings.SETTINGS_MODULE,
+        code=SCENARIOS[scenario],
+        heavy=HEAVY_MODULES,
+    )
+    timings = []
+    with tempfile.TemporaryDirectory() as directory:
+        # Empty databases, so no scenario touches the configured ones
+        env = {
+            **os.environ,
+            'DATABASE_NAME': os.path.join(directory, 'primary.sqlite3'),
+            'DATABASE_REPLICA_NAME': os.path.join(directory, 'replica.sqlite3'),
+        }
+        for _ in range(runs):
+            process = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', script],
+                capture_output=True, text=True, check=True, cwd=settings.BASE_DIR, env=env,
+            )
+            result = json.loads(process.stdout.strip().splitlines()[-1])
+            timings.append(result['ms'])
+    imports = _parse_importtime(process.stderr)
+    return {
+        'scenario': scenario,
+        'median_ms': statistics.median(timings),
+        'loaded': result['loaded'],
+        'slowest_imports': sorted(imports.items(), key=lambda item: item[1], reverse=True)[:10],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Profile interpreter start-up with -X importtime: time to django.setup(), '
+        'to a loaded URLconf and to a finished management command, and which heavy '
+        'dependencies each imports'
+    )
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per scenario (default: 5)')
+        parser.add_argument('--output', help='Also write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        results = [profile_startup(scenario, options['runs']) for scenario in SCENARIOS]
+        for result in results:
+            loaded = ', '.join(result['loaded']) or 'none'
+            self.stdout.write(self.style.SUCCESS(
+                f"{result['scenario']:<7} {result['median_ms']:>7.1f} ms  heavy modules: {loaded}"
+            ))
+            for name, microseconds in result['slowest_imports']:
+                self.stdout.write(f'          {microseconds / 1000:>7.1f} ms  {name}')
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2)
+                fh.write('\n')
@@ -0,0 +1,89 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+
+from hr.employment import apply_employment_change
+from hr.models import Department, Employee
+from hr_system.apps import NON_ADMIN_CHECKS
+
+
+class Command(BaseCommand):
+    help = ('Change the status, department or manager of many employees at once, '
+            'reassigning the reports and cancelling the future leave of those who leave')
+    requires_system_checks = NON_ADMIN_CHECKS
+
+    def add_arguments(self, parser):
+        selection = parser.add_argument_group('employees to change')
+        selection.add_argument('--employees', nargs='+', metavar='ID', help='Employee IDs')
+        selection.add_argument('--department', metavar='NAME', help='Every employee of this department')
+
+        change = parser.add_argument_group('changes')
+        change.add_argument(
+            '--status',
+            choices=[value for value, label in Employee.EMPLOYMENT_STATUS_CHOICES],
+            help='New employment status',
+        )
+        change.add_argument('--to-department', metavar='NAME', help='Move to this department')
+        change.add_argument('--manager', metavar='ID', help='New direct manager')
+        change.add_argument('--termination-date', metavar='YYYY-MM-DD', help='Termination date')
+        change.add_argument(
+            '--reassign-reports-to',
+            metavar='ID',
+            help='Who takes over the reports of departing employees '
+                 '(defaults to each departing manager\'s own manager)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change and roll back',
+        )
+
+    def employee(self, employee_id):
+        try:
+            return Employee.objects.get(employee_id=employee_id)
+        except Employee.DoesNotExist:
+            raise CommandError(f'Unknown employee {employee_id}')
+
+    def department(self, name):
+        try:
+            return Department.objects.get(name=name)
+        except Department.DoesNotExist:
+            raise CommandError(f'Unknown department {name}')
+
+    def handle(self, *args, **options):
+        if options['employees']:
+            queryset = Employee.objects.filter(employee_id__in=options['employees'])
+        elif options['department']:
+            queryset = Employee.objects.filter(department=self.department(options['department']))
+        else:
+            raise CommandError('Select employees with --employees or --department')
+
+        changes = {'employment_status': options['status']}
+        if options['termination_date']:
+            try:
+                changes['termination_date'] = date.fromisoformat(options['termination_date'])
+            except ValueError:
+                raise CommandError(f"Invalid date for --termination-date: {options['termination_date']}")
+        if options['to_department']:
+            changes['department'] = self.department(options['to_department'])
+        if options['manager']:
+            changes['direct_manager'] = self.employee(options['manager'])
+        if options['reassign_reports_to']:
+            changes['reports_to'] = self.employee(options['reassign_reports_to'])
+
+        using = router.db_for_write(Employee)
+        with transaction.atomic(using=using):
+            try:
+                result = apply_employment_change(queryset, **changes)
+            except ValueError as e:
+                raise CommandError(e)
+            if options['dry_run']:
+                # Nothing is committed, so the caches are not invalidated either
+                transaction.set_rollback(True, using=using)
+
+        verb = 'would be' if options['dry_run'] else 'were'
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.employees} employees {verb} updated, {result.reassigned_reports} direct reports '
+            f'reassigned, {result.cancelled_leave} future leave requests cancelled'
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from hr.expiry import notify_expiring_documents
+from hr_system.apps import NON_ADMIN_CHECKS
+
+
+class Command(BaseCommand):
+    help = 'Email each manager the documents of their reports that expire soon'
+    requires_system_checks = NON_ADMIN_CHECKS
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Documents expiring within this many days '
+                 '(defaults to DOCUMENT_EXPIRY_WARNING_DAYS)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many emails would be sent',
+        )
+
+    def handle(self, *args, **options):
+        emails, listed, unassigned = notify_expiring_documents(
+            timezone.localdate(), options['days'], dry_run=options['dry_run'],
+        )
+        verb = 'would be sent' if options['dry_run'] else 'sent'
+        self.stdout.write(self.style.SUCCESS(f'{emails} emails {verb} listing {listed} expiring documents'))
+        for document in unassigned:
+            self.stdout.write(self.style.WARNING(
+                f'No manager to notify about {document} (expires {document.expiry_date})'
+            ))
@@ -2,69 +2,58 @@ from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import date, timedelta
-from hr.models import (
-    Department, Position, Employee, LeaveType, LeaveRequest,
-    PerformanceReview, Attendance
-)
+from hr.models import Employee, LeaveRequest, Attendance
+from hr.sample_data import create_reference_data, generate_bulk_data
+from hr_system.apps import NON_ADMIN_CHECKS
 import random
+import time
 
 
 class Command(BaseCommand):
     help = 'Populate the database with sample HR data'
+    requires_system_checks = NON_ADMIN_CHECKS
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--employees',
+            type=int,
+            help='Generate this many synthetic employees with bulk inserts '
+                 'instead of the small handcrafted dataset',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Days of attendance history per generated employee (default: 30)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Random seed; the same seed reproduces the same dataset',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk insert (default: 1000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Generate departments in this many parallel processes (default: 1)',
+        )
 
     def handle(self, *args, **options):
+        if options['employees']:
+            return self.handle_bulk(**options)
+
+        if options['seed'] is not None:
+            random.seed(options['seed'])
+
         self.stdout.write('Creating sample HR data...')
         
-        # Create Departments
-        departments_data = [
-            {'name': 'Human Resources', 'description': 'Manages employee relations and policies'},
-            {'name': 'Engineering', 'description': 'Software development and technical operations'},
-            {'name': 'Marketing', 'description': 'Brand promotion and customer acquisition'},
-            {'name': 'Sales', 'description': 'Customer relations and revenue generation'},
-            {'name': 'Finance', 'description': 'Financial planning and accounting'},
-            {'name': 'Operations', 'description': 'Day-to-day business operations'},
-        ]
-        
-        departments = {}
-        for dept_data in departments_data:
-            dept, created = Department.objects.get_or_create(
-                name=dept_data['name'],
-                defaults={'description': dept_data['description']}
-            )
-            departments[dept.name] = dept
-            if created:
-                self.stdout.write(f'Created department: {dept.name}')
-        
-        # Create Positions
-        positions_data = [
-            {'title': 'HR Manager', 'department': 'Human Resources', 'min_salary': 80000, 'max_salary': 120000},
-            {'title': 'HR Specialist', 'department': 'Human Resources', 'min_salary': 50000, 'max_salary': 70000},
-            {'title': 'Senior Software Engineer', 'department': 'Engineering', 'min_salary': 120000, 'max_salary': 180000},
-            {'title': 'Software Engineer', 'department': 'Engineering', 'min_salary': 80000, 'max_salary': 120000},
-            {'title': 'Junior Developer', 'department': 'Engineering', 'min_salary': 60000, 'max_salary': 80000},
-            {'title': 'Marketing Manager', 'department': 'Marketing', 'min_salary': 90000, 'max_salary': 130000},
-            {'title': 'Marketing Specialist', 'department': 'Marketing', 'min_salary': 55000, 'max_salary': 75000},
-            {'title': 'Sales Manager', 'department': 'Sales', 'min_salary': 85000, 'max_salary': 125000},
-            {'title': 'Sales Representative', 'department': 'Sales', 'min_salary': 45000, 'max_salary': 65000},
-            {'title': 'Finance Manager', 'department': 'Finance', 'min_salary': 95000, 'max_salary': 140000},
-            {'title': 'Accountant', 'department': 'Finance', 'min_salary': 50000, 'max_salary': 70000},
-            {'title': 'Operations Manager', 'department': 'Operations', 'min_salary': 75000, 'max_salary': 110000},
-        ]
-        
-        positions = {}
-        for pos_data in positions_data:
-            pos, created = Position.objects.get_or_create(
-                title=pos_data['title'],
-                department=departments[pos_data['department']],
-                defaults={
-                    'min_salary': pos_data['min_salary'],
-                    'max_salary': pos_data['max_salary'],
-                    'description': f'Position in {pos_data["department"]} department'
-                }
-            )
-            positions[pos.title] = pos
-            if created:
-                self.stdout.write(f'Created position: {pos.title}')
+        departments, positions, leave_types = create_reference_data(self.stdout.write)
         
         # Create sample employees
         employees_data = [
@@ -114,30 +103,6 @@ class Command(BaseCommand):
                 employees.append(employee)
                 self.stdout.write(f'Created employee: {employee.full_name}')
         
-        # Create Leave Types
-        leave_types_data = [
-            {'name': 'Annual Leave', 'max_days_per_year': 25, 'is_paid': True},
-            {'name': 'Sick Leave', 'max_days_per_year': 10, 'is_paid': True},
-            {'name': 'Maternity Leave', 'max_days_per_year': 90, 'is_paid': True},
-            {'name': 'Paternity Leave', 'max_days_per_year': 14, 'is_paid': True},
-            {'name': 'Personal Leave', 'max_days_per_year': 5, 'is_paid': False},
-            {'name': 'Emergency Leave', 'max_days_per_year': 3, 'is_paid': True},
-        ]
-        
-        leave_types = []
-        for leave_data in leave_types_data:
-            leave_type, created = LeaveType.objects.get_or_create(
-                name=leave_data['name'],
-                defaults={
-                    'max_days_per_year': leave_data['max_days_per_year'],
-                    'is_paid': leave_data['is_paid'],
-                    'description': f'{leave_data["name"]} for employees'
-                }
-            )
-            leave_types.append(leave_type)
-            if created:
-                self.stdout.write(f'Created leave type: {leave_type.name}')
-        
         # Create some sample leave requests
         if employees and leave_types:
             for _ in range(10):
@@ -194,4 +159,27 @@ class Command(BaseCommand):
         
         self.stdout.write(
             self.style.SUCCESS('Successfully populated database with sample HR data!')
-        ) 
\ No newline at end of file
+        ) 
+
+    def handle_bulk(self, **options):
+        seed = options['seed'] if options['seed'] is not None else 0
+        self.stdout.write(
+            f"Generating {options['employees']} employees with {options['days']} days "
+            f"of attendance (seed={seed}, workers={options['workers']})..."
+        )
+        started = time.monotonic()
+        employees, attendance, leave_requests = generate_bulk_data(
+            employees=options['employees'],
+            days=options['days'],
+            seed=seed,
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            log=self.stdout.write,
+        )
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Created {employees} employees, {attendance} attendance records and '
+                f'{leave_requests} leave requests in {elapsed:.1f}s'
+            )
+        )
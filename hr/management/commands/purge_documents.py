@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from hr.documents import purge_unreferenced
+from hr_system.apps import NON_ADMIN_CHECKS
+
+
+class Command(BaseCommand):
+    help = 'Delete stored document files that no document references any more'
+    requires_system_checks = NON_ADMIN_CHECKS
+
+    def handle(self, *args, **options):
+        purged = purge_unreferenced()
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} unreferenced document files'))
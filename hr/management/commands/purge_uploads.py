@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from hr.uploads import purge_uploads
+from hr_system.apps import NON_ADMIN_CHECKS
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked document uploads that were abandoned or already used'
+    requires_system_checks = NON_ADMIN_CHECKS
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            help='Delete uploads untouched for this many hours '
+                 '(defaults to CHUNKED_UPLOAD_EXPIRY_HOURS)',
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_uploads(options['hours'])
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} chunked uploads'))
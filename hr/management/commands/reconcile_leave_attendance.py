@@ -0,0 +1,58 @@
+from contextlib import nullcontext
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import router, transaction
+
+from hr.attendance import sync_leave_attendance
+from hr.models import Attendance, LeaveRequest
+from hr_system.apps import NON_ADMIN_CHECKS
+
+
+class Command(BaseCommand):
+    help = 'Write the ON_LEAVE attendance days of approved leave and remove those of other leave'
+    requires_system_checks = NON_ADMIN_CHECKS
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only leave ending on or after this ISO date',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Leave requests reconciled per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would change and roll back',
+        )
+
+    def handle(self, *args, **options):
+        requests = LeaveRequest.objects.order_by('pk')
+        if options['since']:
+            try:
+                requests = requests.filter(end_date__gte=date.fromisoformat(options['since']))
+            except ValueError:
+                raise CommandError(f"Invalid date for --since: {options['since']}")
+        ids = list(requests.values_list('pk', flat=True))
+
+        written = removed = 0
+        using = router.db_for_write(Attendance)
+        # A dry run reconciles everything in one transaction and rolls it back;
+        # otherwise each batch commits on its own
+        with transaction.atomic(using=using) if options['dry_run'] else nullcontext():
+            for offset in range(0, len(ids), options['batch_size']):
+                batch_written, batch_removed = sync_leave_attendance(ids[offset:offset + options['batch_size']])
+                written += batch_written
+                removed += batch_removed
+            if options['dry_run']:
+                transaction.set_rollback(True, using=using)
+
+        verb = 'would be' if options['dry_run'] else 'were'
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(ids)} leave requests reconciled: {written} attendance days {verb} written, '
+            f'{removed} removed'
+        ))
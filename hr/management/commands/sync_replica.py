@@ -0,0 +1,47 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from hr_system.apps import NON_ADMIN_CHECKS
+from hr_system.routers import REPLICA_ALIAS, replica_configured
+
+
+def copy_sqlite_database(source_path, target_path, pages=1024):
+    """
+    Copy a live SQLite database with the online backup API, which produces a
+    consistent snapshot without blocking writers for the whole copy.
+    """
+    source = sqlite3.connect(source_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target, pages=pages)
+    finally:
+        target.close()
+        source.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Refresh the local SQLite read replica (DATABASE_REPLICA_NAME) with a '
+        'consistent copy of the primary database'
+    )
+    requires_system_checks = NON_ADMIN_CHECKS
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError('No replica configured; set DATABASE_REPLICA_NAME.')
+        primary = connections[DEFAULT_DB_ALIAS]
+        replica = connections[REPLICA_ALIAS]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError(
+                'sync_replica only copies SQLite files; other databases are '
+                'replicated by the database server.'
+            )
+
+        # Drop the replica's open connection so it sees the new file
+        replica.close()
+        copy_sqlite_database(primary.settings_dict['NAME'], replica.settings_dict['NAME'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Copied {primary.settings_dict['NAME']} to {replica.settings_dict['NAME']}"
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from hr_system.warmup import warmup
+
+
+class Command(BaseCommand):
+    help = (
+        'Run the worker warmup routine (URL resolution, admin template '
+        'compilation, admin config and lookup tables) and report each step'
+    )
+    requires_system_checks = []
+
+    def handle(self, *args, **options):
+        for name, (result, ms) in warmup().items():
+            line = f'{name:<14} {ms:>8.1f} ms  {result}'
+            self.stdout.write(self.style.SUCCESS(line) if result is not None else self.style.ERROR(line))
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 00:59
+
+from django.db import migrations
+import hr.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0002_archivedattendance'),
+    ]
+
+    # Same column as before; only the field class changes, so there is
+    # nothing to do in the database (SQLite would rebuild the table)
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.AlterField(
+                model_name='employee',
+                name='emergency_contact_phone',
+                field=hr.fields.PhoneNumberField(blank=True, max_length=128, region=None),
+            ),
+            migrations.AlterField(
+                model_name='employee',
+                name='phone_number',
+                field=hr.fields.PhoneNumberField(blank=True, max_length=128, region=None),
+            ),
+        ]),
+    ]
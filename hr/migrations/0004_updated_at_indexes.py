@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0003_lazy_phone_number_field'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='department',
+            index=models.Index(fields=['updated_at', 'id'], name='hr_departme_updated_4b700b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['updated_at', 'id'], name='hr_employee_updated_c9e618_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='position',
+            index=models.Index(fields=['updated_at', 'id'], name='hr_position_updated_f1daa5_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0005_change_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='employee',
+            name='import_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='employee',
+            name='imported_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
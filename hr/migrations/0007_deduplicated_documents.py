@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:12
+
+from django.db import migrations, models
+import hr.documents
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0006_employee_import_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employeedocument',
+            name='document_file',
+            field=models.FileField(db_index=True, storage=hr.documents.document_storage, upload_to='employee_documents/'),
+        ),
+    ]
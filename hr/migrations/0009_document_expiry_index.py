@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0008_chunked_upload'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='employeedocument',
+            index=models.Index(fields=['expiry_date'], name='hr_employee_expiry__f15b25_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0010_attendance_leave_request'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='attendance',
+            name='leave_request',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attendance_records', to='hr.leaverequest'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-19 01:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0011_attendance_leave_request_set_null'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedattendance',
+            name='leave_request',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_attendance_records', to='hr.leaverequest'),
+        ),
+    ]
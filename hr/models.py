@@ -1,11 +1,14 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
-from phonenumber_field.modelfields import PhoneNumberField
+from .documents import document_storage
+from .fields import ImageField, PhoneNumberField
 from django.utils import timezone
 from datetime import date, datetime
 import uuid
 
+from .lookups import departments, leave_types
+
 
 class Department(models.Model):
     """Department model for organizing employees"""
@@ -24,6 +27,8 @@ class Department(models.Model):
 
     class Meta:
         ordering = ['name']
+        # Cursor pagination in hr.api and the change feed in hr.changes
+        indexes = [models.Index(fields=['updated_at', 'id'])]
         verbose_name = 'Department'
         verbose_name_plural = 'Departments'
 
@@ -64,11 +69,22 @@ class Position(models.Model):
     class Meta:
         ordering = ['title']
         unique_together = ['title', 'department']
+        # Cursor pagination in hr.api and the change feed in hr.changes
+        indexes = [models.Index(fields=['updated_at', 'id'])]
         verbose_name = 'Position'
         verbose_name_plural = 'Positions'
 
     def __str__(self):
-        return f"{self.title} - {self.department.name}"
+        return f"{self.title} - {self.department_name}"
+
+    @property
+    def department_name(self):
+        # Avoid a query per position when the department is not loaded
+        if not Position.department.is_cached(self):
+            department = departments.get(self.department_id)
+            if department is not None:
+                return department.name
+        return self.department.name
 
 
 class Employee(models.Model):
@@ -134,7 +150,7 @@ class Employee(models.Model):
     country = models.CharField(max_length=100, blank=True)
     
     # Employment Information
-    employee_photo = models.ImageField(
+    employee_photo = ImageField(
         upload_to='employee_photos/', 
         blank=True, 
         null=True
@@ -180,9 +196,15 @@ class Employee(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     notes = models.TextField(blank=True)
+    # Hash of the spreadsheet row last imported into this employee, valid
+    # while updated_at still equals imported_at (see EmployeeResource)
+    import_fingerprint = models.CharField(max_length=32, blank=True, editable=False)
+    imported_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         ordering = ['last_name', 'first_name']
+        # Cursor pagination in hr.api and the change feed in hr.changes
+        indexes = [models.Index(fields=['updated_at', 'id'])]
         verbose_name = 'Employee'
         verbose_name_plural = 'Employees'
 
@@ -285,11 +307,22 @@ class LeaveRequest(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        # Change feed in hr.changes
+        indexes = [models.Index(fields=['updated_at', 'id'])]
         verbose_name = 'Leave Request'
         verbose_name_plural = 'Leave Requests'
 
     def __str__(self):
-        return f"{self.employee.full_name} - {self.leave_type.name} ({self.start_date} to {self.end_date})"
+        return f"{self.employee.full_name} - {self.leave_type_name} ({self.start_date} to {self.end_date})"
+
+    @property
+    def leave_type_name(self):
+        # Avoid a query per request when the leave type is not loaded
+        if not LeaveRequest.leave_type.is_cached(self):
+            leave_type = leave_types.get(self.leave_type_id)
+            if leave_type is not None:
+                return leave_type.name
+        return self.leave_type.name
 
     @property
     def duration_days(self):
@@ -381,6 +414,8 @@ class PerformanceReview(models.Model):
     
     class Meta:
         ordering = ['-review_period_end']
+        # Change feed in hr.changes
+        indexes = [models.Index(fields=['updated_at', 'id'])]
         verbose_name = 'Performance Review'
         verbose_name_plural = 'Performance Reviews'
 
@@ -401,8 +436,8 @@ class PerformanceReview(models.Model):
         return sum(ratings) / len(ratings)
 
 
-class Attendance(models.Model):
-    """Attendance model for tracking employee work hours"""
+class AttendanceBase(models.Model):
+    """Fields shared by live and archived attendance records"""
     
     STATUS_CHOICES = [
         ('PRESENT', 'Present'),
@@ -449,15 +484,38 @@ class Attendance(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
+        abstract = True
         ordering = ['-date']
         unique_together = ['employee', 'date']
-        verbose_name = 'Attendance'
-        verbose_name_plural = 'Attendance Records'
 
     def __str__(self):
         return f"{self.employee.full_name} - {self.date} ({self.status})"
 
+
+class Attendance(AttendanceBase):
+    """Attendance model for tracking employee work hours"""
+    # Set on the ON_LEAVE days written for an approved request (hr.attendance)
+    leave_request = models.ForeignKey(
+        LeaveRequest,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='attendance_records'
+    )
+
+    class Meta(AttendanceBase.Meta):
+        # Change feed in hr.changes
+        indexes = [models.Index(fields=['updated_at', 'id'])]
+        verbose_name = 'Attendance'
+        verbose_name_plural = 'Attendance Records'
+
     def save(self, *args, **kwargs):
+        self.calculate_hours()
+        super().save(*args, **kwargs)
+
+    def calculate_hours(self):
+        """Derive hours_worked and overtime_hours; bulk paths must call this
+        themselves since bulk_create() skips save()"""
         # Calculate hours worked if check in and check out times are provided
         if self.check_in_time and self.check_out_time:
             check_in = datetime.combine(self.date, self.check_in_time)
@@ -478,8 +536,31 @@ class Attendance(models.Model):
                 self.overtime_hours = self.hours_worked - 8
             else:
                 self.overtime_hours = 0
-                
-        super().save(*args, **kwargs)
+
+
+class ArchivedAttendance(AttendanceBase):
+    """Cold storage for attendance records moved out of the live table"""
+    employee = models.ForeignKey(
+        Employee,
+        on_delete=models.CASCADE,
+        related_name='archived_attendance_records'
+    )
+    leave_request = models.ForeignKey(
+        LeaveRequest,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_attendance_records'
+    )
+    # Timestamps are copied verbatim from the live row, so they must not be
+    # overwritten by auto_now/auto_now_add when the archive row is inserted.
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta(AttendanceBase.Meta):
+        verbose_name = 'Archived Attendance'
+        verbose_name_plural = 'Archived Attendance Records'
 
 
 class EmployeeDocument(models.Model):
@@ -505,7 +586,8 @@ class EmployeeDocument(models.Model):
         choices=DOCUMENT_TYPE_CHOICES
     )
     title = models.CharField(max_length=200)
-    document_file = models.FileField(upload_to='employee_documents/')
+    # Deduplicated by content; indexed to count a file's references
+    document_file = models.FileField(upload_to='employee_documents/', storage=document_storage, db_index=True)
     description = models.TextField(blank=True)
     upload_date = models.DateTimeField(auto_now_add=True)
     uploaded_by = models.ForeignKey(
@@ -518,8 +600,51 @@ class EmployeeDocument(models.Model):
 
     class Meta:
         ordering = ['-upload_date']
+        # Expiry scans in hr.expiry
+        indexes = [models.Index(fields=['expiry_date'])]
         verbose_name = 'Employee Document'
         verbose_name_plural = 'Employee Documents'
 
     def __str__(self):
         return f"{self.employee.full_name} - {self.title}"
+
+
+class Tombstone(models.Model):
+    """Records a deleted row so the change feed can report deletions"""
+
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['deleted_at', 'id']
+        indexes = [models.Index(fields=['model', 'deleted_at', 'id'])]
+        verbose_name = 'Tombstone'
+        verbose_name_plural = 'Tombstones'
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} deleted {self.deleted_at}"
+
+
+class ChunkedUpload(models.Model):
+    """A document upload sent in chunks; see hr.uploads"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chunked_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Chunked Upload'
+        verbose_name_plural = 'Chunked Uploads'
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size} bytes)"
+
+    @property
+    def is_complete(self):
+        return self.offset == self.size
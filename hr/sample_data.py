@@ -0,0 +1,341 @@
+"""
+Sample data generation shared by `populate_sample_data` and the admin
+benchmarks.
+
+The bulk path is deterministic: every department chunk draws from its own
+``random.Random`` seeded from ``(seed, department index)``, so the same seed
+produces the same dataset whether chunks run serially or in parallel worker
+processes (on an empty database).
+"""
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connections, transaction
+
+from .cache import DASHBOARD, invalidate
+from .models import (
+    Department, Position, Employee, LeaveType, LeaveRequest, Attendance
+)
+
+
+DEPARTMENTS = [
+    {'name': 'Human Resources', 'description': 'Manages employee relations and policies'},
+    {'name': 'Engineering', 'description': 'Software development and technical operations'},
+    {'name': 'Marketing', 'description': 'Brand promotion and customer acquisition'},
+    {'name': 'Sales', 'description': 'Customer relations and revenue generation'},
+    {'name': 'Finance', 'description': 'Financial planning and accounting'},
+    {'name': 'Operations', 'description': 'Day-to-day business operations'},
+]
+
+POSITIONS = [
+    {'title': 'HR Manager', 'department': 'Human Resources', 'min_salary': 80000, 'max_salary': 120000},
+    {'title': 'HR Specialist', 'department': 'Human Resources', 'min_salary': 50000, 'max_salary': 70000},
+    {'title': 'Senior Software Engineer', 'department': 'Engineering', 'min_salary': 120000, 'max_salary': 180000},
+    {'title': 'Software Engineer', 'department': 'Engineering', 'min_salary': 80000, 'max_salary': 120000},
+    {'title': 'Junior Developer', 'department': 'Engineering', 'min_salary': 60000, 'max_salary': 80000},
+    {'title': 'Marketing Manager', 'department': 'Marketing', 'min_salary': 90000, 'max_salary': 130000},
+    {'title': 'Marketing Specialist', 'department': 'Marketing', 'min_salary': 55000, 'max_salary': 75000},
+    {'title': 'Sales Manager', 'department': 'Sales', 'min_salary': 85000, 'max_salary': 125000},
+    {'title': 'Sales Representative', 'department': 'Sales', 'min_salary': 45000, 'max_salary': 65000},
+    {'title': 'Finance Manager', 'department': 'Finance', 'min_salary': 95000, 'max_salary': 140000},
+    {'title': 'Accountant', 'department': 'Finance', 'min_salary': 50000, 'max_salary': 70000},
+    {'title': 'Operations Manager', 'department': 'Operations', 'min_salary': 75000, 'max_salary': 110000},
+]
+
+LEAVE_TYPES = [
+    {'name': 'Annual Leave', 'max_days_per_year': 25, 'is_paid': True},
+    {'name': 'Sick Leave', 'max_days_per_year': 10, 'is_paid': True},
+    {'name': 'Maternity Leave', 'max_days_per_year': 90, 'is_paid': True},
+    {'name': 'Paternity Leave', 'max_days_per_year': 14, 'is_paid': True},
+    {'name': 'Personal Leave', 'max_days_per_year': 5, 'is_paid': False},
+    {'name': 'Emergency Leave', 'max_days_per_year': 3, 'is_paid': True},
+]
+
+FIRST_NAMES = [
+    'James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael',
+    'Linda', 'William', 'Elizabeth', 'David', 'Barbara', 'Richard', 'Susan',
+    'Joseph', 'Jessica', 'Thomas', 'Sarah', 'Charles', 'Karen', 'Wei', 'Aisha',
+    'Carlos', 'Priya', 'Kenji', 'Fatima', 'Luca', 'Amara', 'Mateo', 'Yuki',
+]
+
+LAST_NAMES = [
+    'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller',
+    'Davis', 'Rodriguez', 'Martinez', 'Hernandez', 'Lopez', 'Gonzalez',
+    'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin',
+    'Lee', 'Chen', 'Patel', 'Okafor', 'Rossi', 'Tanaka', 'Silva', 'Kim',
+]
+
+# Prefix for generated usernames, so bulk data never collides with real
+# accounts or the handcrafted sample employees
+USERNAME_PREFIX = 'loadtest'
+
+
+def create_reference_data(log=None):
+    """
+    Create (or fetch) departments, positions and leave types.
+
+    Returns ``(departments, positions, leave_types)`` where departments and
+    positions are dicts keyed by name/title and leave_types is a list.
+    """
+    departments = {}
+    for dept_data in DEPARTMENTS:
+        dept, created = Department.objects.get_or_create(
+            name=dept_data['name'],
+            defaults={'description': dept_data['description']}
+        )
+        departments[dept.name] = dept
+        if created and log:
+            log(f'Created department: {dept.name}')
+
+    positions = {}
+    for pos_data in POSITIONS:
+        pos, created = Position.objects.get_or_create(
+            title=pos_data['title'],
+            department=departments[pos_data['department']],
+            defaults={
+                'min_salary': pos_data['min_salary'],
+                'max_salary': pos_data['max_salary'],
+                'description': f'Position in {pos_data["department"]} department'
+            }
+        )
+        positions[pos.title] = pos
+        if created and log:
+            log(f'Created position: {pos.title}')
+
+    leave_types = []
+    for leave_data in LEAVE_TYPES:
+        leave_type, created = LeaveType.objects.get_or_create(
+            name=leave_data['name'],
+            defaults={
+                'max_days_per_year': leave_data['max_days_per_year'],
+                'is_paid': leave_data['is_paid'],
+                'description': f'{leave_data["name"]} for employees'
+            }
+        )
+        leave_types.append(leave_type)
+        if created and log:
+            log(f'Created leave type: {leave_type.name}')
+
+    return departments, positions, leave_types
+
+
+def _flush(model, objs, batch_size):
+    if objs:
+        model.objects.bulk_create(objs, batch_size=batch_size)
+        objs.clear()
+
+
+def _generate_department(task):
+    """
+    Generate one department's employees, attendance and leave requests.
+
+    ``task`` is a plain dict so it can be pickled to worker processes.
+    Returns ``(employees, attendance_rows, leave_requests)`` created.
+    """
+    rng = random.Random(f"{task['seed']}:{task['department_index']}")
+    batch_size = task['batch_size']
+    today = task['today']
+    first_day = today - timedelta(days=task['days'] - 1)
+    positions = task['positions']
+    leave_type_ids = task['leave_type_ids']
+    password = task['password']
+
+    counts = [0, 0, 0]
+    start = task['start_index']
+    end = start + task['count']
+    for batch_start in range(start, end, batch_size):
+        batch_end = min(batch_start + batch_size, end)
+        with transaction.atomic():
+            users = []
+            employees = []
+            for index in range(batch_start, batch_end):
+                first_name = rng.choice(FIRST_NAMES)
+                last_name = rng.choice(LAST_NAMES)
+                username = f'{USERNAME_PREFIX}{index:07d}'
+                position = rng.choice(positions)
+                users.append(User(
+                    username=username,
+                    first_name=first_name,
+                    last_name=last_name,
+                    email=f'{username}@company.com',
+                    password=password,
+                ))
+                employees.append(Employee(
+                    # Employee.save() is skipped by bulk_create, so the id
+                    # is precomputed; the index keeps it unique and stable.
+                    employee_id=f'EMP{index:08X}',
+                    first_name=first_name,
+                    last_name=last_name,
+                    personal_email=f'{username}@company.com',
+                    department_id=task['department_id'],
+                    position_id=position['id'],
+                    hire_date=today - timedelta(days=rng.randint(30, 3650)),
+                    employment_status=rng.choice(
+                        ['ACTIVE'] * 17 + ['PROBATION', 'ON_LEAVE', 'INACTIVE']
+                    ),
+                    salary=rng.randint(position['min_salary'], position['max_salary']),
+                    date_of_birth=date(
+                        rng.randint(1960, 2002), rng.randint(1, 12), rng.randint(1, 28)
+                    ),
+                    gender=rng.choice(['M', 'F', 'O', 'P']),
+                    marital_status=rng.choice(['SINGLE', 'MARRIED', 'DIVORCED']),
+                ))
+
+            User.objects.bulk_create(users, batch_size=batch_size)
+            # Not every backend returns primary keys from bulk_create, so
+            # resolve them explicitly before linking the employee profiles.
+            user_ids = dict(
+                User.objects.filter(username__in=[u.username for u in users])
+                .values_list('username', 'id')
+            )
+            for user, employee in zip(users, employees):
+                employee.user_id = user_ids[user.username]
+            Employee.objects.bulk_create(employees, batch_size=batch_size)
+            employee_ids = dict(
+                Employee.objects.filter(employee_id__in=[e.employee_id for e in employees])
+                .values_list('employee_id', 'id')
+            )
+
+            attendance = []
+            leave_requests = []
+            for employee in employees:
+                pk = employee_ids[employee.employee_id]
+                day = max(first_day, employee.hire_date)
+                while day <= today:
+                    if day.weekday() < 5:
+                        attendance.append(_attendance_row(rng, pk, day))
+                        if len(attendance) >= batch_size:
+                            counts[1] += len(attendance)
+                            _flush(Attendance, attendance, batch_size)
+                    day += timedelta(days=1)
+
+                for _ in range(rng.randint(0, 3)):
+                    start_date = first_day + timedelta(days=rng.randint(0, task['days'] + 60))
+                    leave_requests.append(LeaveRequest(
+                        employee_id=pk,
+                        leave_type_id=rng.choice(leave_type_ids),
+                        start_date=start_date,
+                        end_date=start_date + timedelta(days=rng.randint(0, 9)),
+                        reason='Generated load-test leave request',
+                        status=rng.choice(['PENDING', 'APPROVED', 'APPROVED', 'REJECTED']),
+                    ))
+
+            counts[0] += len(employees)
+            counts[1] += len(attendance)
+            counts[2] += len(leave_requests)
+            _flush(Attendance, attendance, batch_size)
+            _flush(LeaveRequest, leave_requests, batch_size)
+
+    # The first generated employee manages the rest of the chunk
+    generated = Employee.objects.filter(
+        department_id=task['department_id'],
+        employee_id__gte=f'EMP{start:08X}',
+        employee_id__lt=f'EMP{end:08X}',
+    )
+    manager = generated.order_by('employee_id').first()
+    if manager:
+        Department.objects.filter(pk=task['department_id'], manager__isnull=True).update(manager=manager)
+        generated.exclude(pk=manager.pk).update(direct_manager=manager)
+
+    return tuple(counts)
+
+
+def _attendance_row(rng, employee_pk, day):
+    status = rng.choice(
+        ['PRESENT'] * 14 + ['LATE', 'LATE', 'WORK_FROM_HOME', 'HALF_DAY', 'ABSENT']
+    )
+    row = Attendance(employee_id=employee_pk, date=day, status=status)
+    if status != 'ABSENT':
+        row.check_in_time = time(rng.randint(7, 10), rng.randint(0, 59))
+        row.check_out_time = time(
+            rng.randint(12, 13) if status == 'HALF_DAY' else rng.randint(16, 19),
+            rng.randint(0, 59),
+        )
+        row.break_duration = Decimal('0.5') if status != 'HALF_DAY' else Decimal('0')
+        # bulk_create() bypasses Attendance.save()
+        row.calculate_hours()
+    return row
+
+
+def _init_worker():
+    import django
+    django.setup()
+    # Never share the parent's database connection across a fork
+    connections.close_all()
+
+
+def generate_bulk_data(employees, days, seed, batch_size=1000, workers=1, log=None):
+    """
+    Generate ``employees`` synthetic employees with ``days`` of weekday
+    attendance history and a handful of leave requests each.
+
+    Employees are split evenly across departments and each department is
+    generated as an independent chunk. With ``workers > 1`` the chunks run
+    in separate processes (server databases only; SQLite falls back to
+    serial generation).
+    Returns ``(employees, attendance_rows, leave_requests)`` created.
+    """
+    departments, positions, leave_types = create_reference_data(log)
+
+    # Continue numbering after any previous bulk run so reruns add data
+    # instead of colliding on username/employee_id
+    offset = User.objects.filter(username__startswith=USERNAME_PREFIX).count()
+    password = make_password('password123')
+    today = date.today()
+
+    dept_list = list(departments.values())
+    per_department, remainder = divmod(employees, len(dept_list))
+    tasks = []
+    start_index = offset
+    for index, dept in enumerate(dept_list):
+        count = per_department + (1 if index < remainder else 0)
+        if not count:
+            continue
+        tasks.append({
+            'seed': seed,
+            'department_index': index,
+            'department_id': dept.pk,
+            'positions': [
+                {
+                    'id': pos.pk,
+                    'min_salary': int(pos.min_salary or 50000),
+                    'max_salary': int(pos.max_salary or 100000),
+                }
+                for pos in positions.values() if pos.department_id == dept.pk
+            ],
+            'leave_type_ids': [lt.pk for lt in leave_types],
+            'start_index': start_index,
+            'count': count,
+            'days': days,
+            'today': today,
+            'batch_size': batch_size,
+            'password': password,
+        })
+        start_index += count
+
+    if workers > 1 and connections['default'].vendor == 'sqlite':
+        # SQLite allows a single writer, so parallel chunks would only
+        # contend for the database lock
+        if log:
+            log('SQLite does not support concurrent writers; generating serially')
+        workers = 1
+
+    if workers > 1:
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = list(pool.map(_generate_department, tasks))
+    else:
+        results = []
+        for task in tasks:
+            results.append(_generate_department(task))
+            if log:
+                log(f"Generated {task['count']} employees for department #{task['department_index'] + 1}")
+
+    # Bulk inserts bypass the save signals that keep the dashboard current
+    invalidate(DASHBOARD)
+    return tuple(sum(column) for column in zip(*results)) if results else (0, 0, 0)
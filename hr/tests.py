@@ -1,3 +1,1566 @@
-from django.test import TestCase
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import date, timedelta
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from hr_system.metrics import MetricsRegistry
+
+from .archive import archive_attendance, attendance_history
+from .benchmarks import (
+    ensure_benchmark_objects, get_query_budget, get_view_requests,
+    run_admin_benchmarks,
+)
+from .models import Attendance, ArchivedAttendance, Employee
+from .sample_data import generate_bulk_data
+
+
+class AdminQueryBudgetTests(TestCase):
+    """Every admin view must stay within its query budget; with several
+    rows per page, an N+1 query pattern blows through it"""
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_bulk_data(employees=24, days=3, seed=7)
+        ensure_benchmark_objects()
+        cls.user = User.objects.create_superuser('admin', 'admin@company.com', 'admin')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_admin_views_within_query_budget(self):
+        for model, model_admin in admin.site._registry.items():
+            label = f'{model._meta.app_label}.{model._meta.model_name}'
+            for view, method, url, data in get_view_requests(model_admin):
+                with self.subTest(model=label, view=view):
+                    with CaptureQueriesContext(connection) as ctx:
+                        response = getattr(self.client, method)(url, data)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertLessEqual(
+                        len(ctx.captured_queries), get_query_budget(label, view)
+                    )
+
+    def test_dashboard_within_query_budget(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/admin/')
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(ctx.captured_queries), get_query_budget('admin', 'dashboard'))
+
+    def test_run_admin_benchmarks_reports_every_view(self):
+        results = run_admin_benchmarks(self.user, repeat=1)
+        views = {(r['model'], r['view']) for r in results}
+        self.assertIn(('hr.employee', 'export'), views)
+        self.assertIn(('admin', 'dashboard_callback'), views)
+        self.assertTrue(all(r['within_budget'] for r in results), results)
+
+    def test_benchmark_commands_refuse_zero_repeats(self):
+        from django.core.management import CommandError, call_command
+
+        for command in ('benchmark_admin', 'benchmark_dashboard'):
+            with self.assertRaisesMessage(CommandError, 'must be a positive integer'):
+                call_command(command, '--repeat', '0')
+
+
+class SampleDataTests(TestCase):
+
+    def test_bulk_generation_precomputes_derived_fields(self):
+        employees, attendance, _ = generate_bulk_data(employees=12, days=7, seed=1)
+        self.assertEqual(employees, 12)
+        self.assertEqual(Attendance.objects.count(), attendance)
+        self.assertFalse(Employee.objects.filter(employee_id='').exists())
+        self.assertFalse(
+            Attendance.objects.exclude(check_in_time=None).filter(hours_worked=None).exists()
+        )
+
+    def test_same_seed_generates_same_data(self):
+        generate_bulk_data(employees=6, days=2, seed=3)
+        first = list(Employee.objects.order_by('employee_id').values_list('first_name', 'last_name', 'salary'))
+        Employee.objects.all().delete()
+        User.objects.all().delete()
+        generate_bulk_data(employees=6, days=2, seed=3)
+        second = list(Employee.objects.order_by('employee_id').values_list('first_name', 'last_name', 'salary'))
+        self.assertEqual(first, second)
+
+
+class AttendanceArchiveTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_bulk_data(employees=6, days=30, seed=5)
+
+    def test_archive_moves_old_rows_in_batches(self):
+        cutoff = date.today() - timedelta(days=10)
+        old_rows = Attendance.objects.filter(date__lt=cutoff).count()
+        total = Attendance.objects.count()
+
+        moved = archive_attendance(cutoff, batch_size=7)
+
+        self.assertEqual(moved, old_rows)
+        self.assertFalse(Attendance.objects.filter(date__lt=cutoff).exists())
+        self.assertEqual(ArchivedAttendance.objects.count(), old_rows)
+        self.assertEqual(attendance_history().count(), total)
+
+    def test_archiving_is_not_deletion(self):
+        from .models import Tombstone
+
+        cutoff = date.today() - timedelta(days=10)
+        old_rows = Attendance.objects.filter(date__lt=cutoff).count()
+        with CaptureQueriesContext(connection) as ctx:
+            archive_attendance(cutoff, batch_size=50)
+        self.assertFalse(Tombstone.objects.exists())
+        # SELECT, INSERT and DELETE per batch, plus transaction statements
+        batches = -(-old_rows // 50) + 1
+        self.assertLessEqual(len(ctx.captured_queries), batches * 5)
+
+    def test_rows_clashing_with_the_archive_stay_live(self):
+        cutoff = date.today() - timedelta(days=10)
+        row = Attendance.objects.filter(date__lt=cutoff).order_by('pk').first()
+        # Archived earlier under another id, e.g. before being entered again
+        ArchivedAttendance.objects.create(
+            id=row.pk + 100000, employee=row.employee, date=row.date, status='ABSENT',
+            created_at=row.created_at, updated_at=row.updated_at,
+        )
+        old_rows = Attendance.objects.filter(date__lt=cutoff).count()
+        kept = []
+        with self.assertLogs('hr.archive', 'WARNING'):
+            moved = archive_attendance(cutoff, batch_size=7, conflicts=kept.extend)
+        self.assertEqual(moved, old_rows - 1)
+        self.assertEqual(kept, [row.pk])
+        self.assertEqual(list(Attendance.objects.filter(date__lt=cutoff).values_list('pk', flat=True)), [row.pk])
+
+    def test_history_without_the_date_field_and_read_only_archive(self):
+        archive_attendance(date.today() - timedelta(days=10))
+        history = list(attendance_history('status'))
+        self.assertEqual(len(history), Attendance.objects.count() + ArchivedAttendance.objects.count())
+        self.assertIn('date', history[0])
+
+        request = RequestFactory().get('/admin/')
+        request.user = User.objects.create_superuser('admin', 'admin@company.com', 'admin')
+        self.assertFalse(admin.site._registry[ArchivedAttendance].has_delete_permission(request))
+
+    def test_history_includes_archived_rows(self):
+        employee = Employee.objects.first()
+        cutoff = date.today() - timedelta(days=10)
+        archive_attendance(cutoff)
+        history = list(attendance_history('date', employee=employee))
+        self.assertTrue(any(row['is_archived'] for row in history))
+        self.assertTrue(any(not row['is_archived'] for row in history))
+
+
+class RequestProfilingMiddlewareTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@company.com', 'admin')
+
+    def test_disabled_by_default(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/admin/')
+        self.assertNotIn('Server-Timing', response)
+
+    @override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SLOW_MS=0)
+    def test_server_timing_and_slow_request_log(self):
+        self.client.force_login(self.user)
+        with self.assertLogs('hr_system.profiling', level='WARNING') as logs:
+            response = self.client.get('/admin/')
+        timing = response['Server-Timing']
+        for metric in ('sql;', 'view;', 'render;', 'admin-context;', 'total;'):
+            self.assertIn(metric, timing)
+        self.assertIn('Slow request: GET /admin/', logs.output[0])
+
+
+class MetricsTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('admin', 'admin@company.com', 'admin')
+
+    def make_registry(self):
+        metrics = MetricsRegistry()
+        metrics.histogram('latency_seconds', 'Latency.', buckets=(0.1, 1.0))
+        metrics.counter('queries_total', 'Queries.')
+        return metrics
+
+    def test_histogram_render(self):
+        metrics = self.make_registry()
+        metrics.observe('latency_seconds', {'view': 'a'}, 0.05)
+        metrics.observe('latency_seconds', {'view': 'a'}, 0.5)
+        metrics.observe('latency_seconds', {'view': 'a'}, 5)
+        output = metrics.render()
+        self.assertIn('# TYPE latency_seconds histogram', output)
+        self.assertIn('latency_seconds_bucket{view="a",le="0.1"} 1', output)
+        self.assertIn('latency_seconds_bucket{view="a",le="1"} 2', output)
+        self.assertIn('latency_seconds_bucket{view="a",le="+Inf"} 3', output)
+        self.assertIn('latency_seconds_count{view="a"} 3', output)
+
+    def test_snapshots_from_several_processes_are_merged(self):
+        worker_a, worker_b = self.make_registry(), self.make_registry()
+        worker_a.inc('queries_total', {'view': 'x'}, 3)
+        worker_b.inc('queries_total', {'view': 'x'}, 4)
+        worker_b.observe('latency_seconds', {'view': 'x'}, 0.2)
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'metrics-1.json'), 'w') as fh:
+                json.dump(worker_a.snapshot(), fh)
+            with override_settings(METRICS_DIR=directory):
+                worker_b.flush()
+                merged = worker_b.collect().render()
+        self.assertIn('queries_total{view="x"} 7', merged)
+        self.assertIn('latency_seconds_count{view="x"} 1', merged)
+
+    @override_settings(METRICS_ENABLED=True, METRICS_DIR='')
+    def test_middleware_records_views_and_admin_actions(self):
+        self.client.force_login(self.user)
+        self.client.get('/admin/hr/employee/')
+        self.client.post('/admin/hr/employee/', {'action': 'delete_selected', '_selected_action': []})
+        output = self.client.get('/metrics').content.decode()
+        self.assertIn('hr_http_requests_total{method="GET",status="200",view="admin:hr_employee_changelist"}', output)
+        self.assertIn('hr_db_queries_total{view="admin:hr_employee_changelist"}', output)
+        self.assertIn('hr_admin_action_duration_seconds_count{action="delete_selected",model="hr_employee"}', output)
+
+    @override_settings(METRICS_ENABLED=True, METRICS_DIR='')
+    def test_unregistered_admin_actions_share_one_label(self):
+        self.client.force_login(self.user)
+        for action in ('made_up_1', 'made_up_2'):
+            self.client.post('/admin/hr/department/', {'action': action, '_selected_action': []})
+        output = self.client.get('/metrics').content.decode()
+        self.assertIn('hr_admin_action_duration_seconds_count{action="other",model="hr_department"} 2', output)
+        self.assertNotIn('made_up', output)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.1'])
+    def test_endpoint_restricted_to_allowed_ips(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+
+class SQLiteProfileTests(TestCase):
+
+    def test_production_profile_pragmas_and_transaction_mode(self):
+        from django.conf import settings
+        from django.db import DEFAULT_DB_ALIAS, connections
+
+        from hr.management.commands.benchmark_sqlite import BENCHMARK_ALIAS, run_profile
+
+        with tempfile.TemporaryDirectory() as directory:
+            database = {
+                'ENGINE': 'hr_system.sqlite3',
+                'NAME': os.path.join(directory, 'profile.sqlite3'),
+                **settings.SQLITE_PRODUCTION_PROFILE,
+            }
+            connections.settings[BENCHMARK_ALIAS] = connections.configure_settings(
+                {DEFAULT_DB_ALIAS: database}
+            )[DEFAULT_DB_ALIAS]
+            try:
+                db = connections[BENCHMARK_ALIAS]
+                with db.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    self.assertEqual(cursor.fetchone()[0], 'wal')
+                    cursor.execute('PRAGMA synchronous')
+                    self.assertEqual(cursor.fetchone()[0], 1)
+                    cursor.execute('PRAGMA busy_timeout')
+                    self.assertEqual(cursor.fetchone()[0], settings.SQLITE_BUSY_TIMEOUT_MS)
+                self.assertEqual(db.transaction_mode, 'IMMEDIATE')
+            finally:
+                connections[BENCHMARK_ALIAS].close()
+                del connections.settings[BENCHMARK_ALIAS]
+
+        result = run_profile(settings.SQLITE_PRODUCTION_PROFILE, 4, 25, 0.5, 200, 1)
+        self.assertEqual(result['errors'], 0)
+        self.assertEqual(result['requests'], 100)
+
+
+class ReplicaRouterTests(TransactionTestCase):
+    """Reads in replica_reads() blocks go to a copied SQLite file until the
+    request writes, or the client is pinned to the primary"""
+
+    # Allows the replica alias when DATABASE_REPLICA_NAME is set
+    databases = '__all__'
+
+    def setUp(self):
+        from django.db import DEFAULT_DB_ALIAS, connections
+
+        from hr_system.routers import REPLICA_ALIAS
+
+        from .models import Department
+
+        Department.objects.create(name='Engineering')
+        self.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(self.directory.name, 'replica.sqlite3')
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+
+        self.configured_replica = connections.settings.pop(REPLICA_ALIAS, None)
+        if self.configured_replica is not None:
+            connections[REPLICA_ALIAS].close()
+            del connections[REPLICA_ALIAS]
+        connections.settings[REPLICA_ALIAS] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: {
+                'ENGINE': 'hr_system.sqlite3',
+                'NAME': path,
+                'OPTIONS': {'pragmas': {'query_only': 'ON'}},
+            },
+        })[DEFAULT_DB_ALIAS]
+        # Only on the primary
+        Department.objects.create(name='Finance')
+
+    def tearDown(self):
+        from django.db import connections
+
+        from hr_system.routers import REPLICA_ALIAS
+
+        connections[REPLICA_ALIAS].close()
+        del connections[REPLICA_ALIAS]
+        del connections.settings[REPLICA_ALIAS]
+        if self.configured_replica is not None:
+            connections.settings[REPLICA_ALIAS] = self.configured_replica
+        self.directory.cleanup()
+
+    def test_routing(self):
+        from django.db import OperationalError
+        from django.http import HttpResponse
+        from django.test import RequestFactory
+
+        from hr_system.routers import PIN_COOKIE, ReplicaPinMiddleware, replica_reads
+
+        from .models import Department
+
+        def read_view(request):
+            with replica_reads():
+                return HttpResponse(str(Department.objects.count()))
+
+        def write_view(request):
+            Department.objects.create(name='Sales')
+            return read_view(request)
+
+        response = ReplicaPinMiddleware(read_view)(RequestFactory().get('/'))
+        self.assertEqual(response.content, b'1')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+        # Read-after-write within the request stays on the primary
+        response = ReplicaPinMiddleware(write_view)(RequestFactory().post('/'))
+        self.assertEqual(response.content, b'3')
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        request = RequestFactory().get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        self.assertEqual(ReplicaPinMiddleware(read_view)(request).content, b'3')
+        self.assertEqual(ReplicaPinMiddleware(read_view)(RequestFactory().get('/')).content, b'1')
+
+        with self.assertRaises(OperationalError):
+            Department.objects.using('replica').create(name='Legal')
+
+    def test_only_executed_writes_pin_to_the_primary(self):
+        from django.db import router
+        from django.http import HttpResponse
+
+        from hr_system.routers import PIN_COOKIE, ReplicaPinMiddleware, replica_reads
+
+        from .models import Department
+
+        def form_view(request):
+            # Admin views pick the write alias before showing a form
+            router.db_for_write(Department)
+            with replica_reads():
+                return HttpResponse(str(Department.objects.count()))
+
+        def update_view(request):
+            Department.objects.filter(name='Finance').update(description='Budgets')
+            return form_view(request)
+
+        response = ReplicaPinMiddleware(form_view)(RequestFactory().get('/'))
+        self.assertEqual(response.content, b'1')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        # Queryset updates send no signal but are writes all the same
+        response = ReplicaPinMiddleware(update_view)(RequestFactory().post('/'))
+        self.assertEqual(response.content, b'2')
+        self.assertIn(PIN_COOKIE, response.cookies)
+        # The flag does not outlive the request
+        self.assertEqual(ReplicaPinMiddleware(form_view)(RequestFactory().get('/')).content, b'1')
+
+    def test_cached_values_are_computed_on_the_primary(self):
+        from django.http import HttpResponse
+
+        from hr_system.routers import ReplicaPinMiddleware, replica_reads
+
+        from .cache import invalidate, memoize
+        from .models import Department
+
+        @memoize('test-replica')
+        def department_count():
+            return Department.objects.count()
+
+        def dashboard_view(request):
+            with replica_reads():
+                return HttpResponse(f'{Department.objects.count()} {department_count()}')
+
+        invalidate('test-replica')
+        self.assertEqual(ReplicaPinMiddleware(dashboard_view)(RequestFactory().get('/')).content, b'1 2')
+
+
+class CacheTests(TestCase):
+
+    def test_tiered_cache_reads_through_to_shared_tier(self):
+        from django.core.cache import cache, caches
+
+        cache.set('tiered-test', 'value')
+        self.assertEqual(caches['shared'].get('tiered-test'), 'value')
+        # Another process only has the shared tier
+        cache.local.clear()
+        self.assertEqual(cache.get('tiered-test'), 'value')
+        self.assertTrue(cache.local.has_key('tiered-test'))
+        cache.delete('tiered-test')
+        self.assertIsNone(caches['shared'].get('tiered-test'))
+
+    def test_memoize_and_namespace_invalidation(self):
+        from .cache import invalidate, memoize
+
+        calls = []
+
+        @memoize('test-namespace')
+        def square(value):
+            calls.append(value)
+            return value * value
+
+        self.assertEqual(square(3), 9)
+        self.assertEqual(square(3), 9)
+        self.assertEqual(square(4), 16)
+        self.assertEqual(calls, [3, 4])
+        invalidate('test-namespace')
+        self.assertEqual(square(3), 9)
+        self.assertEqual(calls, [3, 4, 3])
+
+    def test_dashboard_stats_invalidated_on_save(self):
+        from hr_system.utils import dashboard_stats
+
+        from .models import Department
+
+        today = date.today()
+        generate_bulk_data(employees=4, days=1, seed=3)
+        stats = dashboard_stats(today)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(dashboard_stats(today), stats)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+        Employee.objects.filter(is_active=True).first().save(update_fields=['is_active'])
+        Department.objects.create(name='Empty department')
+        with CaptureQueriesContext(connection) as ctx:
+            dashboard_stats(today)
+        self.assertGreater(len(ctx.captured_queries), 0)
+
+
+class LookupCacheTests(TestCase):
+
+    def setUp(self):
+        generate_bulk_data(employees=6, days=1, seed=5)
+
+    def test_lookups_are_query_free_until_a_row_changes(self):
+        from .lookups import departments, positions
+        from .models import Department, Position
+
+        departments.all()
+        positions.all()
+        with CaptureQueriesContext(connection) as ctx:
+            names = [label for _, label in departments.choices()]
+            position_labels = [str(position) for position in Position.objects.all()]
+        # Only the position query itself; no department query per position
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(names, list(Department.objects.values_list('name', flat=True)))
+        self.assertTrue(all(' - ' in label for label in position_labels))
+
+        department = Department.objects.first()
+        department.name = 'Renamed'
+        department.save()
+        self.assertIn('Renamed', [label for _, label in departments.choices()])
+        self.assertTrue(any(label.endswith(' - Renamed') for _, label in positions.choices()))
+
+    def test_import_resolves_department_and_position(self):
+        import tablib
+
+        from .admin import EmployeeResource
+
+        employee = Employee.objects.select_related('department', 'position').first()
+        dataset = EmployeeResource().export(queryset=Employee.objects.filter(pk=employee.pk))
+        dataset = tablib.Dataset().load(dataset.csv.replace(employee.first_name, 'Imported'), format='csv')
+        result = EmployeeResource().import_data(dataset)
+        self.assertFalse(result.has_errors())
+        employee.refresh_from_db()
+        self.assertEqual(employee.first_name, 'Imported')
+
+
+class AuthCacheTests(TestCase):
+
+    def setUp(self):
+        from django.contrib.auth.models import Group, Permission
+
+        self.group = Group.objects.create(name='HR viewers')
+        self.group.permissions.add(Permission.objects.get(codename='view_department'))
+        self.user = User.objects.create_user('viewer', password='viewer', is_staff=True)
+        self.user.groups.add(self.group)
+        self.client.login(username='viewer', password='viewer')
+
+    def auth_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        tables = ('django_session', 'auth_user', 'auth_permission', 'auth_group')
+        return response, [q['sql'] for q in ctx.captured_queries if any(t in q['sql'] for t in tables)]
+
+    def test_warm_requests_skip_session_user_and_permission_queries(self):
+        from django.contrib.auth.models import Permission
+
+        url = '/admin/hr/department/'
+        self.client.get(url)
+        response, queries = self.auth_queries(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+        # Group permission changes apply to members on their next request
+        self.assertEqual(self.auth_queries('/admin/hr/position/')[0].status_code, 403)
+        self.group.permissions.add(Permission.objects.get(codename='view_position'))
+        self.assertEqual(self.client.get('/admin/hr/position/').status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+
+class SidebarNavigationTests(TestCase):
+
+    def setUp(self):
+        generate_bulk_data(employees=6, days=1, seed=9)
+        self.user = User.objects.create_superuser('admin', 'admin@company.com', 'admin')
+
+    def sidebar_request(self, path='/admin/hr/leaverequest/'):
+        from django.test import RequestFactory
+
+        request = RequestFactory().get(path)
+        request.user = self.user
+        return request
+
+    def navigation_items(self, request):
+        return {
+            item['title']: item
+            for group in admin.site.get_sidebar_list(request) for item in group['items']
+        }
+
+    def test_sidebar_is_query_free_until_a_counted_row_changes(self):
+        from .models import LeaveRequest
+
+        request = self.sidebar_request()
+        self.navigation_items(request)
+        with CaptureQueriesContext(connection) as ctx:
+            items = self.navigation_items(request)
+        self.assertEqual(ctx.captured_queries, [])
+        self.assertTrue(items['Leave Requests']['active'])
+        self.assertFalse(items['Employees']['active'])
+        self.assertEqual(items['Leave Requests']['link'], '/admin/hr/leaverequest/')
+
+        pending = LeaveRequest.objects.filter(status='PENDING').count()
+        self.assertEqual(items['Leave Requests'].get('badge_callback'), pending or None)
+        leave_request = LeaveRequest.objects.exclude(status='PENDING').first()
+        leave_request.status = 'PENDING'
+        leave_request.save()
+        items = self.navigation_items(request)
+        self.assertEqual(items['Leave Requests']['badge_callback'], pending + 1)
+
+    def test_badges_need_view_permission(self):
+        self.user = User.objects.create_user('staff', is_staff=True)
+        items = self.navigation_items(self.sidebar_request())
+        self.assertNotIn('badge', items['Leave Requests'])
+        self.assertNotIn('badge', items['Documents'])
+
+
+class StaticFilesTests(TestCase):
+
+    def setUp(self):
+        from django.core.management import call_command
+
+        self.root = tempfile.mkdtemp(prefix='hr-static-')
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings_override = override_settings(STATIC_ROOT=self.root, STATIC_SERVE=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def test_hashed_assets_are_precompressed_and_immutable(self):
+        from django.http import HttpResponse
+        from django.templatetags.static import static
+        from django.test import RequestFactory
+
+        from hr_system.staticfiles import StaticFilesMiddleware
+
+        url = static('css/custom-admin.css')
+        self.assertRegex(url, r'^/static/css/custom-admin\.[0-9a-f]{12}\.css$')
+        middleware = StaticFilesMiddleware(lambda request: HttpResponse(status=404))
+        factory = RequestFactory()
+
+        response = middleware(factory.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        body = gzip.decompress(b''.join(response.streaming_content))
+        with open(os.path.join(self.root, url.removeprefix('/static/')), 'rb') as source:
+            self.assertEqual(body, source.read())
+
+        revalidated = middleware(
+            factory.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag']),
+        )
+        self.assertEqual(revalidated.status_code, 304)
+        # The gzip validator does not vouch for the uncompressed bytes
+        identity = middleware(factory.get(url, HTTP_IF_NONE_MATCH=response['ETag']))
+        self.assertEqual(identity.status_code, 200)
+        self.assertNotEqual(identity['ETag'], response['ETag'])
+        plain = middleware(factory.get('/static/css/custom-admin.css'))
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertNotIn('immutable', plain['Cache-Control'])
+        self.assertEqual(middleware(factory.get('/static/missing.css')).status_code, 404)
+
+
+
+class ConcurrentDashboardTests(TransactionTestCase):
+    """Widgets run on other threads, which only see committed rows"""
+
+    def test_concurrent_widgets_match_sequential(self):
+        import threading
+        from unittest import mock
+
+        from hr_system import utils
+
+        from .cache import DASHBOARD, invalidate
+
+        generate_bulk_data(employees=8, days=2, seed=11)
+        today = date.today()
+        with override_settings(DASHBOARD_WORKERS=0):
+            expected = utils.load_dashboard_widgets(today)
+
+        threads = set()
+
+        def recent_employees(today):
+            threads.add(threading.current_thread().name)
+            return utils.recent_employees(today)
+
+        invalidate(DASHBOARD)
+        with override_settings(DASHBOARD_WORKERS=4), \
+                mock.patch.dict(utils.ACTIVITY_WIDGETS, recent_employees=recent_employees):
+            self.assertEqual(utils.load_dashboard_widgets(today), expected)
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads.pop().startswith('dashboard'))
+
+
+class StartupImportTests(TestCase):
+
+    def test_setup_does_not_import_optional_feature_dependencies(self):
+        from .management.commands.benchmark_startup import profile_startup
+
+        self.assertEqual(profile_startup('setup', runs=1)['loaded'], [])
+
+    def test_commands_do_not_import_them_through_system_checks(self):
+        from .management.commands.benchmark_startup import profile_startup
+
+        self.assertEqual(profile_startup('command', runs=1)['loaded'], [])
+
+    def test_phone_numbers_are_parsed_on_access(self):
+        generate_bulk_data(employees=1, days=1, seed=13)
+        employee = Employee.objects.get()
+        employee.phone_number = '+1 202-555-0143'
+        employee.full_clean(exclude=['user'])
+        employee.save()
+
+        employee = Employee.objects.get()
+        self.assertEqual(employee.__dict__['phone_number'], '+12025550143')
+        self.assertEqual(employee.phone_number.as_national, '(202) 555-0143')
+        employee.phone_number = 'not a number'
+        with self.assertRaises(ValidationError):
+            employee.full_clean(exclude=['user'])
+
+
+class WarmupTests(TransactionTestCase):
+
+    def test_warmup_compiles_admin_templates_and_loads_lookups(self):
+        import asyncio
+
+        from django.template import engines
+
+        from hr_system.warmup import warmup
+
+        from .cache import invalidate
+        from .lookups import departments
+
+        generate_bulk_data(employees=2, days=1, seed=17)
+        results = warmup()
+        lookups = results['lookups'][0]
+        self.assertEqual(list(results), ['urls', 'templates', 'admin_config', 'lookups'])
+        self.assertTrue(all(result for result, _ in results.values()), results)
+        cached_loader = engines['django'].engine.template_loaders[0]
+        self.assertIn('admin/change_list.html', {key.split('-')[0] for key in cached_loader.get_template_cache})
+
+        async def start_in_event_loop():
+            return warmup()
+
+        # The ORM refuses to run inside an event loop, so warmup moves to a thread
+        invalidate(departments.namespace)
+        results = asyncio.run(start_in_event_loop())
+        self.assertEqual(results['lookups'][0], lookups)
+
+
+class EmployeeApiTests(TestCase):
+
+    def setUp(self):
+        generate_bulk_data(employees=7, days=1, seed=23)
+        User.objects.create_superuser('api', 'api@company.com', 'api')
+        self.client.login(username='api', password='api')
+
+    def test_cursor_pages_cover_every_row_once_with_sparse_fields(self):
+        ids, url = [], '/api/employees/?fields=employee_id,department_name&limit=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            self.assertLessEqual(len(page['results']), 3)
+            self.assertTrue(all(set(row) == {'employee_id', 'department_name'} for row in page['results']))
+            ids += [row['employee_id'] for row in page['results']]
+            url = page['next']
+        self.assertEqual(sorted(ids), sorted(Employee.objects.values_list('employee_id', flat=True)))
+
+        # Rows updated after a page was read come back on a later page
+        first = self.client.get('/api/employees/?fields=id&limit=3').json()
+        Employee.objects.get(pk=first['results'][0]['id']).save()
+        rest = []
+        url = first['next']
+        while url:
+            page = self.client.get(url).json()
+            rest += [row['id'] for row in page['results']]
+            url = page['next']
+        self.assertEqual(rest[-1], first['results'][0]['id'])
+
+    def test_etag_conditional_requests(self):
+        url = '/api/departments/?fields=id,name'
+        response = self.client.get(url)
+        etag = response['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        from .models import Department
+
+        department = Department.objects.first()
+        department.name += ' (renamed)'
+        department.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_errors_and_authentication(self):
+        import base64
+
+        employee = Employee.objects.first()
+        response = self.client.get(f'/api/employees/{employee.pk}/?fields=employee_id,position_title')
+        self.assertEqual(response.json(), {
+            'employee_id': employee.employee_id, 'position_title': employee.position.title,
+        })
+        self.assertEqual(self.client.get('/api/employees/?fields=salary,password').status_code, 400)
+        self.assertEqual(self.client.get('/api/employees/?cursor=bogus').status_code, 400)
+        self.assertEqual(self.client.get('/api/payslips/').status_code, 404)
+        self.assertEqual(self.client.post('/api/employees/').status_code, 405)
+
+        self.client.logout()
+        response = self.client.get('/api/employees/')
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('Basic', response['WWW-Authenticate'])
+        User.objects.create_user('staff', password='staff')
+        credentials = base64.b64encode(b'staff:staff').decode()
+        response = self.client.get('/api/positions/', HTTP_AUTHORIZATION=f'Basic {credentials}')
+        self.assertEqual(response.status_code, 403)
+        credentials = base64.b64encode(b'api:api').decode()
+        response = self.client.get('/api/positions/', HTTP_AUTHORIZATION=f'Basic {credentials}')
+        self.assertEqual(response.status_code, 200)
+
+
+class ChangeFeedTests(TestCase):
+
+    def setUp(self):
+        generate_bulk_data(employees=5, days=2, seed=29)
+
+    def test_feed_reports_changed_rows_and_tombstones_since_a_timestamp(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        since = timezone.now()
+        changed, deleted = Employee.objects.order_by('pk')[:2]
+        changed.save()
+        deleted_pk = deleted.pk
+        attendance_pks = set(deleted.attendance_records.values_list('pk', flat=True))
+        deleted.delete()
+
+        out, err = StringIO(), StringIO()
+        call_command('changes', 'hr.Employee', since=since.isoformat(), stdout=out, stderr=err)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [(line['op'], line['id']) for line in lines], [('upsert', changed.pk), ('delete', deleted_pk)],
+        )
+        self.assertIn('1 changed, 1 deleted', err.getvalue())
+
+        # Cascaded deletes are recorded too
+        out = StringIO()
+        call_command('changes', 'hr.Attendance', since=since.isoformat(), stdout=out, stderr=StringIO())
+        self.assertEqual({json.loads(line)['id'] for line in out.getvalue().splitlines()}, attendance_pks)
+
+        User.objects.create_superuser('api', 'api@company.com', 'api')
+        self.client.login(username='api', password='api')
+        response = self.client.get('/api/employees/', {'since': since.isoformat(), 'fields': 'id'})
+        self.assertEqual(response.json()['results'], [{'id': changed.pk}])
+        response = self.client.get('/api/employees/deleted/', {'since': since.isoformat()})
+        self.assertEqual([row['id'] for row in response.json()['results']], [deleted_pk])
+        self.assertEqual(self.client.get('/api/employees/deleted/').status_code, 400)
+
+    def test_next_since_covers_rows_committed_late(self):
+        from datetime import timedelta
+        from io import StringIO
+
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        def changes(since):
+            out, err = StringIO(), StringIO()
+            call_command('changes', 'hr.Employee', since=since, stdout=out, stderr=err)
+            ids = [json.loads(line)['id'] for line in out.getvalue().splitlines()]
+            return ids, err.getvalue().rsplit(' ', 1)[-1].strip()
+
+        employees = list(Employee.objects.order_by('pk')[:2])
+        employees[0].save()
+        with override_settings(CHANGE_FEED_SAFETY_LAG_SECONDS=60):
+            _, since = changes((timezone.now() - timedelta(hours=1)).isoformat())
+        # A transaction that wrote before the read but committed after it
+        Employee.objects.filter(pk=employees[1].pk).update(
+            updated_at=Employee.objects.get(pk=employees[0].pk).updated_at - timedelta(seconds=1),
+        )
+        ids, _ = changes(since)
+        self.assertIn(employees[1].pk, ids)
+
+    def test_purge_drops_expired_tombstones(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from .changes import purge_tombstones
+        from .models import Tombstone
+
+        Employee.objects.first().delete()
+        expired = Tombstone.objects.update(deleted_at=timezone.now() - timedelta(days=120))
+        Employee.objects.first().delete()
+        recent = Tombstone.objects.count() - expired
+        with override_settings(TOMBSTONE_RETENTION_DAYS=90):
+            self.assertEqual(purge_tombstones(), expired)
+        self.assertEqual(Tombstone.objects.count(), recent)
+
+
+class ImportFingerprintTests(TestCase):
+
+    def setUp(self):
+        generate_bulk_data(employees=12, days=1, seed=31)
+
+    def reimport(self, dataset):
+        from .admin import EmployeeResource
+
+        with CaptureQueriesContext(connection) as ctx:
+            result = EmployeeResource().import_data(dataset)
+        self.assertFalse(result.has_errors() or result.has_validation_errors())
+        # Per-row savepoints aside, only these touch the database
+        return result.totals, [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+
+    def test_unchanged_rows_are_skipped_without_loading_employees(self):
+        import tablib
+
+        from .admin import EmployeeResource
+
+        csv = EmployeeResource().export().csv
+        dataset = tablib.Dataset().load(csv, format='csv')
+        # The first import fingerprints every row without changing any
+        totals, _ = self.reimport(dataset)
+        self.assertEqual(totals['skip'], 12)
+
+        totals, queries = self.reimport(dataset)
+        self.assertEqual((totals['skip'], totals['update']), (12, 0))
+        # The bulk fingerprint comparison is the only query
+        self.assertEqual(len(queries), 1, queries)
+
+        employee = Employee.objects.order_by('pk').first()
+        changed = tablib.Dataset().load(csv.replace(employee.first_name, 'Renamed', 1), format='csv')
+        totals, _ = self.reimport(changed)
+        self.assertEqual((totals['skip'], totals['update']), (11, 1))
+        employee.refresh_from_db()
+        self.assertEqual(employee.first_name, 'Renamed')
+
+        # An employee edited since the last import is compared again
+        employee.first_name = 'Edited'
+        employee.save()
+        totals, _ = self.reimport(changed)
+        self.assertEqual((totals['skip'], totals['update']), (11, 1))
+        employee.refresh_from_db()
+        self.assertEqual(employee.first_name, 'Renamed')
+
+
+class ThumbnailTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        overrides = override_settings(MEDIA_ROOT=self.media_root, EMPLOYEE_THUMBNAIL_SIZE=80)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        generate_bulk_data(employees=2, days=1, seed=37)
+
+    def photo(self, name='photo.png'):
+        from io import BytesIO
+
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new('RGB', (1200, 800), 'teal').save(buffer, 'PNG')
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+    def test_upload_generates_thumbnails_used_lazily_by_the_changelist(self):
+        from PIL import Image
+
+        from .thumbnails import thumbnail_names
+
+        employee = Employee.objects.first()
+        employee.employee_photo = self.photo()
+        employee.save()
+        names = thumbnail_names(employee.employee_photo.name)
+        for image_format, name in names.items():
+            with Image.open(os.path.join(self.media_root, name)) as image:
+                self.assertEqual((image.format, image.size), (image_format, (80, 80)))
+
+        User.objects.create_superuser('admin', 'admin@company.com', 'admin')
+        self.client.login(username='admin', password='admin')
+        content = self.client.get('/admin/hr/employee/').content.decode()
+        self.assertIn(f'/media/{names["JPEG"]}', content)
+        self.assertIn('loading="lazy"', content)
+        self.assertNotIn(employee.employee_photo.url, content)
+
+    def test_backfill_generates_missing_thumbnails(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from .thumbnails import thumbnail_names
+
+        employee = Employee.objects.first()
+        employee.employee_photo = self.photo()
+        employee.save()
+        names = thumbnail_names(employee.employee_photo.name)
+        for name in names.values():
+            os.remove(os.path.join(self.media_root, name))
+        broken = Employee.objects.last()
+        Employee.objects.filter(pk=broken.pk).update(employee_photo='employee_photos/missing.png')
+
+        out = StringIO()
+        call_command('backfill_thumbnails', stdout=out)
+        self.assertIn('Thumbnails ready for 1 photos', out.getvalue())
+        self.assertIn('1 photos could not be read', out.getvalue())
+        self.assertTrue(all(os.path.exists(os.path.join(self.media_root, name)) for name in names.values()))
+
+
+class DocumentStorageTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        overrides = override_settings(MEDIA_ROOT=self.media_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        generate_bulk_data(employees=2, days=1, seed=41)
+        self.employee = Employee.objects.first()
+
+    def upload(self, content, name='contract.pdf'):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        from .models import EmployeeDocument
+
+        return EmployeeDocument.objects.create(
+            employee=self.employee, document_type='CONTRACT', title='Employment contract',
+            document_file=SimpleUploadedFile(name, content),
+        )
+
+    def age_files(self):
+        # Past DOCUMENT_RELEASE_GRACE_SECONDS
+        for root, _, names in os.walk(self.media_root):
+            for name in names:
+                os.utime(os.path.join(root, name), (0, 0))
+
+    def stored_files(self):
+        return sorted(
+            os.path.relpath(os.path.join(root, name), self.media_root)
+            for root, _, names in os.walk(self.media_root) for name in names
+        )
+
+    def test_identical_uploads_share_one_file_until_the_last_reference_goes(self):
+        import hashlib
+
+        content = b'%PDF-1.4 template' * 1000
+        first, second = self.upload(content), self.upload(content, name='copy.PDF')
+        sha = hashlib.sha256(content).hexdigest()
+        self.assertEqual(first.document_file.name, f'employee_documents/{sha[:2]}/{sha}.pdf')
+        self.assertEqual(second.document_file.name, first.document_file.name)
+        self.assertEqual(self.stored_files(), [first.document_file.name])
+
+        self.age_files()
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(self.stored_files(), [second.document_file.name])
+
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.document_file = SimpleUploadedFile('contract.pdf', b'revised')
+            second.save()
+        self.assertEqual(self.stored_files(), [second.document_file.name])
+
+    def test_a_file_reused_by_an_uncommitted_upload_survives_release(self):
+        from django.core.files.base import ContentFile
+
+        from .documents import document_storage, purge_unreferenced
+
+        content = b'%PDF-1.4 ID scan'
+        document = self.upload(content)
+        self.age_files()
+        # Another upload of the same content, whose row is not committed yet
+        name = document_storage().save('employee_documents/scan.pdf', ContentFile(content))
+        self.assertEqual(name, document.document_file.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            document.delete()
+        self.assertEqual(self.stored_files(), [name])
+
+        # Never committed: swept once the grace period is over
+        self.assertEqual(purge_unreferenced(), 0)
+        self.age_files()
+        self.assertEqual(purge_unreferenced(), 1)
+        self.assertEqual(self.stored_files(), [])
+
+    def test_download_supports_conditional_and_range_requests(self):
+        content = bytes(range(256)) * 40
+        document = self.upload(content)
+        User.objects.create_superuser('admin', 'admin@company.com', 'admin')
+        self.client.login(username='admin', password='admin')
+        url = f'/documents/{document.pk}/'
+
+        response = self.client.get(url)
+        self.assertEqual(b''.join(response.streaming_content), content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('employment-contract.pdf', response['Content-Disposition'])
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(content)}')
+        self.assertEqual(b''.join(response.streaming_content), content[100:200])
+        response = self.client.get(url, HTTP_RANGE='bytes=-10', HTTP_IF_RANGE=etag)
+        self.assertEqual(b''.join(response.streaming_content), content[-10:])
+        # A stale If-Range gets the whole, current file
+        response = self.client.get(url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        response.close()
+        response = self.client.get(url, HTTP_RANGE=f'bytes={len(content)}-')
+        self.assertEqual(response.status_code, 416)
+
+
+class ChunkedUploadTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        overrides = override_settings(
+            MEDIA_ROOT=self.media_root,
+            CHUNKED_UPLOAD_DIR=os.path.join(self.media_root, 'partial'),
+            CHUNKED_UPLOAD_CHUNK_SIZE=1000,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        generate_bulk_data(employees=1, days=1, seed=43)
+        User.objects.create_superuser('admin', 'admin@company.com', 'admin')
+        self.client.login(username='admin', password='admin')
+
+    def send(self, url, offset, data):
+        return self.client.generic(
+            'PATCH', url, data, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+        )
+
+    def test_resumable_upload_is_referenced_by_the_document_form(self):
+        import hashlib
+
+        from .models import ChunkedUpload, EmployeeDocument
+
+        content = os.urandom(2500)
+        response = self.client.post(
+            '/documents/uploads/', {'filename': 'scan.pdf', 'size': len(content)}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        url = f"/documents/uploads/{response.json()['id']}/"
+
+        self.assertEqual(self.send(url, 0, content[:1000]).json()['offset'], 1000)
+        # A chunk repeated after a lost response, or one that is too large,
+        # is refused; the client resumes from the reported offset
+        self.assertEqual(self.send(url, 0, content[:1000]).status_code, 409)
+        self.assertEqual(self.send(url, 1000, content[1000:2001]).status_code, 413)
+        self.assertEqual(self.client.head(url)['Upload-Offset'], '1000')
+        self.send(url, 1000, content[1000:2000])
+        self.assertTrue(self.send(url, 2000, content[2000:]).json()['complete'])
+
+        self.assertContains(self.client.get('/admin/hr/employeedocument/add/'), 'data-chunked-upload="/documents/uploads/"')
+        employee = Employee.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/admin/hr/employeedocument/add/', {
+                'employee': employee.pk, 'document_type': 'MEDICAL', 'title': 'Medical certificate',
+                'document_file-upload': response.json()['id'],
+            })
+        self.assertEqual(response.status_code, 302)
+        document = EmployeeDocument.objects.get()
+        self.assertEqual(document.document_file.name.split('/')[-1], hashlib.sha256(content).hexdigest() + '.pdf')
+        with document.document_file.open('rb') as fh:
+            self.assertEqual(fh.read(), content)
+        # The partial file was moved into place and the used upload deleted
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'partial')), [])
+        self.assertFalse(ChunkedUpload.objects.exists())
+
+    def test_completed_upload_opens_its_file_only_while_read(self):
+        from .uploads import completed_upload
+
+        response = self.client.post(
+            '/documents/uploads/', {'filename': 'scan.pdf', 'size': 10}, content_type='application/json',
+        )
+        upload_id = response.json()['id']
+        self.send(f'/documents/uploads/{upload_id}/', 0, b'0123456789')
+
+        upload = completed_upload(upload_id, User.objects.get(username='admin'))
+        self.assertTrue(upload.closed)
+        self.assertEqual(upload.size, 10)
+        self.assertEqual(b''.join(upload.chunks()), b'0123456789')
+        self.assertTrue(upload.closed)
+        with upload.open() as fh:
+            self.assertEqual(fh.read(), b'0123456789')
+        self.assertTrue(upload.closed)
+
+    def test_uploads_belong_to_their_user(self):
+        from .models import EmployeeDocument
+
+        response = self.client.post(
+            '/documents/uploads/', {'filename': 'scan.pdf', 'size': 10}, content_type='application/json',
+        )
+        upload_id = response.json()['id']
+        url = f'/documents/uploads/{upload_id}/'
+        self.send(url, 0, b'0123456789')
+        User.objects.create_superuser('other', 'other@company.com', 'other')
+        self.client.login(username='other', password='other')
+        self.assertEqual(self.send(url, 0, b'0123456789').status_code, 404)
+
+        response = self.client.post('/admin/hr/employeedocument/add/', {
+            'employee': Employee.objects.get().pk, 'document_type': 'MEDICAL', 'title': 'Not mine',
+            'document_file-upload': upload_id,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(EmployeeDocument.objects.exists())
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend', DOCUMENT_EXPIRY_WARNING_DAYS=30)
+class DocumentExpiryTests(TestCase):
+
+    def setUp(self):
+        from .models import EmployeeDocument
+
+        generate_bulk_data(employees=6, days=1, seed=47)
+        self.today = date.today()
+        employees = list(Employee.objects.select_related('user').order_by('pk'))
+        self.manager, reports = employees[0], employees[1:]
+        self.manager.user.email = 'manager@company.com'
+        self.manager.user.save()
+        Employee.objects.filter(pk__in=[e.pk for e in reports[:3]]).update(direct_manager=self.manager)
+        Employee.objects.filter(pk__in=[e.pk for e in reports[3:]]).update(direct_manager=None)
+        self.manager.department.manager = None
+        self.manager.department.save()
+        for employee, days in zip(reports, (3, 10, 60, 5, -1)):
+            EmployeeDocument.objects.create(
+                employee=employee, document_type='CERTIFICATE', title='Certificate',
+                document_file='employee_documents/certificate.pdf',
+                expiry_date=self.today + timedelta(days=days),
+            )
+
+    def test_one_query_and_one_connection_for_all_notifications(self):
+        from unittest import mock
+
+        from django.core import mail
+
+        from .expiry import expiring_documents, notify_expiring_documents
+
+        with self.assertNumQueries(1):
+            documents = list(expiring_documents(self.today))
+            managers = [(d.employee.direct_manager, d.employee.department) for d in documents]
+        self.assertEqual([d.expiry_date for d in documents], [self.today + timedelta(days=n) for n in (3, 5, 10)])
+        self.assertEqual(len(managers), 3)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.open') as open_connection:
+            sent, listed, unassigned = notify_expiring_documents(self.today)
+        self.assertEqual(open_connection.call_count, 1)
+        self.assertEqual((sent, listed, len(unassigned)), (1, 2, 1))
+        self.assertEqual(mail.outbox[0].to, ['manager@company.com'])
+        self.assertIn('(in 3 days)', mail.outbox[0].body)
+
+        mail.outbox = []
+        with override_settings(DOCUMENT_EXPIRY_FALLBACK_EMAIL='hr@company.com'):
+            self.assertEqual(notify_expiring_documents(self.today)[0], 2)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ['hr@company.com', 'manager@company.com'])
+
+    def test_dashboard_lists_soonest_expiring_documents(self):
+        from hr_system import utils
+
+        _, activities = utils.load_dashboard_widgets(self.today)
+        self.assertEqual(
+            [d.expiry_date for d in activities['expiring_documents']],
+            [self.today + timedelta(days=n) for n in (3, 5, 10)],
+        )
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class LeaveDecisionTests(TestCase):
+
+    def setUp(self):
+        from .models import LeaveRequest
+
+        generate_bulk_data(employees=8, days=1, seed=53)
+        self.admin_user = User.objects.create_superuser('admin', 'admin@company.com', 'admin')
+        self.approver = Employee.objects.first()
+        Employee.objects.filter(pk=self.approver.pk).update(user=self.admin_user)
+        LeaveRequest.objects.update(status='PENDING')
+        self.approved = LeaveRequest.objects.order_by('pk').first()
+        LeaveRequest.objects.filter(pk=self.approved.pk).update(status='REJECTED')
+        self.client.login(username='admin', password='admin')
+
+    def test_bulk_approve_is_one_update_with_one_batch_of_emails(self):
+        from unittest import mock
+
+        from django.core import mail
+
+        from .models import LeaveRequest
+
+        selected = list(LeaveRequest.objects.values_list('pk', flat=True))
+        with CaptureQueriesContext(connection) as ctx, \
+                mock.patch('django.core.mail.backends.locmem.EmailBackend.open') as open_connection, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/admin/hr/leaverequest/', {
+                'action': 'approve_selected', '_selected_action': selected,
+            })
+        self.assertEqual(response.status_code, 302)
+        updates = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "hr_leaverequest"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(open_connection.call_count, 1)
+
+        pending = LeaveRequest.objects.exclude(pk=self.approved.pk)
+        self.assertFalse(pending.exclude(status='APPROVED').exists())
+        self.assertFalse(pending.exclude(approved_by=self.approver).exists())
+        self.assertEqual(LeaveRequest.objects.get(pk=self.approved.pk).status, 'REJECTED')
+        self.assertEqual(len(mail.outbox), pending.count())
+        self.assertIn('approved', mail.outbox[0].body)
+
+        messages = [str(m) for m in response.wsgi_request._messages]
+        self.assertIn(f'{pending.count()} leave requests approved.', messages)
+        self.assertTrue(any('1 leave requests were skipped' in m for m in messages))
+
+    def test_select_across_a_filtered_list_reports_no_skipped_requests(self):
+        from .models import LeaveRequest
+
+        pending = LeaveRequest.objects.filter(status='PENDING')
+        count = pending.count()
+        response = self.client.post('/admin/hr/leaverequest/?status__exact=PENDING', {
+            'action': 'approve_selected', '_selected_action': [pending.first().pk], 'select_across': '1',
+        })
+        self.assertEqual(response.status_code, 302)
+        messages = [str(m) for m in response.wsgi_request._messages]
+        self.assertEqual(messages, [f'{count} leave requests approved.'])
+
+    def test_cancel_covers_approved_requests_and_refreshes_the_badge(self):
+        from django.test import RequestFactory
+
+        from .badges import pending_leave_requests
+        from .leave import decide_leave_requests
+        from .models import LeaveRequest
+
+        request = RequestFactory().get('/admin/')
+        request.user = self.admin_user
+        pending = LeaveRequest.objects.filter(status='PENDING').count()
+        self.assertEqual(pending_leave_requests(request), pending)
+
+        first, second = LeaveRequest.objects.filter(status='PENDING').order_by('pk')[:2]
+        with self.captureOnCommitCallbacks(execute=True):
+            decide_leave_requests(LeaveRequest.objects.filter(pk=first.pk), 'APPROVED', notify=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = decide_leave_requests(
+                LeaveRequest.objects.filter(pk__in=[first.pk, second.pk, self.approved.pk]), 'CANCELLED',
+                notify=False,
+            )
+        self.assertEqual(sorted(changed), sorted([first.pk, second.pk]))
+        self.assertEqual(pending_leave_requests(request), pending - 2)
+
+
+class EmploymentChangeTests(TestCase):
+
+    def setUp(self):
+        from .models import LeaveRequest, LeaveType
+
+        generate_bulk_data(employees=8, days=1, seed=59)
+        LeaveRequest.objects.all().delete()
+        Employee.objects.update(direct_manager=None, employment_status='ACTIVE')
+        self.ceo, self.vp, self.lead, self.dev1, self.dev2, self.analyst = Employee.objects.order_by('pk')[:6]
+        for employee, manager in (
+            (self.vp, self.ceo), (self.lead, self.vp), (self.dev1, self.lead),
+            (self.dev2, self.lead), (self.analyst, self.vp),
+        ):
+            Employee.objects.filter(pk=employee.pk).update(direct_manager=manager)
+        self.department = self.lead.department
+        self.department.manager = self.lead
+        self.department.save()
+
+        today = date.today()
+        leave_type = LeaveType.objects.first()
+        self.past_leave, self.future_leave = (
+            LeaveRequest.objects.create(
+                employee=self.lead, leave_type=leave_type, start_date=start, end_date=start,
+                reason='Holiday', status='APPROVED',
+            )
+            for start in (today - timedelta(days=10), today + timedelta(days=10))
+        )
+
+    def manager_of(self, employee):
+        return Employee.objects.get(pk=employee.pk).direct_manager
+
+    def test_departing_managers_hand_reports_to_the_next_manager_up(self):
+        from .employment import apply_employment_change
+        from .models import Department, LeaveRequest
+
+        departing = Employee.objects.filter(pk__in=[self.vp.pk, self.lead.pk])
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            result = apply_employment_change(
+                departing, employment_status='TERMINATED', termination_date=date.today(),
+            )
+        self.assertEqual(result, (2, 3, 1))
+        employee_updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "hr_employee"')]
+        self.assertEqual(len(employee_updates), 2)
+
+        self.assertFalse(departing.exclude(employment_status='TERMINATED').exists())
+        for employee in (self.dev1, self.dev2, self.analyst):
+            self.assertEqual(self.manager_of(employee), self.ceo)
+        self.assertEqual(self.manager_of(self.lead), self.vp)
+        self.assertIsNone(Department.objects.get(pk=self.department.pk).manager)
+        self.assertEqual(LeaveRequest.objects.get(pk=self.future_leave.pk).status, 'CANCELLED')
+        self.assertEqual(LeaveRequest.objects.get(pk=self.past_leave.pk).status, 'APPROVED')
+
+    def test_reports_skip_every_level_that_leaves(self):
+        from .employment import apply_employment_change
+
+        # ceo > vp > lead > dev1: with vp and lead gone, dev1 reports to the ceo
+        Employee.objects.filter(pk=self.analyst.pk).update(direct_manager=None)
+        with self.captureOnCommitCallbacks(execute=True):
+            result = apply_employment_change(
+                Employee.objects.filter(pk__in=[self.vp.pk, self.lead.pk]), employment_status='INACTIVE',
+            )
+        self.assertEqual(result.reassigned_reports, 2)
+        self.assertEqual(self.manager_of(self.dev1), self.ceo)
+        self.assertEqual(self.manager_of(self.dev2), self.ceo)
+
+    def test_admin_action_reassigns_reports_to_the_named_employee(self):
+        from .models import Department
+
+        User.objects.create_superuser('admin', 'admin@company.com', 'admin')
+        self.client.login(username='admin', password='admin')
+        response = self.client.post('/admin/hr/employee/', {
+            'action': 'terminate_selected', '_selected_action': [self.lead.pk],
+            'reassign_reports_to': self.analyst.employee_id,
+        })
+        self.assertEqual(response.status_code, 302)
+        lead = Employee.objects.get(pk=self.lead.pk)
+        self.assertEqual(lead.employment_status, 'TERMINATED')
+        self.assertEqual(lead.termination_date, date.today())
+        self.assertEqual(self.manager_of(self.dev1), self.analyst)
+        self.assertEqual(Department.objects.get(pk=self.department.pk).manager, self.analyst)
+
+    def test_terminate_with_select_across(self):
+        User.objects.create_superuser('admin', 'admin@company.com', 'admin')
+        self.client.login(username='admin', password='admin')
+        response = self.client.post(f'/admin/hr/employee/?department__id__exact={self.department.pk}', {
+            'action': 'terminate_selected', '_selected_action': [self.lead.pk], 'select_across': '1',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(
+            Employee.objects.filter(department=self.department).exclude(employment_status='TERMINATED').exists()
+        )
+
+    def test_manager_cannot_be_in_the_selection(self):
+        from .employment import apply_employment_change
+
+        with self.assertRaises(ValueError):
+            apply_employment_change(
+                Employee.objects.filter(pk__in=[self.dev1.pk, self.dev2.pk]), direct_manager=self.dev1,
+            )
+        self.assertEqual(self.manager_of(self.dev2), self.lead)
+
+    def test_command_terminates_as_of_today_by_default(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        call_command(
+            'change_employment', '--employees', self.dev1.employee_id, '--status', 'TERMINATED', stdout=StringIO(),
+        )
+        dev1 = Employee.objects.get(pk=self.dev1.pk)
+        self.assertEqual((dev1.employment_status, dev1.termination_date), ('TERMINATED', date.today()))
+
+    def test_command_dry_run_changes_nothing(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command(
+            'change_employment', '--employees', self.lead.employee_id, '--status', 'INACTIVE',
+            '--dry-run', stdout=out,
+        )
+        self.assertIn('1 employees would be updated, 2 direct reports reassigned', out.getvalue())
+        self.assertEqual(Employee.objects.get(pk=self.lead.pk).employment_status, 'ACTIVE')
+        self.assertEqual(self.manager_of(self.dev1), self.lead)
+
+
+class LeaveAttendanceTests(TestCase):
+
+    def setUp(self):
+        from .models import LeaveRequest, LeaveType
+
+        generate_bulk_data(employees=4, days=1, seed=61)
+        LeaveRequest.objects.all().delete()
+        self.employee = Employee.objects.first()
+        self.leave_type = LeaveType.objects.first()
+        today = date.today()
+        # Monday to Sunday of a week without generated attendance
+        self.monday = today + timedelta(days=14 - today.weekday())
+        self.sunday = self.monday + timedelta(days=6)
+
+    def request(self, status='PENDING', **kwargs):
+        from .models import LeaveRequest
+
+        return LeaveRequest.objects.create(**{
+            'employee': self.employee, 'leave_type': self.leave_type, 'start_date': self.monday,
+            'end_date': self.sunday, 'reason': 'Holiday', 'status': status, **kwargs,
+        })
+
+    def leave_days(self):
+        return list(
+            Attendance.objects.filter(employee=self.employee, status='ON_LEAVE')
+            .order_by('date').values_list('date', 'leave_request_id')
+        )
+
+    def test_approval_fills_missing_weekdays_and_cancellation_removes_only_those(self):
+        from datetime import time
+
+        from .leave import decide_leave_requests
+        from .models import LeaveRequest
+
+        leave = self.request()
+        self.assertEqual(self.leave_days(), [])
+        # Entered by hand: a company holiday and a day the employee came in
+        Attendance.objects.create(employee=self.employee, date=self.monday, status='HOLIDAY', notes='Company holiday')
+        Attendance.objects.create(
+            employee=self.employee, date=self.monday + timedelta(days=1), status='PRESENT',
+            check_in_time=time(9), check_out_time=time(17),
+        )
+
+        with CaptureQueriesContext(connection) as ctx:
+            decide_leave_requests(LeaveRequest.objects.filter(pk=leave.pk), 'APPROVED', notify=False)
+        # INSERT OR IGNORE on SQLite, ON CONFLICT DO NOTHING elsewhere
+        inserts = [q for q in ctx.captured_queries if 'INTO "hr_attendance"' in q['sql']]
+        self.assertEqual(len(inserts), 1)
+        expected = [self.monday + timedelta(days=days) for days in (2, 3, 4)]
+        self.assertEqual(self.leave_days(), [(day, leave.pk) for day in expected])
+        holiday = Attendance.objects.get(employee=self.employee, date=self.monday)
+        self.assertEqual((holiday.status, holiday.notes, holiday.leave_request), ('HOLIDAY', 'Company holiday', None))
+
+        decide_leave_requests(LeaveRequest.objects.filter(pk=leave.pk), 'CANCELLED', notify=False)
+        self.assertEqual(self.leave_days(), [])
+        self.assertEqual(
+            list(Attendance.objects.filter(employee=self.employee, date__gte=self.monday)
+                 .order_by('date').values_list('status', flat=True)),
+            ['HOLIDAY', 'PRESENT'],
+        )
+
+    def test_deleting_a_request_removes_only_its_unedited_days(self):
+        leave = self.request('APPROVED')
+        edited = Attendance.objects.get(employee=self.employee, date=self.monday)
+        edited.status = 'HOLIDAY'
+        edited.save()
+
+        leave.delete()
+        rows = Attendance.objects.filter(employee=self.employee, date__gte=self.monday)
+        self.assertEqual(list(rows.values_list('date', 'status', 'leave_request')), [(self.monday, 'HOLIDAY', None)])
+
+    def test_saving_a_request_follows_its_dates_and_overlapping_leave(self):
+        first = self.request('APPROVED', end_date=self.monday + timedelta(days=1))
+        second = self.request('APPROVED', start_date=self.monday + timedelta(days=1))
+        self.assertEqual(len(self.leave_days()), 5)
+
+        second.status = 'REJECTED'
+        second.save()
+        self.assertEqual(self.leave_days(), [(self.monday, first.pk), (self.monday + timedelta(days=1), first.pk)])
+
+        first.end_date = self.monday
+        first.save()
+        self.assertEqual(self.leave_days(), [(self.monday, first.pk)])
+
+    def test_reconcile_command_writes_bulk_created_leave(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from .models import LeaveRequest
+
+        LeaveRequest.objects.bulk_create([LeaveRequest(
+            employee=self.employee, leave_type=self.leave_type, start_date=self.monday,
+            end_date=self.sunday, reason='Imported', status='APPROVED',
+        )])
+        out = StringIO()
+        call_command('reconcile_leave_attendance', '--dry-run', stdout=out)
+        self.assertIn('5 attendance days would be written', out.getvalue())
+        self.assertEqual(self.leave_days(), [])
+
+        call_command('reconcile_leave_attendance', '--since', self.monday.isoformat(), stdout=StringIO())
+        self.assertEqual(len(self.leave_days()), 5)
+
+    def test_archived_days_are_not_written_back(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from .archive import archive_attendance, attendance_history
+
+        leave = self.request('APPROVED')
+        archive_attendance(self.sunday + timedelta(days=1))
+        self.assertEqual(
+            set(ArchivedAttendance.objects.filter(employee=self.employee, date__gte=self.monday)
+                .values_list('leave_request', flat=True)),
+            {leave.pk},
+        )
+        # A leave request from before the archive cutoff
+        old_monday = self.monday - timedelta(days=7 * 60)
+        self.request('APPROVED', start_date=old_monday, end_date=old_monday + timedelta(days=4))
+
+        call_command('reconcile_leave_attendance', stdout=StringIO())
+        self.assertFalse(Attendance.objects.filter(employee=self.employee, status='ON_LEAVE').exists())
+        history = attendance_history('date', employee=self.employee, date__gte=self.monday)
+        self.assertEqual(len(history), 5)
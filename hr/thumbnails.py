@@ -0,0 +1,96 @@
+"""
+Employee photo thumbnails: small square WebP and JPEG renditions of each
+uploaded photo, so the employee changelist does not download full-size
+photos to show them at 40px.
+
+Thumbnails are generated when an employee is saved with a photo, lazily
+when the changelist finds one missing, and for existing photos by
+``manage.py backfill_thumbnails``. They are stored next to the photos,
+under a name derived from the photo's, so no extra columns are needed.
+Pillow is imported only when a thumbnail is actually generated.
+"""
+
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models.signals import post_save
+
+
+logger = logging.getLogger(__name__)
+
+# Pillow format name -> file extension, best first
+FORMATS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+QUALITY = 80
+
+
+def thumbnail_names(name, size=None):
+    """Storage names of the thumbnails of the photo stored as ``name``."""
+    size = size or settings.EMPLOYEE_THUMBNAIL_SIZE
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return {
+        image_format: f'{directory}/thumbnails/{stem}_{size}.{extension}'.lstrip('/')
+        for image_format, extension in FORMATS.items()
+    }
+
+
+def render_thumbnail(fh, size):
+    """A ``size`` x ``size`` RGB thumbnail of the image in ``fh``, cropped to the centre."""
+    from PIL import Image, ImageOps
+
+    with Image.open(fh) as image:
+        image = ImageOps.exif_transpose(image)
+        image = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    return image.convert('RGB')
+
+
+def ensure_thumbnails(storage, name, force=False):
+    """
+    Generate the missing thumbnails of the photo stored as ``name`` (all of
+    them with ``force``) and return their names, or None if the photo
+    cannot be read as an image.
+    """
+    size = settings.EMPLOYEE_THUMBNAIL_SIZE
+    names = thumbnail_names(name, size)
+    missing = {fmt: thumb for fmt, thumb in names.items() if force or not storage.exists(thumb)}
+    if not missing:
+        return names
+    try:
+        with storage.open(name, 'rb') as fh:
+            image = render_thumbnail(fh, size)
+    except (OSError, ValueError) as exc:
+        # Missing file, or not an image Pillow can read
+        logger.warning('Cannot make thumbnails of %s: %s', name, exc)
+        return None
+    for image_format, thumb in missing.items():
+        buffer = BytesIO()
+        image.save(buffer, image_format, quality=QUALITY)
+        if storage.exists(thumb):
+            storage.delete(thumb)
+        storage.save(thumb, ContentFile(buffer.getvalue()))
+    return names
+
+
+def thumbnail_urls(photo):
+    """``{'WEBP': url, 'JPEG': url}`` for a photo FieldFile, or None."""
+    if not photo:
+        return None
+    names = ensure_thumbnails(photo.storage, photo.name)
+    if names is None:
+        return None
+    return {image_format: photo.storage.url(thumb) for image_format, thumb in names.items()}
+
+
+def generate_on_upload(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'employee_photo' not in update_fields:
+        return
+    if instance.employee_photo:
+        ensure_thumbnails(instance.employee_photo.storage, instance.employee_photo.name)
+
+
+def connect_thumbnails():
+    post_save.connect(generate_on_upload, sender='hr.Employee', dispatch_uid='hr.thumbnails')
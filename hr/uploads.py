@@ -0,0 +1,215 @@
+"""
+Chunked, resumable uploads for employee documents.
+
+Large scans and contracts are not posted with the admin form. The browser
+(static/js/chunked-upload.js) creates an upload and sends the file in
+chunks of at most CHUNKED_UPLOAD_CHUNK_SIZE bytes, each written at its
+offset into one temporary file under CHUNKED_UPLOAD_DIR:
+
+    POST  /documents/uploads/               {"filename": ..., "size": ...}
+    PATCH /documents/uploads/<id>/          Upload-Offset: <n>, body: chunk
+    HEAD  /documents/uploads/<id>/          -> Upload-Offset: <bytes received>
+
+After a dropped connection the client asks for the offset and carries on
+from there. Once every byte has arrived, the form submits only the upload
+id (ChunkedFileInput) and the document storage moves the file into place.
+Requests never hold more than 64 KiB of a chunk in memory. Abandoned
+uploads are deleted by ``manage.py purge_uploads``; an upload attached to
+a document is deleted once the document is saved. Only the user who
+created an upload can send its chunks or attach it.
+"""
+
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+from django.utils import timezone
+from unfold.widgets import UnfoldAdminFileFieldWidget
+
+
+READ_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def upload_path(upload):
+    return os.path.join(settings.CHUNKED_UPLOAD_DIR, str(upload.pk))
+
+
+def create_upload(user, filename, size):
+    from .models import ChunkedUpload
+
+    filename = os.path.basename(filename or '')
+    if not filename:
+        raise UploadError('filename is required')
+    if not 0 < size <= settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise UploadError(f'size must be between 1 and {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes', 413)
+    upload = ChunkedUpload.objects.create(uploaded_by=user, filename=filename[:255], size=size)
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    with open(upload_path(upload), 'wb') as fh:
+        fh.truncate(size)
+    return upload
+
+
+def write_chunk(upload, offset, length, stream):
+    """
+    Write ``length`` bytes read from ``stream`` at ``offset`` and return the
+    new offset. A chunk must start where the last one ended; resending the
+    last chunk is harmless as it lands on the same bytes.
+    """
+    from .models import ChunkedUpload
+
+    if offset != upload.offset:
+        raise UploadError(f'Expected offset {upload.offset}', 409)
+    if not 0 < length <= settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+        raise UploadError(f'Chunks must be 1 to {settings.CHUNKED_UPLOAD_CHUNK_SIZE} bytes', 413)
+    if offset + length > upload.size:
+        raise UploadError('Chunk runs past the declared size')
+
+    remaining = length
+    with open(upload_path(upload), 'r+b') as fh:
+        fh.seek(offset)
+        while remaining:
+            data = stream.read(min(READ_SIZE, remaining))
+            if not data:
+                raise UploadError('Chunk shorter than its Content-Length')
+            fh.write(data)
+            remaining -= len(data)
+    # Only the request that wrote from the current offset may advance it
+    if not ChunkedUpload.objects.filter(pk=upload.pk, offset=offset).update(
+        offset=offset + length, updated_at=timezone.now(),
+    ):
+        raise UploadError('Upload changed concurrently', 409)
+    upload.offset = offset + length
+    return upload.offset
+
+
+class CompletedUpload(UploadedFile):
+    """A finished chunked upload, handed to FileField as if it had been posted."""
+
+    def __init__(self, upload):
+        self.upload_id = upload.pk
+        self.path = upload_path(upload)
+        # Opened only when read: the document storage moves the file by path
+        super().__init__(None, upload.filename, None, upload.size)
+
+    def open(self, mode='rb'):
+        if self.closed:
+            self.file = open(self.path, mode)
+        else:
+            self.seek(0)
+        return self
+
+    def chunks(self, chunk_size=None):
+        self.open()
+        try:
+            yield from super().chunks(chunk_size)
+        finally:
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            super().close()
+
+    def temporary_file_path(self):
+        return self.path
+
+
+def completed_upload(upload_id, user):
+    """The completed upload ``upload_id`` of ``user`` as a file, or None."""
+    from django.core.exceptions import ValidationError
+
+    from .models import ChunkedUpload
+
+    if user is None or not user.is_authenticated:
+        return None
+    try:
+        upload = ChunkedUpload.objects.get(pk=upload_id, uploaded_by=user)
+    except (ChunkedUpload.DoesNotExist, ValidationError):
+        return None
+    if not upload.is_complete or not os.path.exists(upload_path(upload)):
+        return None
+    return CompletedUpload(upload)
+
+
+def purge_uploads(hours=None):
+    """Delete uploads not written to for ``hours`` (default CHUNKED_UPLOAD_EXPIRY_HOURS)."""
+    from .models import ChunkedUpload
+
+    if hours is None:
+        hours = settings.CHUNKED_UPLOAD_EXPIRY_HOURS
+    expired = ChunkedUpload.objects.filter(updated_at__lt=timezone.now() - timedelta(hours=hours))
+    count = 0
+    for upload in expired.iterator():
+        try:
+            os.remove(upload_path(upload))
+        except FileNotFoundError:
+            # Already moved into document storage
+            pass
+        upload.delete()
+        count += 1
+    return count
+
+
+class ChunkedFileInput(UnfoldAdminFileFieldWidget):
+    """
+    File input whose file is sent through the chunked upload endpoint by
+    chunked-upload.js; the form then posts ``<name>-upload`` with the id.
+    Only uploads of ``user``, the user posting the form, are accepted.
+    """
+
+    class Media:
+        js = ('js/chunked-upload.js',)
+
+    def __init__(self, attrs=None, user=None):
+        super().__init__(attrs)
+        self.user = user
+
+    def get_context(self, name, value, attrs):
+        from django.urls import reverse
+
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs'].update({
+            'data-chunked-upload': reverse('document_upload_create'),
+            'data-chunk-size': settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+        })
+        return context
+
+    def value_from_datadict(self, data, files, name):
+        upload_id = data.get(f'{name}-upload')
+        if upload_id and not files.get(name):
+            return completed_upload(upload_id, self.user)
+        return super().value_from_datadict(data, files, name)
+
+    def value_omitted_from_data(self, data, files, name):
+        return f'{name}-upload' not in data and super().value_omitted_from_data(data, files, name)
+
+
+def _claim_upload(sender, instance, raw=False, **kwargs):
+    instance._used_upload = None
+    document_file = instance.document_file
+    # A committed file is already in storage; only a new one can be an upload
+    if not raw and document_file and not document_file._committed:
+        instance._used_upload = getattr(document_file.file, 'upload_id', None)
+
+
+def _delete_used_upload(sender, instance, using=None, **kwargs):
+    from .models import ChunkedUpload
+
+    upload_id = getattr(instance, '_used_upload', None)
+    if upload_id:
+        # Its file now lives in document storage; the id must not be reused
+        transaction.on_commit(lambda: ChunkedUpload.objects.filter(pk=upload_id).delete(), using=using)
+
+
+def connect_uploads():
+    for signal, receiver in ((pre_save, _claim_upload), (post_save, _delete_used_upload)):
+        signal.connect(receiver, sender='hr.EmployeeDocument', dispatch_uid=f'hr.uploads:{receiver.__name__}')
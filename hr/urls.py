@@ -0,0 +1,12 @@
+from django.urls import path
+
+from . import api
+
+
+app_name = 'hr_api'
+
+urlpatterns = [
+    path('<str:resource>/', api.resource_list, name='list'),
+    path('<str:resource>/deleted/', api.resource_deleted, name='deleted'),
+    path('<str:resource>/<int:pk>/', api.resource_detail, name='detail'),
+]
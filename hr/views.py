@@ -1,3 +1,167 @@
-from django.shortcuts import render
+import json
+import mimetypes
+import os
+import re
 
-# Create your views here.
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+from django.utils.text import slugify
+from django.views.decorators.http import require_http_methods, require_POST, require_safe
+
+from .documents import content_hash
+from .models import ChunkedUpload, EmployeeDocument
+from .uploads import UploadError, create_upload, write_chunk
+
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _byte_range(header, size):
+    """
+    ``(start, end)`` (inclusive) of a single-range ``Range`` header, None to
+    send the whole file (no, malformed or multi-range header) or ``False``
+    if the range cannot be satisfied.
+    """
+    match = RANGE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start == '':
+        # bytes=-N: the last N bytes
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        while length > 0:
+            chunk = fh.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_safe
+@staff_member_required
+def document_download(request, pk):
+    """
+    Serve an employee document with validators, so repeat views are a 304,
+    and byte ranges, so PDF viewers can fetch pages and broken downloads
+    can resume.
+    """
+    if not request.user.has_perm('hr.view_employeedocument'):
+        raise PermissionDenied
+    document = get_object_or_404(EmployeeDocument.objects.only('title', 'document_file'), pk=pk)
+    name = document.document_file.name
+    try:
+        path = document.document_file.path
+        stat = os.stat(path)
+    except (ValueError, OSError):
+        raise Http404('Document file not found')
+
+    sha = content_hash(name)
+    etag = f'"{sha}"' if sha else f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+    last_modified = http_date(stat.st_mtime)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': last_modified,
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'private, no-cache',
+    }
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is not None:
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    extension = os.path.splitext(name)[1]
+    filename = f'{slugify(document.title) or "document"}{extension}'
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if 'Range' in request.headers and if_range in (None, etag, last_modified):
+        byte_range = _byte_range(request.headers['Range'], stat.st_size)
+    if byte_range is False:
+        return HttpResponse(status=416, headers={**headers, 'Content-Range': f'bytes */{stat.st_size}'})
+    if byte_range is None:
+        return FileResponse(open(path, 'rb'), filename=filename, content_type=content_type, headers=headers)
+
+    start, end = byte_range
+    return StreamingHttpResponse(
+        _read_range(path, start, end - start + 1),
+        status=206,
+        content_type=content_type,
+        headers={
+            **headers,
+            'Content-Range': f'bytes {start}-{end}/{stat.st_size}',
+            'Content-Length': str(end - start + 1),
+            'Content-Disposition': content_disposition_header(False, filename),
+        },
+    )
+
+
+def _check_upload_permission(user):
+    if not (user.has_perm('hr.add_employeedocument') or user.has_perm('hr.change_employeedocument')):
+        raise PermissionDenied
+
+
+def _upload_state(upload, status=200, error=None):
+    state = {'id': str(upload.pk), 'offset': upload.offset, 'size': upload.size, 'complete': upload.is_complete}
+    if error:
+        state['error'] = error
+    return JsonResponse(
+        state,
+        status=status,
+        headers={'Upload-Offset': str(upload.offset), 'Cache-Control': 'no-store'},
+    )
+
+
+@require_POST
+@staff_member_required
+def document_upload_create(request):
+    """Start a chunked upload (see hr.uploads)."""
+    _check_upload_permission(request.user)
+    try:
+        payload = json.loads(request.body or b'{}')
+        size = int(payload.get('size', 0))
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'error': 'Expected a JSON body with filename and size'}, status=400)
+    try:
+        upload = create_upload(request.user, payload.get('filename'), size)
+    except UploadError as exc:
+        return JsonResponse({'error': str(exc)}, status=exc.status)
+    return _upload_state(upload, status=201)
+
+
+@require_http_methods(['GET', 'HEAD', 'PATCH'])
+@staff_member_required
+def document_upload_detail(request, upload_id):
+    """Report how much of an upload has arrived, or append a chunk to it."""
+    _check_upload_permission(request.user)
+    upload = get_object_or_404(ChunkedUpload, pk=upload_id, uploaded_by=request.user)
+    if request.method == 'PATCH':
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return JsonResponse({'error': 'Upload-Offset and Content-Length are required'}, status=400)
+        try:
+            # Read straight from the request stream, never request.body
+            write_chunk(upload, offset, length, request)
+        except UploadError as exc:
+            # The offset tells the client where to resume
+            return _upload_state(upload, status=exc.status, error=str(exc))
+    return _upload_state(upload)
@@ -0,0 +1,47 @@
+from django.contrib.admin.apps import SimpleAdminConfig
+from django.contrib.admin.checks import check_admin_app, check_dependencies
+from django.core import checks
+
+
+# requires_system_checks of management commands that never serve the admin:
+# every tag but admin and urls, whose checks import each admin module (and
+# with them import-export, tablib, openpyxl and PyYAML) to verify what such
+# a command does not use. ``manage.py check`` still runs them all.
+NON_ADMIN_CHECKS = [
+    checks.Tags.async_support,
+    checks.Tags.caches,
+    checks.Tags.compatibility,
+    checks.Tags.database,
+    checks.Tags.files,
+    checks.Tags.models,
+    checks.Tags.security,
+    checks.Tags.signals,
+    checks.Tags.sites,
+    checks.Tags.staticfiles,
+    checks.Tags.templates,
+    checks.Tags.translation,
+]
+
+
+def check_discovered_admin_app(app_configs, **kwargs):
+    # The registry is only filled once admin modules are discovered
+    from django.contrib import admin
+
+    admin.autodiscover()
+    return check_admin_app(app_configs, **kwargs)
+
+
+class HRAdminConfig(SimpleAdminConfig):
+    """
+    Admin without autodiscovery at startup: importing every admin.py pulls
+    in import-export, tablib and openpyxl, which processes that never serve
+    the admin (most management commands, a worker's boot) do not need.
+    Discovery happens when the URLconf is loaded (see hr_system.urls) or
+    the admin checks run, which commands skip with NON_ADMIN_CHECKS.
+    """
+
+    default_site = 'hr_system.sites.HRAdminSite'
+
+    def ready(self):
+        checks.register(check_dependencies, checks.Tags.admin)
+        checks.register(check_discovered_admin_app, checks.Tags.admin)
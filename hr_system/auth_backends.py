@@ -0,0 +1,105 @@
+"""
+Authentication backend that caches users and their resolved permissions.
+
+ModelBackend loads the user and runs two permission queries on every admin
+request (the sidebar and app list check every model's permissions). Here
+both are cached in the ``hr.cache`` namespace of each user, and keys also
+embed the version of the global ``auth`` namespace:
+
+* saving or deleting a user invalidates that user's namespace;
+* changing a user's groups or direct permissions does the same;
+* changing a group's permissions, deleting a group or changing a
+  Permission invalidates ``auth``, and with it every user's entries.
+
+Other processes see invalidations within CACHE_LOCAL_TIMEOUT seconds.
+"""
+
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from hr.cache import get_or_set, invalidate, namespace_version
+
+
+AUTH = 'auth'
+
+_MISSING_USER = 'missing'
+
+UserModel = get_user_model()
+
+
+def user_namespace(user_id):
+    return f'auth.user.{user_id}'
+
+
+def cached_for_user(user_id, name, compute, args=()):
+    """Cache ``compute(*args)`` for a user until their auth data changes."""
+    return get_or_set(
+        user_namespace(user_id),
+        f'{name}:{namespace_version(AUTH)}',
+        compute,
+        args=args,
+    )
+
+
+class CachedModelBackend(ModelBackend):
+
+    def get_user(self, user_id):
+        user = cached_for_user(user_id, 'user', self._load_user, args=(user_id,))
+        if user == _MISSING_USER:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    def _load_user(self, user_id):
+        try:
+            return UserModel._default_manager.get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return _MISSING_USER
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        if not hasattr(user_obj, '_perm_cache'):
+            user_obj._perm_cache = cached_for_user(
+                user_obj.pk,
+                'permissions',
+                partial(super().get_all_permissions, user_obj),
+            )
+        return user_obj._perm_cache
+
+
+@receiver(post_save, sender=UserModel)
+@receiver(post_delete, sender=UserModel)
+def invalidate_user(sender, instance, **kwargs):
+    invalidate(user_namespace(instance.pk))
+
+
+@receiver(m2m_changed, sender=UserModel.groups.through)
+@receiver(m2m_changed, sender=UserModel.user_permissions.through)
+def invalidate_user_memberships(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate(user_namespace(instance.pk))
+    elif pk_set:
+        # Changed from the group or permission side: pk_set holds users
+        invalidate(*(user_namespace(pk) for pk in pk_set))
+    else:
+        invalidate(AUTH)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_group_permissions(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidate(AUTH)
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def invalidate_auth(sender, **kwargs):
+    invalidate(AUTH)
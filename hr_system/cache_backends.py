@@ -0,0 +1,137 @@
+"""
+Two-tier cache backend: a small process-local LRU in front of a shared
+cache (file or database based) that every worker process sees.
+
+Reads are served from the local tier when possible and fall back to the
+shared tier, copying the value locally. Writes go to both tiers. Local
+entries live for at most LOCAL_TIMEOUT seconds, which bounds how long a
+process can serve a value another process has since changed or deleted.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'hr_system.cache_backends.TieredCache',
+            'TIMEOUT': 300,
+            'OPTIONS': {
+                'SHARED': 'shared',       # alias of the shared tier
+                'LOCAL_TIMEOUT': 5,
+                'LOCAL_MAX_ENTRIES': 1000,
+            },
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': '/var/tmp/hr_cache',
+        },
+    }
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.functional import cached_property
+
+
+_MISSING = object()
+
+
+class TieredCache(BaseCache):
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options['SHARED']
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        # Processes share nothing, but every thread in this one shares the
+        # local tier; it is named after the shared tier so that pointing
+        # the shared tier elsewhere (as the test runner does) starts afresh
+        shared_location = settings.CACHES.get(self.shared_alias, {}).get('LOCATION', '')
+        self.local = LocMemCache(
+            f'tiered:{self.shared_alias}:{shared_location}',
+            {
+                'TIMEOUT': self.local_timeout,
+                'OPTIONS': {'MAX_ENTRIES': options.get('LOCAL_MAX_ENTRIES', 1000)},
+            },
+        )
+
+    @cached_property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _timeouts(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None, self.local_timeout
+        return timeout, min(timeout, self.local_timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        shared_timeout, local_timeout = self._timeouts(timeout)
+        added = self.shared.add(key, value, shared_timeout, version=version)
+        if added:
+            self.local.set(key, value, local_timeout, version=version)
+        return added
+
+    def get(self, key, default=None, version=None):
+        value = self.local.get(key, _MISSING, version=version)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self.local.set(key, value, self.local_timeout, version=version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        shared_timeout, local_timeout = self._timeouts(timeout)
+        self.shared.set(key, value, shared_timeout, version=version)
+        self.local.set(key, value, local_timeout, version=version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        shared_timeout, local_timeout = self._timeouts(timeout)
+        self.local.touch(key, local_timeout, version=version)
+        return self.shared.touch(key, shared_timeout, version=version)
+
+    def delete(self, key, version=None):
+        self.local.delete(key, version=version)
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        return self.local.has_key(key, version=version) or self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        self.local.set(key, value, self.local_timeout, version=version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = []
+        for key in keys:
+            value = self.local.get(key, _MISSING, version=version)
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if missing:
+            shared = self.shared.get_many(missing, version=version)
+            for key, value in shared.items():
+                self.local.set(key, value, self.local_timeout, version=version)
+            found.update(shared)
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        shared_timeout, local_timeout = self._timeouts(timeout)
+        failed = self.shared.set_many(data, shared_timeout, version=version)
+        self.local.set_many(data, local_timeout, version=version)
+        return failed
+
+    def delete_many(self, keys, version=None):
+        self.local.delete_many(keys, version=version)
+        self.shared.delete_many(keys, version=version)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
@@ -0,0 +1,21 @@
+"""
+Per-connection SQLite tuning.
+
+Every new SQLite connection gets the PRAGMAs listed under
+``DATABASES[alias]['OPTIONS']['pragmas']`` (see DB_PROFILE in settings).
+Most of them are per-connection and would otherwise reset to SQLite's
+defaults; ``journal_mode=WAL`` is persistent but cheap to re-assert.
+"""
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = connection.settings_dict['OPTIONS'].get('pragmas') or {}
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
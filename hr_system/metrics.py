@@ -0,0 +1,281 @@
+"""
+In-process metrics registry with a Prometheus text-format exporter.
+
+Each process keeps its own counters and latency histograms in memory. When
+METRICS_DIR is set, every process periodically writes a snapshot of its
+registry to ``METRICS_DIR/metrics-<pid>.json`` and the ``/metrics`` view
+merges all snapshots, so a scraper sees totals across every WSGI worker no
+matter which one serves the scrape. Without METRICS_DIR only the serving
+process's own metrics are exported.
+"""
+
+import atexit
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels):
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _escape(value):
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+
+    def inc(self, labels=None, amount=1):
+        key = _label_key(labels or {})
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def snapshot(self):
+        return [[list(map(list, key)), value] for key, value in self.values.items()]
+
+    def merge(self, data):
+        for key, value in data:
+            key = tuple(map(tuple, key))
+            self.values[key] = self.values.get(key, 0) + value
+
+    def render(self):
+        for key, value in sorted(self.values.items()):
+            yield f'{self.name}{_format_labels(key)} {_format_number(value)}'
+
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        # label key -> [per-bucket counts (non-cumulative, +Inf last), sum]
+        self.values = {}
+
+    def observe(self, labels, value):
+        key = _label_key(labels or {})
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def snapshot(self):
+        return [[list(map(list, key)), counts, total] for key, (counts, total) in self.values.items()]
+
+    def merge(self, data):
+        for key, counts, total in data:
+            key = tuple(map(tuple, key))
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            for index, count in enumerate(counts[:len(entry[0])]):
+                entry[0][index] += count
+            entry[1] += total
+
+    def render(self):
+        for key, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = (('le', _format_number(bound)),)
+                yield f'{self.name}_bucket{_format_labels(key, le)} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(key)} {_format_number(total)}'
+            yield f'{self.name}_count{_format_labels(key)} {cumulative}'
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.last_flush = 0.0
+
+    def counter(self, name, help_text):
+        return self.metrics.setdefault(name, Counter(name, help_text))
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        return self.metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def inc(self, name, labels=None, amount=1):
+        with self.lock:
+            self.metrics[name].inc(labels, amount)
+
+    def observe(self, name, labels, value):
+        with self.lock:
+            self.metrics[name].observe(labels, value)
+
+    def empty_copy(self):
+        registry = MetricsRegistry()
+        for metric in self.metrics.values():
+            if metric.type == 'histogram':
+                registry.histogram(metric.name, metric.help, metric.buckets)
+            else:
+                registry.counter(metric.name, metric.help)
+        return registry
+
+    def snapshot(self):
+        with self.lock:
+            return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def merge(self, snapshot):
+        for name, data in snapshot.items():
+            if name in self.metrics:
+                self.metrics[name].merge(data)
+
+    def render(self):
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    # Multi-process support
+
+    def flush(self, directory=None):
+        """Atomically write this process's snapshot to the metrics directory."""
+        directory = directory or settings.METRICS_DIR
+        if not directory:
+            return
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'metrics-{os.getpid()}.json')
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-')
+        with os.fdopen(fd, 'w') as fh:
+            json.dump(self.snapshot(), fh)
+        os.replace(tmp_path, path)
+        self.last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if settings.METRICS_DIR and time.monotonic() - self.last_flush >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def collect(self):
+        """
+        Return a registry holding the totals of every process. The current
+        process is flushed first so its latest samples are included.
+        """
+        directory = settings.METRICS_DIR
+        if not directory:
+            merged = self.empty_copy()
+            merged.merge(self.snapshot())
+            return merged
+
+        self.flush(directory)
+        merged = self.empty_copy()
+        for filename in os.listdir(directory):
+            if not (filename.startswith('metrics-') and filename.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(directory, filename)) as fh:
+                    merged.merge(json.load(fh))
+            except (OSError, ValueError):
+                # A worker may be replacing its file mid-read; its samples
+                # will be picked up on the next scrape
+                continue
+        return merged
+
+
+registry = MetricsRegistry()
+
+registry.histogram(
+    'hr_http_request_duration_seconds',
+    'Request latency by URL name and method.',
+)
+registry.counter(
+    'hr_http_requests_total',
+    'Requests by URL name, method and status code.',
+)
+registry.counter(
+    'hr_db_queries_total',
+    'SQL queries executed by URL name.',
+)
+registry.histogram(
+    'hr_admin_action_duration_seconds',
+    'Admin changelist action latency by model and action.',
+)
+registry.counter(
+    'hr_admin_action_queries_total',
+    'SQL queries executed by admin changelist actions.',
+)
+registry.histogram(
+    'hr_block_duration_seconds',
+    'Latency of instrumented code blocks such as dashboard widgets.',
+)
+
+
+
+@atexit.register
+def _flush_at_exit():
+    # Keep the final samples of a worker that is shutting down
+    if getattr(settings, 'METRICS_ENABLED', False) and settings.METRICS_DIR:
+        registry.flush()
+
+
+@contextmanager
+def timed_block(name):
+    """Record the duration of a block (e.g. one dashboard widget)."""
+    if not getattr(settings, 'METRICS_ENABLED', False):
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe('hr_block_duration_seconds', {'block': name}, time.perf_counter() - started)
+
+
+def timed(name):
+    """Decorator form of timed_block()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed_block(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def metrics_view(request):
+    """
+    Prometheus text exposition of the merged registry. Only served to the
+    addresses in METRICS_ALLOWED_IPS, as it is meant for a local scraper.
+    """
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.collect().render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,203 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .metrics import registry
+
+
+logger = logging.getLogger('hr_system.profiling')
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper that counts queries and accumulates their time,
+    keeping the slowest few for the slow-request log.
+    """
+
+    def __init__(self, keep=5):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if self.keep and (len(self.slowest) < self.keep or elapsed > self.slowest[-1][0]):
+                self.slowest.append((elapsed, context['connection'].alias, sql))
+                self.slowest.sort(key=lambda item: item[0], reverse=True)
+                del self.slowest[self.keep:]
+
+
+class RequestProfilingMiddleware:
+    """
+    Per-request profiling, enabled with REQUEST_PROFILING=True.
+
+    Splits each request into view and template render phases, records SQL
+    query count and time for each, and reports them in a ``Server-Timing``
+    header (visible in the browser's network panel), along with the time
+    spent building the admin site context (Unfold's sidebar and tabs).
+    Requests slower than REQUEST_PROFILING_SLOW_MS are logged with their
+    slowest queries.
+    When disabled the middleware removes itself from the stack at startup,
+    so it costs nothing per request.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = settings.REQUEST_PROFILING_SLOW_MS
+        self.top_queries = settings.REQUEST_PROFILING_TOP_QUERIES
+        self.instrument_admin_site()
+
+    def instrument_admin_site(self):
+        """
+        Time the admin site's each_context(), where Unfold resolves its
+        configuration callbacks, sidebar navigation and tabs on every admin
+        page. Only installed while profiling is enabled.
+        """
+        from django.contrib import admin
+
+        site = admin.site
+        if getattr(site.each_context, 'profiled', False):
+            return
+        each_context = site.each_context
+
+        def profiled_each_context(request):
+            started = time.perf_counter()
+            try:
+                return each_context(request)
+            finally:
+                profile = getattr(request, '_profiling', None)
+                if profile is not None:
+                    profile['admin_context'] += time.perf_counter() - started
+
+        profiled_each_context.profiled = True
+        site.each_context = profiled_each_context
+
+    def __call__(self, request):
+        recorder = QueryRecorder(keep=self.top_queries)
+        request._profiling = {'recorder': recorder, 'render_started': None, 'admin_context': 0.0}
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        finished = time.perf_counter()
+
+        profile = request._profiling
+        render_started = profile['render_started']
+        total_ms = (finished - started) * 1000
+        sql_ms = recorder.duration * 1000
+        timings = [
+            f'sql;dur={sql_ms:.1f};desc="{recorder.count} queries"',
+        ]
+        if render_started is not None:
+            view_ms = (render_started - started) * 1000
+            render_ms = (finished - render_started) * 1000
+            render_sql_ms = (recorder.duration - profile['view_sql_duration']) * 1000
+            render_queries = recorder.count - profile['view_sql_count']
+            timings += [
+                f'view;dur={view_ms:.1f}',
+                f'render;dur={render_ms:.1f}',
+                f'render-sql;dur={render_sql_ms:.1f};desc="{render_queries} queries"',
+            ]
+        if profile['admin_context']:
+            timings.append(f'admin-context;dur={profile["admin_context"] * 1000:.1f}')
+        timings.append(f'total;dur={total_ms:.1f}')
+        response['Server-Timing'] = ', '.join(timings)
+
+        if total_ms >= self.slow_ms:
+            self.log_slow_request(request, response, total_ms, recorder)
+        return response
+
+    def process_template_response(self, request, response):
+        # Called after the view returns and immediately before the
+        # TemplateResponse is rendered, which marks the phase boundary
+        profile = getattr(request, '_profiling', None)
+        if profile is not None:
+            recorder = profile['recorder']
+            profile['render_started'] = time.perf_counter()
+            profile['view_sql_count'] = recorder.count
+            profile['view_sql_duration'] = recorder.duration
+        return response
+
+    def log_slow_request(self, request, response, total_ms, recorder):
+        lines = [
+            f'Slow request: {request.method} {request.get_full_path()} '
+            f'-> {response.status_code} in {total_ms:.0f} ms '
+            f'({recorder.count} queries, {recorder.duration * 1000:.0f} ms SQL)'
+        ]
+        for elapsed, alias, sql in recorder.slowest:
+            lines.append(f'  {elapsed * 1000:8.1f} ms [{alias}] {sql[:500]}')
+        logger.warning('\n'.join(lines))
+
+
+class MetricsMiddleware:
+    """
+    Feed request latency and query counts into the metrics registry,
+    labelled by URL name, plus per-action metrics for admin changelist
+    actions. Enabled with METRICS_ENABLED=True; see hr_system.metrics.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder(keep=0)
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        registry.observe(
+            'hr_http_request_duration_seconds',
+            {'view': view, 'method': request.method},
+            elapsed,
+        )
+        registry.inc(
+            'hr_http_requests_total',
+            {'view': view, 'method': request.method, 'status': response.status_code},
+        )
+        registry.inc('hr_db_queries_total', {'view': view}, recorder.count)
+
+        if request.method == 'POST' and view.endswith('_changelist') and request.POST.get('action'):
+            labels = {
+                'model': view.split(':')[-1][:-len('_changelist')],
+                'action': _action_label(request, match),
+            }
+            registry.observe('hr_admin_action_duration_seconds', labels, elapsed)
+            registry.inc('hr_admin_action_queries_total', labels, recorder.count)
+
+        registry.maybe_flush()
+        return response
+
+
+def _action_label(request, match):
+    """
+    The posted action if the changelist's ModelAdmin offers it to this user,
+    else ``other``: the label comes from the request, and each distinct
+    value would otherwise add a time series for good.
+    """
+    # ModelAdmin.get_urls() tags its views with the admin they belong to
+    model_admin = getattr(match.func, 'model_admin', None)
+    action = request.POST['action']
+    if model_admin is not None and action in model_admin.get_actions(request):
+        return action
+    return 'other'
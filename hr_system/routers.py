@@ -0,0 +1,132 @@
+"""
+Read-replica routing.
+
+When a ``replica`` database is configured (DATABASE_REPLICA_NAME), reads
+inside a ``replica_reads()`` block -- the dashboard, exports and reports --
+go to it, while everything else, including every write and all regular
+admin views, stays on the primary. Reads never go to the replica:
+
+* inside a transaction on the primary, which may hold uncommitted rows;
+* once the current request has written, so it reads its own writes;
+* for REPLICA_PIN_SECONDS after a request that wrote, via a cookie set by
+  ReplicaPinMiddleware, so e.g. the dashboard shown after saving an
+  employee does not lag behind the change while the replica catches up;
+* for values cached by hr.cache (``primary_reads()``), which would keep a
+  lagging result until the next change.
+"""
+
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+REPLICA_ALIAS = 'replica'
+PIN_COOKIE = 'hr_read_primary'
+
+_use_replica = ContextVar('hr_use_replica', default=False)
+_pinned = ContextVar('hr_pinned_to_primary', default=False)
+_wrote = ContextVar('hr_wrote', default=False)
+
+# Statements that change rows; transaction control (SAVEPOINT, RELEASE ...)
+# runs around plain reads too and does not count
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def replica_configured():
+    return REPLICA_ALIAS in connections.settings
+
+
+class replica_reads(ContextDecorator):
+    """Route reads in this block (or decorated function) to the replica."""
+
+    def __enter__(self):
+        self.token = _use_replica.set(True)
+        return self
+
+    def __exit__(self, *exc_info):
+        _use_replica.reset(self.token)
+        return False
+
+
+class primary_reads(replica_reads):
+    """Keep reads in this block on the primary, even inside replica_reads()."""
+
+    def __enter__(self):
+        self.token = _use_replica.set(False)
+        return self
+
+
+def read_alias():
+    """The alias reads are routed to at this point of the request."""
+    if (
+        _use_replica.get()
+        and not _pinned.get()
+        and not _wrote.get()
+        and replica_configured()
+        and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+    ):
+        return REPLICA_ALIAS
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        # Asking for the write alias is not a write (admin views ask before
+        # rendering a form); ReplicaPinMiddleware watches the SQL instead
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a copy of the primary and is never migrated itself
+        return db != REPLICA_ALIAS
+
+
+def _record_writes(execute, sql, params, many, context):
+    # Later reads in this request must see this write
+    if sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+        _wrote.set(True)
+    return execute(sql, params, many, context)
+
+
+class ReplicaPinMiddleware:
+    """
+    Pin a request to the primary once it has written (an INSERT, UPDATE or
+    DELETE run on the primary during the request), and the client for
+    REPLICA_PIN_SECONDS after. Removed at startup when no replica is
+    configured.
+    """
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned_token = _pinned.set(PIN_COOKIE in request.COOKIES)
+        wrote_token = _wrote.set(False)
+        try:
+            with connections[DEFAULT_DB_ALIAS].execute_wrapper(_record_writes):
+                response = self.get_response(request)
+            wrote = _wrote.get()
+        finally:
+            _pinned.reset(pinned_token)
+            _wrote.reset(wrote_token)
+        if wrote:
+            response.set_cookie(
+                PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -7,6 +7,7 @@ Enhanced for HR System with django-unfold admin interface.
 
 from pathlib import Path
 from decouple import config
+import copy
 import os
 from django.templatetags.static import static
 from django.urls import reverse_lazy
@@ -21,14 +22,15 @@ ALLOWED_HOSTS = config('ALLOWED_HOSTS', default='localhost,127.0.0.1').split(','
 
 # Application definition
 INSTALLED_APPS = [
-    # Django Unfold - Must be first for admin override
-    'unfold',
+    # Django Unfold - Must be first for admin override. The admin site
+    # itself is HRAdminSite, installed by HRAdminConfig below
+    'unfold.apps.BasicAppConfig',
     'unfold.contrib.filters',
     'unfold.contrib.forms',
     'unfold.contrib.import_export',
     
     # Django built-in apps
-    'django.contrib.admin',
+    'hr_system.apps.HRAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -45,7 +47,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost so they time the whole stack; each removes itself unless
+    # REQUEST_PROFILING / METRICS_ENABLED is set
+    'hr_system.middleware.RequestProfilingMiddleware',
+    'hr_system.middleware.MetricsMiddleware',
+    # Removes itself unless a read replica is configured
+    'hr_system.routers.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Serves collected static files; removes itself unless STATIC_SERVE is set
+    'hr_system.staticfiles.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -75,12 +85,54 @@ TEMPLATES = [
 WSGI_APPLICATION = 'hr_system.wsgi.application'
 
 # Database
+# DB_PROFILE=production switches SQLite to WAL with a busy timeout, relaxed
+# fsyncs and larger mmap/page caches (applied per connection by hr_system.db),
+# starts write transactions with BEGIN IMMEDIATE and keeps connections open
+# between requests. `manage.py benchmark_sqlite` compares both profiles.
+DB_PROFILE = config('DB_PROFILE', default='development')
+SQLITE_BUSY_TIMEOUT_MS = config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int)
+SQLITE_PRODUCTION_PROFILE = {
+    'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+        'transaction_mode': 'IMMEDIATE',
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'busy_timeout': SQLITE_BUSY_TIMEOUT_MS,
+            'synchronous': 'NORMAL',
+            'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
+            # Negative values are KiB rather than pages
+            'cache_size': -config('SQLITE_CACHE_SIZE_KB', default=64 * 1024, cast=int),
+            'temp_store': 'MEMORY',
+        },
+    },
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': 'hr_system.sqlite3',
+        'NAME': config('DATABASE_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0, cast=int),
     }
 }
+if DB_PROFILE == 'production':
+    DATABASES['default'].update(copy.deepcopy(SQLITE_PRODUCTION_PROFILE))
+
+# Read replica: with DATABASE_REPLICA_NAME set, dashboard, export and report
+# reads go to that copy of the database (see hr_system.routers); refresh a
+# local SQLite copy with `manage.py sync_replica`. Clients that just wrote
+# read from the primary for REPLICA_PIN_SECONDS.
+DATABASE_REPLICA_NAME = config('DATABASE_REPLICA_NAME', default='')
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+if DATABASE_REPLICA_NAME:
+    DATABASES['replica'] = copy.deepcopy(DATABASES['default'])
+    DATABASES['replica'].update({
+        'NAME': DATABASE_REPLICA_NAME,
+        'TEST': {'MIRROR': 'default'},
+    })
+    DATABASES['replica'].setdefault('OPTIONS', {}).setdefault('pragmas', {})['query_only'] = 'ON'
+DATABASE_ROUTERS = ['hr_system.routers.ReplicaRouter']
 
 # Password validation - DISABLED for easier password setting
 AUTH_PASSWORD_VALIDATORS = [
@@ -111,6 +163,17 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    # Employee documents, stored once per distinct content (see hr.documents)
+    'documents': {'BACKEND': 'hr.documents.ContentAddressedStorage'},
+    # Hashed names plus .gz/.br copies, written by collectstatic
+    'staticfiles': {'BACKEND': 'hr_system.staticfiles.CompressedManifestStaticFilesStorage'},
+}
+# Serve STATIC_ROOT from Django with far-future headers for hashed files;
+# other files are cached for STATIC_MAX_AGE seconds
+STATIC_SERVE = config('STATIC_SERVE', default=not DEBUG, cast=bool)
+STATIC_MAX_AGE = config('STATIC_MAX_AGE', default=60, cast=int)
 
 # Media files
 MEDIA_URL = '/media/'
@@ -201,22 +264,22 @@ UNFOLD = {
                     {
                         "title": "Dashboard",
                         "icon": "dashboard",
-                        "link": lambda request: reverse_lazy("admin:index"),
+                        "link": reverse_lazy("admin:index"),
                     },
                     {
                         "title": "Employees",
                         "icon": "people",
-                        "link": lambda request: reverse_lazy("admin:hr_employee_changelist"),
+                        "link": reverse_lazy("admin:hr_employee_changelist"),
                     },
                     {
                         "title": "Departments",
                         "icon": "corporate_fare",
-                        "link": lambda request: reverse_lazy("admin:hr_department_changelist"),
+                        "link": reverse_lazy("admin:hr_department_changelist"),
                     },
                     {
                         "title": "Positions",
                         "icon": "work",
-                        "link": lambda request: reverse_lazy("admin:hr_position_changelist"),
+                        "link": reverse_lazy("admin:hr_position_changelist"),
                     },
                 ],
             },
@@ -227,17 +290,24 @@ UNFOLD = {
                     {
                         "title": "Leave Requests",
                         "icon": "event_available",
-                        "link": lambda request: reverse_lazy("admin:hr_leaverequest_changelist"),
+                        "link": reverse_lazy("admin:hr_leaverequest_changelist"),
+                        "badge": "hr.badges.pending_leave_requests",
                     },
                     {
                         "title": "Performance Reviews",
                         "icon": "assessment",
-                        "link": lambda request: reverse_lazy("admin:hr_performancereview_changelist"),
+                        "link": reverse_lazy("admin:hr_performancereview_changelist"),
                     },
                     {
                         "title": "Attendance",
                         "icon": "schedule",
-                        "link": lambda request: reverse_lazy("admin:hr_attendance_changelist"),
+                        "link": reverse_lazy("admin:hr_attendance_changelist"),
+                    },
+                    {
+                        "title": "Documents",
+                        "icon": "description",
+                        "link": reverse_lazy("admin:hr_employeedocument_changelist"),
+                        "badge": "hr.badges.expiring_documents",
                     },
                 ],
             },
@@ -254,12 +324,12 @@ UNFOLD = {
                 {
                     "title": "Employee Management",
                     "icon": "people",
-                    "link": lambda request: reverse_lazy("admin:hr_employee_changelist"),
+                    "link": reverse_lazy("admin:hr_employee_changelist"),
                 },
                 {
                     "title": "Organization",
                     "icon": "corporate_fare", 
-                    "link": lambda request: reverse_lazy("admin:hr_department_changelist"),
+                    "link": reverse_lazy("admin:hr_department_changelist"),
                 },
             ],
         },
@@ -270,10 +340,116 @@ UNFOLD = {
 PHONENUMBER_DB_FORMAT = 'E164'
 PHONENUMBER_DEFAULT_REGION = 'US'
 
+# Employee photo thumbnails are this many pixels square (twice the 40px
+# they are shown at, for high-density screens); see hr.thumbnails
+EMPLOYEE_THUMBNAIL_SIZE = config('EMPLOYEE_THUMBNAIL_SIZE', default=80, cast=int)
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 
+# Chunked document uploads (see hr.uploads): partial files live in
+# CHUNKED_UPLOAD_DIR until the document is saved; `manage.py purge_uploads`
+# deletes those untouched for CHUNKED_UPLOAD_EXPIRY_HOURS
+CHUNKED_UPLOAD_DIR = config('CHUNKED_UPLOAD_DIR', default=str(BASE_DIR / 'uploads'))
+CHUNKED_UPLOAD_CHUNK_SIZE = config('CHUNKED_UPLOAD_CHUNK_SIZE', default=5 * 1024 * 1024, cast=int)
+CHUNKED_UPLOAD_MAX_SIZE = config('CHUNKED_UPLOAD_MAX_SIZE', default=500 * 1024 * 1024, cast=int)
+CHUNKED_UPLOAD_EXPIRY_HOURS = config('CHUNKED_UPLOAD_EXPIRY_HOURS', default=24, cast=int)
+
+# Attendance archival: rows older than this are moved to the archive table
+# by `manage.py archive_attendance`, one batch per transaction
+ATTENDANCE_ARCHIVE_AFTER_DAYS = config('ATTENDANCE_ARCHIVE_AFTER_DAYS', default=365, cast=int)
+ATTENDANCE_ARCHIVE_BATCH_SIZE = config('ATTENDANCE_ARCHIVE_BATCH_SIZE', default=1000, cast=int)
+
+# Request profiling: adds Server-Timing headers (SQL, view, render) and logs
+# requests slower than REQUEST_PROFILING_SLOW_MS with their slowest queries
+REQUEST_PROFILING = config('REQUEST_PROFILING', default=False, cast=bool)
+REQUEST_PROFILING_SLOW_MS = config('REQUEST_PROFILING_SLOW_MS', default=500, cast=int)
+REQUEST_PROFILING_TOP_QUERIES = config('REQUEST_PROFILING_TOP_QUERIES', default=5, cast=int)
+
+# Metrics: latency histograms and query counters exported at /metrics in
+# Prometheus text format. With several worker processes, point METRICS_DIR at
+# a directory shared by all of them so the endpoint reports merged totals.
+METRICS_ENABLED = config('METRICS_ENABLED', default=False, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5, cast=int)
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1').split(',')
+
+# Cache: a process-local LRU in front of a cache shared by every worker --
+# files under CACHE_LOCATION, or with CACHE_SHARED_BACKEND=db the table named
+# by CACHE_LOCATION (create it with `manage.py createcachetable`). Local
+# copies live for CACHE_LOCAL_TIMEOUT seconds, which bounds how stale another
+# worker's invalidations can be. hr.cache adds namespaced, versioned keys.
+SHARED_CACHE_BACKENDS = {
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+}
+CACHE_SHARED_BACKEND = config('CACHE_SHARED_BACKEND', default='file')
+CACHE_TIMEOUT = config('CACHE_TIMEOUT', default=300, cast=int)
+CACHES = {
+    'default': {
+        'BACKEND': 'hr_system.cache_backends.TieredCache',
+        'TIMEOUT': CACHE_TIMEOUT,
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'LOCAL_TIMEOUT': config('CACHE_LOCAL_TIMEOUT', default=5, cast=int),
+            'LOCAL_MAX_ENTRIES': config('CACHE_LOCAL_MAX_ENTRIES', default=1000, cast=int),
+        },
+    },
+    'shared': {
+        'BACKEND': SHARED_CACHE_BACKENDS[CACHE_SHARED_BACKEND],
+        'LOCATION': config(
+            'CACHE_LOCATION',
+            default=str(BASE_DIR / 'cache') if CACHE_SHARED_BACKEND == 'file' else 'hr_cache',
+        ),
+        'TIMEOUT': CACHE_TIMEOUT,
+        'KEY_PREFIX': config('CACHE_KEY_PREFIX', default='hr_system'),
+        'OPTIONS': {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=10000, cast=int)},
+    },
+}
+TEST_RUNNER = 'hr_system.test_runner.TestRunner'
+
+# Dashboard widgets are queried concurrently on this many threads, each with
+# its own database connection; 0 or 1 queries them one after another. Pays
+# off with several CPU cores or a client/server database: compare both with
+# `manage.py benchmark_dashboard`.
+DASHBOARD_WORKERS = config('DASHBOARD_WORKERS', default=0, cast=int)
+
+# Warm each WSGI/ASGI worker up (URLs, admin templates, lookup tables) when
+# it loads the application, before it serves requests; see hr_system.warmup
+WORKER_WARMUP = config('WORKER_WARMUP', default=not DEBUG, cast=bool)
+
+# Change feed: deleted rows of tracked models leave tombstones, purged after
+# this many days by `manage.py changes --purge` (see hr.changes)
+TOMBSTONE_RETENTION_DAYS = config('TOMBSTONE_RETENTION_DAYS', default=90, cast=int)
+
+# updated_at is set when a row is written, not when it commits, so the next
+# --since printed by `manage.py changes` is at least this many seconds before
+# the read; keep it above the longest write transaction
+CHANGE_FEED_SAFETY_LAG_SECONDS = config('CHANGE_FEED_SAFETY_LAG_SECONDS', default=60, cast=int)
+
+# A stored employee document file whose last reference goes is kept if it was
+# written or reused within this many seconds, since an upload of the same
+# content may not have committed yet; `manage.py purge_documents` removes it
+# later (see hr.documents)
+DOCUMENT_RELEASE_GRACE_SECONDS = config('DOCUMENT_RELEASE_GRACE_SECONDS', default=300, cast=int)
+
+# Documents expiring within this many days are counted in the sidebar badge,
+# listed on the dashboard and mailed to managers by
+# `manage.py notify_expiring_documents`; those of employees without a manager
+# go to DOCUMENT_EXPIRY_FALLBACK_EMAIL, if set
+DOCUMENT_EXPIRY_WARNING_DAYS = config('DOCUMENT_EXPIRY_WARNING_DAYS', default=30, cast=int)
+DOCUMENT_EXPIRY_FALLBACK_EMAIL = config('DOCUMENT_EXPIRY_FALLBACK_EMAIL', default='')
+
+# Sessions are read from the shared cache tier, falling back to the database.
+# Users and their permissions are cached by CachedModelBackend and the admin
+# app list by HRAdminSite, until the user, their groups or permissions change.
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.cached_db')
+# Not the tiered default: a process must never see a session another one
+# has since logged out
+SESSION_CACHE_ALIAS = 'shared'
+AUTHENTICATION_BACKENDS = ['hr_system.auth_backends.CachedModelBackend']
+
 # Logging configuration
 LOGGING = {
     'version': 1,
@@ -288,6 +464,12 @@ LOGGING = {
             'level': 'DEBUG' if DEBUG else 'INFO',
             'class': 'logging.StreamHandler',
         },
+        'slow_requests': {
+            'level': 'WARNING',
+            'class': 'logging.FileHandler',
+            'filename': BASE_DIR / 'slow_requests.log',
+            'delay': True,
+        },
     },
     'root': {
         'handlers': ['console', 'file'],
@@ -304,5 +486,15 @@ LOGGING = {
             'level': 'DEBUG' if DEBUG else 'INFO',
             'propagate': False,
         },
+        'hr_system.warmup': {
+            'handlers': ['console', 'file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'hr_system.profiling': {
+            'handlers': ['console', 'slow_requests'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
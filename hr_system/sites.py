@@ -0,0 +1,133 @@
+import hashlib
+from functools import partial
+from urllib.parse import parse_qs, urlparse
+
+from django.urls import reverse
+from django.utils.functional import Promise, cached_property
+from django.utils.module_loading import import_string
+from django.utils.translation import get_language
+from unfold.settings import get_config
+from unfold.sites import UnfoldAdminSite
+
+from .auth_backends import cached_for_user
+
+
+class HRAdminSite(UnfoldAdminSite):
+    """
+    Unfold admin site that caches each user's app list -- built for the
+    index page, app pages and the sidebar by checking every registered
+    model's permissions -- until that user's permissions change.
+
+    The SIDEBAR navigation and TABS are resolved once per process: lazy
+    links are reversed and badge callbacks imported up front, leaving only
+    the active state, permission checks and badge counts per request.
+    Links given as callables are still called per request.
+
+    get_sidebar_list, get_tabs_list and _get_is_active replace unfold
+    internals as of 0.89, which requirements.txt pins; check them against
+    the new code before raising the pin.
+    """
+
+    @cached_property
+    def registry_key(self):
+        # Registered models only change on deploy; keeps a new release
+        # from serving app lists cached by the previous one
+        labels = sorted(model._meta.label for model in self._registry)
+        return hashlib.md5(','.join(labels).encode(), usedforsecurity=False).hexdigest()[:12]
+
+    def _build_app_dict(self, request, label=None):
+        user = request.user
+        if not user.is_authenticated:
+            return super()._build_app_dict(request, label)
+        return cached_for_user(
+            user.pk,
+            f'app_dict:{self.name}:{self.registry_key}:{label}:{get_language()}',
+            partial(self._build_cacheable_app_dict, request, label),
+        )
+
+    def _build_cacheable_app_dict(self, request, label):
+        app_dict = super()._build_app_dict(request, label)
+        # Names are lazy translations, which do not pickle; the cache key
+        # includes the active language
+        for app in app_dict.values():
+            app['name'] = str(app['name'])
+            for model in app['models']:
+                model['name'] = str(model['name'])
+        return app_dict
+
+    @cached_property
+    def index_path(self):
+        return reverse(f'{self.name}:index')
+
+    @cached_property
+    def navigation(self):
+        config = get_config(self.settings_name)['SIDEBAR'].get('navigation') or []
+        return [self._resolve_navigation_item(group) for group in config]
+
+    @cached_property
+    def tabs(self):
+        return [
+            {**tab, 'items': [self._resolve_navigation_item(item) for item in tab['items']]}
+            for tab in get_config(self.settings_name).get('TABS') or []
+        ]
+
+    def _resolve_navigation_item(self, item):
+        item = dict(item)
+        if isinstance(item.get('link'), Promise):
+            item['link'] = str(item['link'])
+        if isinstance(item.get('badge'), str):
+            item['badge'] = import_string(item['badge'])
+        if 'items' in item:
+            item['items'] = [self._resolve_navigation_item(child) for child in item['items']]
+        return item
+
+    def get_sidebar_list(self, request):
+        results = []
+        for group in self.navigation:
+            items = group['items']
+            group = self._navigation_item(request, {k: v for k, v in group.items() if k != 'items'})
+            group['items'] = [self._navigation_item(request, item, self.tabs) for item in items]
+            results.append(group)
+        return results
+
+    def get_tabs_list(self, request):
+        tabs = []
+        for tab in self.tabs:
+            items = [self._navigation_item(request, item, is_tab=True) for item in tab['items']]
+            tabs.append({**tab, 'items': items})
+        return tabs
+
+    def _navigation_item(self, request, item, tabs=(), is_tab=False):
+        item = dict(item)
+        link = item.get('link')
+        if callable(link):
+            link = item['link_callback'] = link(request)
+        if 'active' in item:
+            item['active'] = self._get_value(item['active'], request)
+        elif link is not None:
+            item['active'] = self._get_is_active(request, link, is_tab)
+        if tabs and self._get_is_tab_active(request, tabs, item.get('link')):
+            item['active'] = True
+        item['has_permission'] = self._call_permission_callback(item.get('permission'), request)
+        if callable(item.get('badge')):
+            # The template shows ``badge_callback`` when ``badge`` is set
+            count = item.pop('badge')(request)
+            if count:
+                item['badge'] = item['badge_callback'] = count
+        if 'items' in item and not is_tab:
+            item['items'] = [self._navigation_item(request, child) for child in item['items']]
+        return item
+
+    def _get_is_active(self, request, link, is_tab=False):
+        # As upstream, with the index path reversed once rather than per item
+        link = str(link)
+        link_path = urlparse(link).path
+        if link_path == request.path == self.index_path:
+            return True
+        if link_path and link_path in request.path and link_path != self.index_path:
+            if is_tab:
+                query_params = parse_qs(urlparse(link).query)
+                request_params = parse_qs(request.GET.urlencode())
+                return all(request_params.get(k) == v for k, v in query_params.items())
+            return True
+        return False
@@ -0,0 +1,41 @@
+"""
+SQLite backend with two extra OPTIONS keys:
+
+``transaction_mode``
+    How ``transaction.atomic()`` opens its transaction (``DEFERRED``,
+    ``IMMEDIATE`` or ``EXCLUSIVE``). Django 4.2 always issues a plain
+    ``BEGIN``, so a transaction that reads before it writes has to upgrade
+    its lock mid-way; under WAL a concurrent writer makes that upgrade fail
+    at once with "database is locked" instead of waiting for busy_timeout.
+    ``IMMEDIATE`` takes the write lock up front, where the wait applies.
+
+``pragmas``
+    PRAGMAs applied to every new connection by hr_system.db.
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        kwargs.pop('pragmas', None)
+        mode = kwargs.pop('transaction_mode', None)
+        if mode is not None and mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"Invalid SQLite transaction_mode {mode!r}; "
+                f"expected one of {', '.join(TRANSACTION_MODES)}."
+            )
+        self.transaction_mode = mode.upper() if mode else None
+        return kwargs
+
+    def _start_transaction_under_autocommit(self):
+        if getattr(self, 'transaction_mode', None):
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+        else:
+            super()._start_transaction_under_autocommit()
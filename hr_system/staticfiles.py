@@ -0,0 +1,226 @@
+"""
+Production static files: hashed names, precompressed copies and serving
+with far-future cache headers.
+
+``collectstatic`` with CompressedManifestStaticFilesStorage writes every file
+under its content-hashed name (``custom-admin.3f2a9c1b.css``) alongside a
+``staticfiles.json`` manifest, then a ``.gz`` copy -- and a ``.br`` copy when
+the optional ``brotli`` package is installed -- of each text asset.
+StaticFilesMiddleware serves STATIC_ROOT from the Django process, picking
+the smallest encoding the client accepts. Hashed names never change
+content, so they are sent as ``immutable`` for a year and browsers do not
+ask for them again; anything else gets STATIC_MAX_AGE seconds.
+"""
+
+import gzip
+import json
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_http_date_safe
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.html', '.xml', '.ico', '.ttf', '.eot',
+}
+MIN_COMPRESS_SIZE = 256
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Preferred first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _compressors():
+    yield '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also writes compressed copies after post-processing.
+
+    Names missing from the manifest fall back to the unhashed name instead of
+    raising, so pages still render before ``collectstatic`` has run (tests,
+    a fresh checkout); such names are served with the short max-age.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Remembered, so a missing file is not looked up on every render
+            self.hashed_files[self.hash_key(self.clean_name(name))] = name
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if not isinstance(processed, Exception):
+                names.add(name)
+                if hashed_name:
+                    names.add(hashed_name)
+            yield name, hashed_name, processed
+        if not dry_run:
+            for name in sorted(names):
+                self.compress(name)
+
+    def compress(self, name):
+        if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            return
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            data = source.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        for suffix, compress in _compressors():
+            compressed = compress(data)
+            # Not worth a separate file (or a decode) for small savings
+            if len(compressed) < len(data) * 0.95:
+                with open(path + suffix, 'wb') as target:
+                    target.write(compressed)
+            elif os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+@dataclass
+class StaticFile:
+    path: str
+    content_type: str
+    size: int
+    mtime: float
+    cache_control: str
+    # Content-Encoding -> (path, size) of the precompressed copies
+    variants: dict = field(default_factory=dict)
+
+    def etag(self, encoding=None):
+        # Each encoding is a different representation, so it gets its own
+        # strong ETag (-gz, -br); a 304 must not revalidate the wrong bytes
+        suffix = f'-{dict(ENCODINGS)[encoding][1:]}' if encoding else ''
+        return f'"{int(self.mtime):x}-{self.size:x}{suffix}"'
+
+
+class StaticFilesMiddleware:
+    """
+    Serve collected static files from STATIC_ROOT, enabled with STATIC_SERVE.
+
+    STATIC_ROOT is indexed once at startup, so a request for anything else
+    costs a dict lookup; restart after ``collectstatic``. Supports HEAD,
+    ETag / Last-Modified revalidation and precompressed variants.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'STATIC_SERVE', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.files = self.index(settings.STATIC_ROOT, settings.STATIC_URL)
+        if not self.files:
+            raise MiddlewareNotUsed
+
+    @staticmethod
+    def index(root, url):
+        if not root or not os.path.isdir(root):
+            return {}
+        immutable = _manifest_names(root)
+        prefix = '/' + url.strip('/') + '/'
+        compressed_suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        files = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(compressed_suffixes):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                stat = os.stat(path)
+                content_type, _ = mimetypes.guess_type(filename)
+                static_file = StaticFile(
+                    path=path,
+                    content_type=content_type or 'application/octet-stream',
+                    size=stat.st_size,
+                    mtime=stat.st_mtime,
+                    cache_control=(
+                        IMMUTABLE_CACHE_CONTROL if name in immutable
+                        else f'public, max-age={settings.STATIC_MAX_AGE}'
+                    ),
+                )
+                for encoding, suffix in ENCODINGS:
+                    if os.path.exists(path + suffix):
+                        static_file.variants[encoding] = (path + suffix, os.path.getsize(path + suffix))
+                files[prefix + name] = static_file
+        return files
+
+    def __call__(self, request):
+        static_file = self.files.get(request.path_info)
+        if static_file is None or request.method not in ('GET', 'HEAD'):
+            return self.get_response(request)
+        return self.serve(request, static_file)
+
+    def serve(self, request, static_file):
+        path, size, encoding = static_file.path, static_file.size, None
+        accepted = _accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        for candidate, _ in ENCODINGS:
+            if candidate in accepted and candidate in static_file.variants:
+                encoding = candidate
+                path, size = static_file.variants[encoding]
+                break
+
+        headers = {
+            'Cache-Control': static_file.cache_control,
+            'ETag': static_file.etag(encoding),
+            'Last-Modified': http_date(static_file.mtime),
+        }
+        if static_file.variants:
+            headers['Vary'] = 'Accept-Encoding'
+        if _not_modified(request, headers['ETag'], static_file.mtime):
+            return HttpResponseNotModified(headers=headers)
+
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        if request.method == 'HEAD':
+            headers['Content-Length'] = str(size)
+            return HttpResponse(content_type=static_file.content_type, headers=headers)
+        response = FileResponse(open(path, 'rb'), content_type=static_file.content_type, headers=headers)
+        # FileResponse names the (possibly .gz) file; assets are not downloads
+        del response.headers['Content-Disposition']
+        return response
+
+
+def _manifest_names(root):
+    """Hashed names listed in the manifest, which are safe to cache forever."""
+    try:
+        with open(os.path.join(root, ManifestStaticFilesStorage.manifest_name)) as manifest:
+            return set(json.load(manifest).get('paths', {}).values())
+    except (OSError, ValueError):
+        return set()
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for token in header.split(','):
+        encoding, _, params = token.strip().partition(';')
+        if not re.match(r'\s*q\s*=\s*0(\.0*)?\s*$', params):
+            accepted.add(encoding.strip().lower())
+    return accepted
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        return if_none_match.strip() == '*' or etag in (
+            tag.strip().removeprefix('W/') for tag in if_none_match.split(',')
+        )
+    modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return modified_since is not None and int(mtime) <= modified_since
@@ -0,0 +1,39 @@
+import copy
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+@contextmanager
+def isolated_cache():
+    """
+    Point the shared cache tier at a throwaway directory, so test databases
+    never see values cached against the real database (or by earlier runs).
+    """
+    directory = tempfile.mkdtemp(prefix='hr-cache-')
+    caches = copy.deepcopy(settings.CACHES)
+    caches['default'].setdefault('OPTIONS', {})
+    shared = caches[caches['default']['OPTIONS'].get('SHARED', 'default')]
+    shared['BACKEND'] = 'django.core.cache.backends.filebased.FileBasedCache'
+    shared['LOCATION'] = directory
+    try:
+        with override_settings(CACHES=caches):
+            yield
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class TestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._isolated_cache = isolated_cache()
+        self._isolated_cache.__enter__()
+
+    def teardown_test_environment(self, **kwargs):
+        self._isolated_cache.__exit__(None, None, None)
+        super().teardown_test_environment(**kwargs)
@@ -15,11 +15,17 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.shortcuts import redirect
 
+from hr.views import document_download, document_upload_create, document_upload_detail
+from hr_system.metrics import metrics_view
+
+# Admin modules are discovered here rather than at startup (HRAdminConfig)
+admin.autodiscover()
+
 def home_redirect(request):
     """Redirect home page to admin"""
     return redirect('/admin/')
@@ -27,6 +33,11 @@ def home_redirect(request):
 urlpatterns = [
     path('', home_redirect, name='home'),
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
+    path('api/', include('hr.urls')),
+    path('documents/<int:pk>/', document_download, name='document_download'),
+    path('documents/uploads/', document_upload_create, name='document_upload_create'),
+    path('documents/uploads/<uuid:upload_id>/', document_upload_detail, name='document_upload_detail'),
 ]
 
 # Serve media files during development
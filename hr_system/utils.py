@@ -1,9 +1,21 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
 from django.contrib.admin import AdminSite
+from django.db import close_old_connections, connections
 from django.db.models import Count, Q
 from django.utils import timezone
 from datetime import datetime, timedelta
 from django.contrib.auth.models import User
 
+from hr_system.metrics import timed, timed_block
+from hr_system.routers import read_alias, replica_reads
+from hr.cache import DASHBOARD, memoize
+
 
 def environment_callback(request):
     """
@@ -17,66 +29,93 @@ def environment_callback(request):
     return ["🚀 Production", "success"]
 
 
-def dashboard_callback(request, context):
-    """
-    Callback to customize the admin dashboard with HR-specific widgets and statistics.
-    """
-    from hr.models import Employee, Department, LeaveRequest, Attendance
-    
-    # Get current date and calculate date ranges
-    today = timezone.now().date()
+@memoize(DASHBOARD)
+def employee_stats(today):
+    from hr.models import Employee
+
     current_month_start = today.replace(day=1)
-    last_month_start = (current_month_start - timedelta(days=1)).replace(day=1)
-    current_year_start = today.replace(month=1, day=1)
-    
-    # Employee Statistics
-    total_employees = Employee.objects.filter(is_active=True).count()
-    active_employees = Employee.objects.filter(
-        employment_status='ACTIVE', 
-        is_active=True
-    ).count()
-    new_hires_this_month = Employee.objects.filter(
-        hire_date__gte=current_month_start,
-        is_active=True
-    ).count()
-    employees_on_leave = Employee.objects.filter(
-        employment_status='ON_LEAVE',
-        is_active=True
-    ).count()
-    
-    # Department Statistics
-    departments_with_employees = Department.objects.annotate(
-        emp_count=Count('employees', filter=Q(employees__is_active=True))
-    ).filter(emp_count__gt=0).count()
-    
-    # Leave Request Statistics
-    pending_leave_requests = LeaveRequest.objects.filter(
-        status='PENDING'
-    ).count()
-    
-    approved_leaves_this_month = LeaveRequest.objects.filter(
-        status='APPROVED',
-        start_date__gte=current_month_start
-    ).count()
-    
-    # Attendance Statistics (for today)
-    today_attendance = Attendance.objects.filter(date=today)
-    present_today = today_attendance.filter(status='PRESENT').count()
-    late_today = today_attendance.filter(status='LATE').count()
-    absent_today = today_attendance.filter(status='ABSENT').count()
-    
-    # Recent Activities
-    recent_leave_requests = LeaveRequest.objects.select_related(
+    with timed_block('dashboard.employees'):
+        return {
+            'total_employees': Employee.objects.filter(is_active=True).count(),
+            'active_employees': Employee.objects.filter(
+                employment_status='ACTIVE',
+                is_active=True
+            ).count(),
+            'new_hires_this_month': Employee.objects.filter(
+                hire_date__gte=current_month_start,
+                is_active=True
+            ).count(),
+            'employees_on_leave': Employee.objects.filter(
+                employment_status='ON_LEAVE',
+                is_active=True
+            ).count(),
+        }
+
+
+@memoize(DASHBOARD)
+def department_stats(today):
+    from hr.models import Department
+
+    with timed_block('dashboard.departments'):
+        return {
+            'departments_with_employees': Department.objects.annotate(
+                emp_count=Count('employees', filter=Q(employees__is_active=True))
+            ).filter(emp_count__gt=0).count(),
+        }
+
+
+@memoize(DASHBOARD)
+def leave_stats(today):
+    from hr.models import LeaveRequest
+
+    current_month_start = today.replace(day=1)
+    with timed_block('dashboard.leave'):
+        return {
+            'pending_leave_requests': LeaveRequest.objects.filter(
+                status='PENDING'
+            ).count(),
+            'approved_leaves_this_month': LeaveRequest.objects.filter(
+                status='APPROVED',
+                start_date__gte=current_month_start
+            ).count(),
+        }
+
+
+@memoize(DASHBOARD)
+def attendance_stats(today):
+    from hr.models import Attendance
+
+    with timed_block('dashboard.attendance'):
+        today_attendance = Attendance.objects.filter(date=today)
+        return {
+            'present_today': today_attendance.filter(status='PRESENT').count(),
+            'late_today': today_attendance.filter(status='LATE').count(),
+            'absent_today': today_attendance.filter(status='ABSENT').count(),
+        }
+
+
+def recent_leave_requests(today):
+    from hr.models import LeaveRequest
+
+    return list(LeaveRequest.objects.select_related(
         'employee', 'leave_type'
-    ).order_by('-created_at')[:5]
-    
-    recent_employees = Employee.objects.filter(
+    ).order_by('-created_at')[:5])
+
+
+def recent_employees(today):
+    from hr.models import Employee
+
+    return list(Employee.objects.filter(
         is_active=True
-    ).order_by('-created_at')[:5]
-    
-    # Birthday reminders (employees with birthdays in the next 7 days)
+    ).order_by('-created_at')[:5])
+
+
+def upcoming_birthdays(today):
+    """Employees with birthdays in the next 7 days"""
+    from hr.models import Employee
+
     next_week = today + timedelta(days=7)
-    upcoming_birthdays = Employee.objects.filter(
+    upcoming = Employee.objects.filter(
         is_active=True,
         date_of_birth__month=today.month,
         date_of_birth__day__gte=today.day,
@@ -91,26 +130,111 @@ def dashboard_callback(request, context):
         ),
         is_active=True
     )
-    
+    return list(upcoming[:5])
+
+
+def expiring_documents(today):
+    """Employee documents expiring soonest (see hr.expiry)"""
+    from hr.expiry import expiring_documents
+
+    return list(expiring_documents(today)[:5])
+
+
+# Headline counts, each cached until an employee, department, leave request
+# or attendance record changes (see HrConfig.ready)
+STAT_WIDGETS = (employee_stats, department_stats, leave_stats, attendance_stats)
+
+ACTIVITY_WIDGETS = {
+    'recent_leave_requests': recent_leave_requests,
+    'recent_employees': recent_employees,
+    'upcoming_birthdays': upcoming_birthdays,
+    'expiring_documents': expiring_documents,
+}
+
+
+def dashboard_stats(today):
+    """Headline counts for the dashboard."""
+    stats = {}
+    for widget in STAT_WIDGETS:
+        stats.update(widget(today))
+    return stats
+
+
+_widget_executor = None
+_widget_executor_lock = threading.Lock()
+
+
+def _executor():
+    global _widget_executor
+    with _widget_executor_lock:
+        if _widget_executor is None:
+            _widget_executor = ThreadPoolExecutor(
+                max_workers=settings.DASHBOARD_WORKERS, thread_name_prefix='dashboard'
+            )
+        return _widget_executor
+
+
+def _run_widget(widget, today):
+    # Worker threads keep their own connection between widgets; check it
+    # like a request would, so CONN_MAX_AGE and broken connections apply
+    close_old_connections()
+    try:
+        return widget(today)
+    finally:
+        close_old_connections()
+
+
+async def gather_dashboard_widgets(today):
+    """
+    Run every dashboard widget concurrently, each on a worker thread with its
+    own database connection, and return ``(hr_stats, recent_activities)``.
+
+    Django's async ORM methods (``acount()`` ...) all run on the one thread
+    sync code uses, so awaiting several of them still queries back to back;
+    the widgets are handed to a thread pool instead. The replica routing in
+    effect for the caller is copied to each widget.
+    """
+    loop = asyncio.get_running_loop()
+    widgets = list(STAT_WIDGETS) + list(ACTIVITY_WIDGETS.values())
+    results = await asyncio.gather(*(
+        loop.run_in_executor(_executor(), contextvars.copy_context().run, _run_widget, widget, today)
+        for widget in widgets
+    ))
+    stats = {}
+    for result in results[:len(STAT_WIDGETS)]:
+        stats.update(result)
+    return stats, dict(zip(ACTIVITY_WIDGETS, results[len(STAT_WIDGETS):]))
+
+
+def load_dashboard_widgets(today):
+    """
+    ``(hr_stats, recent_activities)`` for the dashboard, gathered
+    concurrently when DASHBOARD_WORKERS > 1. Inside a transaction the
+    widgets run here instead, as other connections cannot see its changes.
+    """
+    if settings.DASHBOARD_WORKERS > 1 and not connections[read_alias()].in_atomic_block:
+        return async_to_sync(gather_dashboard_widgets)(today)
+    activities = {name: widget(today) for name, widget in ACTIVITY_WIDGETS.items()}
+    return dashboard_stats(today), activities
+
+
+@timed('dashboard_callback')
+@replica_reads()
+def dashboard_callback(request, context):
+    """
+    Callback to customize the admin dashboard with HR-specific widgets and statistics.
+    """
+    # Get current date and calculate date ranges
+    today = timezone.now().date()
+    current_month_start = today.replace(day=1)
+
+    hr_stats, recent_activities = load_dashboard_widgets(today)
+
     # Add dashboard data to context
     context.update({
-        'hr_stats': {
-            'total_employees': total_employees,
-            'active_employees': active_employees,
-            'new_hires_this_month': new_hires_this_month,
-            'employees_on_leave': employees_on_leave,
-            'departments_with_employees': departments_with_employees,
-            'pending_leave_requests': pending_leave_requests,
-            'approved_leaves_this_month': approved_leaves_this_month,
-            'present_today': present_today,
-            'late_today': late_today,
-            'absent_today': absent_today,
-        },
-        'recent_activities': {
-            'recent_leave_requests': recent_leave_requests,
-            'recent_employees': recent_employees,
-            'upcoming_birthdays': upcoming_birthdays[:5],
-        },
+        'hr_stats': hr_stats,
+        # Evaluated up front so the queries run on the replica, not at render time
+        'recent_activities': recent_activities,
         'current_month': current_month_start.strftime('%B %Y'),
         'today': today,
     })
@@ -118,6 +242,7 @@ def dashboard_callback(request, context):
     return context
 
 
+@replica_reads()
 def get_admin_stats():
     """
     Helper function to get general admin statistics for the dashboard.
@@ -136,6 +261,7 @@ def get_admin_stats():
     return stats
 
 
+@replica_reads()
 def get_employee_hierarchy():
     """
     Helper function to get employee hierarchy data for organizational charts.
@@ -150,16 +276,17 @@ def get_employee_hierarchy():
     
     hierarchy = []
     for manager in managers:
-        direct_reports = manager.get_direct_reports()
+        direct_reports = list(manager.get_direct_reports())
         hierarchy.append({
             'manager': manager,
-            'reports_count': direct_reports.count(),
+            'reports_count': len(direct_reports),
             'direct_reports': direct_reports
         })
     
     return hierarchy
 
 
+@replica_reads()
 def calculate_employee_metrics(employee):
     """
     Calculate various metrics for a specific employee.
@@ -0,0 +1,133 @@
+"""
+Worker warmup: do the one-off work of a process's first admin request
+before it accepts traffic, so a deploy or scale-out does not show up as a
+latency spike.
+
+Called from hr_system.wsgi / hr_system.asgi when WORKER_WARMUP is set, and
+by ``manage.py warmup``, which reports how long each step takes.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import DatabaseError, connections
+
+
+logger = logging.getLogger('hr_system.warmup')
+
+# Template directories compiled up front: the admin and everything it includes
+TEMPLATE_PREFIXES = ('admin/', 'unfold/', 'import_export/', 'registration/')
+
+
+def resolve_urls():
+    """Import the URLconf (discovering admin modules) and fill its reverse maps."""
+    from django.contrib import admin
+    from django.urls import get_resolver, reverse
+
+    get_resolver().url_patterns
+    reverse('admin:index')
+    for model in admin.site._registry:
+        info = (model._meta.app_label, model._meta.model_name)
+        reverse('admin:%s_%s_changelist' % info)
+    return len(admin.site._registry)
+
+
+def _template_names(engine):
+    names = set()
+    for loader in engine.template_loaders:
+        # The cached loader wraps the filesystem and app directories loaders
+        for inner in getattr(loader, 'loaders', [loader]):
+            for directory in inner.get_dirs():
+                for root, _, filenames in os.walk(directory):
+                    for filename in filenames:
+                        name = os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/')
+                        if name.endswith('.html') and name.startswith(TEMPLATE_PREFIXES):
+                            names.add(name)
+    return sorted(names)
+
+
+def compile_templates():
+    """Compile the admin templates into the cached template loader."""
+    from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+
+    compiled = 0
+    for engine in engines.all():
+        engine = getattr(engine, 'engine', None)
+        if engine is None:
+            continue
+        for name in _template_names(engine):
+            try:
+                engine.get_template(name)
+            except (TemplateDoesNotExist, TemplateSyntaxError) as exc:
+                # e.g. templates for optional integrations that are not installed
+                logger.debug('Not compiling %s: %s', name, exc)
+            else:
+                compiled += 1
+    return compiled
+
+
+def load_admin_config():
+    """Resolve the Unfold navigation and tabs the admin site keeps per process."""
+    from django.contrib import admin
+
+    site = admin.site
+    for name in ('navigation', 'tabs', 'index_path', 'registry_key'):
+        getattr(site, name, None)
+    return len(getattr(site, 'navigation', ()))
+
+
+def prime_lookups():
+    """Load the department, position and leave type lookup tables."""
+    from hr.lookups import LOOKUP_TABLES
+
+    return sum(len(table.all()) for table in LOOKUP_TABLES.values())
+
+
+STEPS = (
+    ('urls', resolve_urls),
+    ('templates', compile_templates),
+    ('admin_config', load_admin_config),
+    ('lookups', prime_lookups),
+)
+
+
+def warmup():
+    """
+    Run every warmup step and return ``{step: (result, milliseconds)}``.
+    A failing step is logged and skipped: warmup must never stop a worker
+    from starting (e.g. before migrations have run).
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        # ASGI servers may import the application inside their event loop,
+        # where the ORM refuses to run
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(warmup).result()
+
+    results = {}
+    try:
+        for name, step in STEPS:
+            started = time.perf_counter()
+            try:
+                result = step()
+            except DatabaseError as exc:
+                logger.warning('Warmup step %s skipped, database unavailable: %s', name, exc)
+                result = None
+            except Exception:
+                logger.exception('Warmup step %s failed', name)
+                result = None
+            results[name] = (result, (time.perf_counter() - started) * 1000)
+    finally:
+        # Connections opened here must not be inherited by forked workers
+        connections.close_all()
+    logger.info(
+        'Worker warmed up: %s',
+        ', '.join(f'{name} {ms:.0f} ms' for name, (_, ms) in results.items()),
+    )
+    return results
@@ -0,0 +1,141 @@
+// Chunked, resumable document uploads (see hr/uploads.py)
+//
+// A file chosen in an input with data-chunked-upload is sent in chunks
+// before the form is submitted; the form then only posts the upload id in
+// a hidden "<name>-upload" field. After a network error the upload asks the
+// server how much arrived and resumes from there.
+
+(function() {
+    const MAX_RETRIES = 5;
+
+    function csrfToken(form) {
+        const input = form && form.querySelector('input[name="csrfmiddlewaretoken"]');
+        return input ? input.value : '';
+    }
+
+    function sleep(ms) {
+        return new Promise(function(resolve) { setTimeout(resolve, ms); });
+    }
+
+    async function createUpload(url, file, token) {
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json', 'X-CSRFToken': token},
+            body: JSON.stringify({filename: file.name, size: file.size}),
+            credentials: 'same-origin',
+        });
+        const state = await response.json();
+        if (!response.ok) {
+            throw new Error(state.error || 'Upload could not be started');
+        }
+        return state;
+    }
+
+    async function currentOffset(uploadUrl) {
+        const response = await fetch(uploadUrl, {method: 'HEAD', credentials: 'same-origin'});
+        if (!response.ok) {
+            throw new Error('Upload not found');
+        }
+        return parseInt(response.headers.get('Upload-Offset'), 10);
+    }
+
+    async function sendChunks(uploadUrl, file, chunkSize, token, progress) {
+        let offset = 0;
+        let retries = 0;
+        while (offset < file.size) {
+            const chunk = file.slice(offset, offset + chunkSize);
+            try {
+                const response = await fetch(uploadUrl, {
+                    method: 'PATCH',
+                    headers: {
+                        'Content-Type': 'application/offset+octet-stream',
+                        'Upload-Offset': String(offset),
+                        'X-CSRFToken': token,
+                    },
+                    body: chunk,
+                    credentials: 'same-origin',
+                });
+                const state = await response.json();
+                if (response.status === 409) {
+                    offset = state.offset;
+                    continue;
+                }
+                if (!response.ok) {
+                    throw new Error(state.error || 'Upload failed');
+                }
+                offset = state.offset;
+                retries = 0;
+                progress(offset / file.size);
+            } catch (error) {
+                if (++retries > MAX_RETRIES) {
+                    throw error;
+                }
+                await sleep(1000 * 2 ** retries);
+                offset = await currentOffset(uploadUrl).catch(function() { return offset; });
+            }
+        }
+    }
+
+    function hiddenInput(input) {
+        const name = input.name + '-upload';
+        let hidden = input.form.querySelector('input[type="hidden"][name="' + name + '"]');
+        if (!hidden) {
+            hidden = document.createElement('input');
+            hidden.type = 'hidden';
+            hidden.name = name;
+            input.parentNode.appendChild(hidden);
+        }
+        return hidden;
+    }
+
+    function statusLine(input) {
+        let status = input.parentNode.querySelector('.chunked-upload-status');
+        if (!status) {
+            status = document.createElement('div');
+            status.className = 'chunked-upload-status';
+            status.style.marginTop = '4px';
+            status.style.fontSize = '12px';
+            input.parentNode.appendChild(status);
+        }
+        return status;
+    }
+
+    async function upload(input) {
+        const file = input.files[0];
+        const form = input.form;
+        const token = csrfToken(form);
+        const status = statusLine(input);
+        const hidden = hiddenInput(input);
+        hidden.value = '';
+        form.dataset.pendingUploads = String(parseInt(form.dataset.pendingUploads || '0', 10) + 1);
+        try {
+            const state = await createUpload(input.dataset.chunkedUpload, file, token);
+            const uploadUrl = input.dataset.chunkedUpload + state.id + '/';
+            await sendChunks(uploadUrl, file, parseInt(input.dataset.chunkSize, 10), token, function(done) {
+                status.textContent = 'Uploading ' + file.name + ': ' + Math.floor(done * 100) + '%';
+            });
+            hidden.value = state.id;
+            // The bytes are on the server: do not post them again with the form
+            input.value = '';
+            status.textContent = 'Uploaded ' + file.name;
+        } catch (error) {
+            status.textContent = 'Upload of ' + file.name + ' failed: ' + error.message;
+        } finally {
+            form.dataset.pendingUploads = String(parseInt(form.dataset.pendingUploads, 10) - 1);
+        }
+    }
+
+    document.addEventListener('change', function(event) {
+        const input = event.target;
+        if (input.matches('input[type="file"][data-chunked-upload]') && input.files.length) {
+            upload(input);
+        }
+    });
+
+    document.addEventListener('submit', function(event) {
+        if (parseInt(event.target.dataset.pendingUploads || '0', 10) > 0) {
+            event.preventDefault();
+            alert('Please wait until the document upload has finished.');
+        }
+    }, true);
+})();